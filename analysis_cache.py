@@ -0,0 +1,124 @@
+import hashlib
+import json
+import os
+import tempfile
+import numpy as np
+
+# Cache location can be overridden per run with the VIDCLEANSER_CACHE_DIR variable
+DEFAULT_CACHE_DIR = os.environ.get(
+    "VIDCLEANSER_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "vidcleanser")
+)
+MAX_CACHE_BYTES = 2 * 1024**3
+
+# Bytes hashed from the start and the end of a file to fingerprint its content
+FINGERPRINT_SAMPLE_BYTES = 1024**2
+
+
+def file_fingerprint(path):
+    """
+    Identify a file's content cheaply.
+
+    Combines size, mtime and a SHA-256 of the first and last megabyte, so edits and
+    replacements are detected without hashing multi-gigabyte recordings in full.
+    """
+    st = os.stat(path)
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        h.update(f.read(FINGERPRINT_SAMPLE_BYTES))
+        if st.st_size > FINGERPRINT_SAMPLE_BYTES:
+            f.seek(max(FINGERPRINT_SAMPLE_BYTES, st.st_size - FINGERPRINT_SAMPLE_BYTES))
+            h.update(f.read())
+    return f"{st.st_size}-{st.st_mtime_ns}-{h.hexdigest()}"
+
+
+class AnalysisCache:
+    """
+    On-disk store for analysis results keyed by source file identity and parameters.
+
+    Entries are written atomically and evicted least-recently-used first once the
+    cache grows past max_bytes.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=MAX_CACHE_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._fingerprints = {}
+
+    def key(self, path, kind, **params):
+        """Build the cache key for an analysis of `kind` on `path` with the given parameters."""
+        abspath = os.path.abspath(path)
+        if abspath not in self._fingerprints:
+            self._fingerprints[abspath] = file_fingerprint(abspath)
+        payload = json.dumps(
+            {"file": self._fingerprints[abspath], "kind": kind, "params": params},
+            sort_keys=True,
+        )
+        return f"{kind}-{hashlib.sha256(payload.encode()).hexdigest()[:32]}"
+
+    def _path(self, key, ext):
+        return os.path.join(self.cache_dir, key + ext)
+
+    def _hit(self, path):
+        if not os.path.exists(path):
+            return False
+        os.utime(path)  # Mark as recently used for eviction
+        return True
+
+    def _write(self, path, write_fn):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                write_fn(f)
+            os.replace(tmp, path)
+        except BaseException:
+            os.remove(tmp)
+            raise
+        self.evict()
+
+    def load_arrays(self, key):
+        """Return the dict of arrays stored under key, or None."""
+        path = self._path(key, ".npz")
+        if not self._hit(path):
+            return None
+        with np.load(path) as data:
+            return {name: data[name] for name in data.files}
+
+    def save_arrays(self, key, **arrays):
+        self._write(self._path(key, ".npz"), lambda f: np.savez(f, **arrays))
+
+    def load_json(self, key):
+        """Return the JSON document stored under key, or None."""
+        path = self._path(key, ".json")
+        if not self._hit(path):
+            return None
+        with open(path, "r") as f:
+            return json.load(f)
+
+    def save_json(self, key, data):
+        self._write(self._path(key, ".json"), lambda f: f.write(json.dumps(data).encode()))
+
+    def evict(self):
+        """Delete least-recently-used entries until the cache fits in max_bytes."""
+        try:
+            entries = [os.path.join(self.cache_dir, n) for n in os.listdir(self.cache_dir)]
+        except FileNotFoundError:
+            return
+        # Another process may evict the same entries concurrently; skip those already gone
+        stats = []
+        for p in entries:
+            if p.endswith(".tmp"):
+                continue
+            try:
+                stats.append((os.stat(p), p))
+            except FileNotFoundError:
+                pass
+        total = sum(st.st_size for st, _ in stats)
+        for st, p in sorted(stats, key=lambda x: x[0].st_mtime):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(p)
+            except FileNotFoundError:
+                pass
+            total -= st.st_size
@@ -0,0 +1,192 @@
+import os
+import subprocess
+import numpy as np
+from audio_stream import iter_pcm_blocks
+from ffmpeg_tools import ffmpeg_binary, probe_media
+from sequential_render import OUTPUT_SAMPLE_RATE, write_wav
+
+# Encoder per output extension; .wav is written directly without ffmpeg
+AUDIO_CODECS = {
+    ".wav": None,
+    ".flac": "flac",
+    ".m4a": "aac",
+    ".aac": "aac",
+    ".mp3": "libmp3lame",
+    ".ogg": "libvorbis",
+    ".opus": "libopus",
+}
+# Inputs with one of these extensions have no video to render
+AUDIO_EXTENSIONS = tuple(AUDIO_CODECS) + (".aiff", ".aif", ".wma")
+# Seconds of samples decoded and handed to the writer at a time
+WRITE_BLOCK_DURATION = 10.0
+
+
+def is_audio_path(path):
+    """Whether a path names an audio-only file, judged by its extension."""
+    return os.path.splitext(path)[1].lower() in AUDIO_EXTENSIONS
+
+
+def iter_cut_audio(blocks, segments, sample_rate, overlap=0.0):
+    """
+    Keep only the given ranges of streamed audio, crossfading consecutive ones.
+
+    Segments are laid out as in output_layout: each overlaps the previous one by
+    `overlap` seconds, and over that window the previous segment fades out while
+    the next fades in with complementary linear gains, so the mix keeps a
+    constant level. Without overlap the kept slices are simply concatenated.
+
+    The source is read in a single forward pass and only the samples of the
+    current crossfade are held back, so memory use does not depend on the length
+    of the input.
+
+    Args:
+        blocks (iterable of np.ndarray): Consecutive source blocks of shape (n,) or (n, channels).
+        segments (list of tuple): Sorted, non-overlapping (start, end) ranges in seconds.
+        sample_rate (int): Sample rate of the blocks in Hz.
+        overlap (float): Crossfade duration in seconds.
+
+    Yields:
+        np.ndarray: Consecutive blocks of the cut audio.
+    """
+    bounds = np.round(np.array(segments, dtype=float).reshape(-1, 2) * sample_rate).astype(np.int64)
+    bounds = bounds[bounds[:, 1] > np.maximum(bounds[:, 0], 0)]
+    if len(bounds) == 0:
+        return
+    bounds[:, 0] = np.maximum(bounds[:, 0], 0)
+    lengths = bounds[:, 1] - bounds[:, 0]
+    # A crossfade can never be longer than the segments it joins
+    o = max(0, min(int(round(overlap * sample_rate)), int(lengths.min())))
+    starts = np.concatenate([[0], np.cumsum(lengths[:-1] - o)])  # Output position of each segment
+    last = len(bounds) - 1
+
+    pending = None  # Output samples that a later segment may still be mixed into
+    flushed = 0  # Output position of pending[0]
+    i = 0
+    offset = 0  # Source position of block[0]
+    for block in blocks:
+        block_end = offset + len(block)
+        while i <= last:
+            s, e = bounds[i]
+            a, b = max(s, offset), min(e, block_end)
+            if a < b:
+                piece = block[a - offset : b - offset]
+                if o:
+                    p = np.arange(a - s, b - s)  # Positions within the segment
+                    gain = np.ones(len(p), dtype=np.float32)
+                    if i > 0:
+                        head = p < o
+                        gain[head] -= 1 - p[head] / o  # Fade in
+                    if i < last:
+                        t = p - (lengths[i] - o)
+                        tail = t >= 0
+                        gain[tail] -= t[tail] / o  # Fade out
+                    piece = piece * gain.reshape((-1,) + (1,) * (piece.ndim - 1))
+                if pending is None:
+                    pending = np.zeros((0,) + block.shape[1:], dtype=block.dtype)
+                pos = starts[i] + a - s - flushed
+                if pos + len(piece) > len(pending):
+                    grow = np.zeros((pos + len(piece) - len(pending),) + block.shape[1:], dtype=block.dtype)
+                    pending = np.concatenate([pending, grow])
+                pending[pos : pos + len(piece)] += piece
+                # Nothing is written before the next segment's start any more
+                ready = pos + len(piece)
+                if i < last:
+                    ready = min(ready, starts[i + 1] - flushed)
+                if ready > 0:
+                    yield pending[:ready]
+                    pending = pending[ready:]
+                    flushed += ready
+            if e > block_end:
+                break
+            i += 1
+        offset = block_end
+        if i > last:
+            break
+    if pending is not None and len(pending):
+        yield pending
+
+
+def cut_audio(samples, segments, sample_rate, overlap=0.0):
+    """
+    Keep only the given ranges of decoded audio, crossfading consecutive ones.
+
+    See iter_cut_audio, which this applies to an array held in memory.
+
+    Args:
+        samples (np.ndarray): Audio of shape (n,) or (n, channels).
+        segments (list of tuple): Sorted, non-overlapping (start, end) ranges in seconds.
+        sample_rate (int): Sample rate of `samples` in Hz.
+        overlap (float): Crossfade duration in seconds.
+
+    Returns:
+        np.ndarray: The cut audio, with the same dtype and channels as `samples`.
+    """
+    duration = len(samples) / sample_rate
+    segments = [(s, min(e, duration)) for s, e in segments]
+    blocks = list(iter_cut_audio([samples], segments, sample_rate, overlap))
+    return np.concatenate(blocks) if blocks else samples[:0].copy()
+
+
+def write_audio(path, blocks, sample_rate, channels):
+    """
+    Write streamed float audio to a file, choosing the codec from the extension.
+
+    WAV files are written directly as 16-bit PCM; other formats are encoded by
+    ffmpeg from float samples piped to its stdin.
+
+    Args:
+        path (str): Output path.
+        blocks (iterable of np.ndarray): Consecutive blocks of shape (n,) or (n, channels).
+        sample_rate (int): Sample rate in Hz.
+        channels (int): Number of channels.
+
+    Returns:
+        int: Number of sample frames written.
+
+    Raises:
+        RuntimeError: If ffmpeg fails to encode the file.
+    """
+    written = [0]
+
+    def counted():
+        for block in blocks:
+            written[0] += len(block)
+            yield block.reshape(len(block), channels)
+
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".wav":
+        write_wav(path, counted(), sample_rate, channels)
+        return written[0]
+    codec = AUDIO_CODECS.get(ext)
+    encoder = subprocess.Popen(
+        [ffmpeg_binary(), "-nostdin", "-y", "-v", "error", "-f", "f32le", "-ar", str(sample_rate),
+         "-ac", str(channels), "-i", "-"]
+        + (["-c:a", codec] if codec else []) + ["-vn", path],
+        stdin=subprocess.PIPE,
+    )
+    try:
+        for block in counted():
+            encoder.stdin.write(np.ascontiguousarray(block, dtype="<f4").tobytes())
+    finally:
+        encoder.stdin.close()
+        encoder.wait()
+    if encoder.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed to encode {path}")
+    return written[0]
+
+
+def export_audio(clip_path, segments, output_path, overlap=0.0):
+    """
+    Cut the audio track of a file and write it at the source's sample rate and channels.
+
+    The source is decoded, cut and encoded block by block in one pass.
+
+    Returns:
+        float: Duration of the written audio in seconds.
+    """
+    infos = probe_media(clip_path)
+    sample_rate = infos["audio_fps"] or OUTPUT_SAMPLE_RATE
+    channels = infos["audio_nchannels"] or 2
+    blocks = iter_pcm_blocks(clip_path, sample_rate=sample_rate, channels=channels, block_duration=WRITE_BLOCK_DURATION)
+    written = write_audio(output_path, iter_cut_audio(blocks, segments, sample_rate, overlap), sample_rate, channels)
+    return written / sample_rate
@@ -0,0 +1,184 @@
+import subprocess
+import tempfile
+import numpy as np
+from ffmpeg_tools import ffmpeg_binary
+
+# Default analysis format: 16 kHz float PCM, read from ffmpeg 10 seconds at a time
+STREAM_SAMPLE_RATE = 16000
+STREAM_CHANNELS = 2
+STREAM_BLOCK_DURATION = 10.0
+
+
+def iter_pcm_blocks(
+    path,
+    sample_rate=STREAM_SAMPLE_RATE,
+    channels=STREAM_CHANNELS,
+    block_duration=STREAM_BLOCK_DURATION,
+    follow_timeout=None,
+):
+    """
+    Stream the audio track of a media file as raw PCM blocks piped from ffmpeg.
+
+    Only one block is held in memory at a time, so memory use does not depend on
+    the length of the input.
+
+    With follow_timeout set, a file that is still being written is tailed: reads
+    at its end wait for more data, and the stream ends once the file has not grown
+    for follow_timeout seconds. The container must be readable while it is being
+    written (e.g. MKV or fragmented MP4).
+
+    Args:
+        path (str): Path to the input audio/video file.
+        sample_rate (int): Output sample rate in Hz.
+        channels (int): Number of output channels (ffmpeg up/down-mixes as needed).
+        block_duration (float): Duration of each yielded block in seconds.
+        follow_timeout (float): Seconds without growth after which a followed file
+            is considered finished, or None to read the file as it is.
+
+    Yields:
+        np.ndarray: float32 array of shape (n, channels); the last block may be shorter.
+
+    Raises:
+        RuntimeError: If ffmpeg fails, e.g. on a missing, truncated or unsupported
+            input; the message holds its stderr.
+    """
+    source = ["-i", path]
+    if follow_timeout is not None:
+        # The file protocol's follow mode retries at EOF until rw_timeout (in us) passes
+        source = ["-follow", "1", "-rw_timeout", str(int(follow_timeout * 1e6)), "-i", "file:" + path]
+    cmd = [
+        ffmpeg_binary(),
+        "-nostdin",
+        "-v", "error",
+        *source,
+        "-vn",
+        "-ac", str(channels),
+        "-ar", str(sample_rate),
+        "-f", "f32le",
+        "-",
+    ]
+    frame_bytes = 4 * channels
+    block_bytes = max(1, int(block_duration * sample_rate)) * frame_bytes
+    # A file rather than a pipe, so a chatty ffmpeg can never block on a full stderr pipe
+    errors = tempfile.TemporaryFile()
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=errors)
+    try:
+        pending = b""
+        while True:
+            data = proc.stdout.read(block_bytes - len(pending))
+            if not data:
+                break
+            pending += data
+            if len(pending) < block_bytes:
+                continue  # Short pipe read, keep filling the block
+            yield np.frombuffer(pending, dtype=np.float32).reshape(-1, channels)
+            pending = b""
+        usable = len(pending) - len(pending) % frame_bytes
+        # Check before yielding the tail, so a failed decode never looks complete
+        if proc.wait() != 0:
+            errors.seek(0)
+            message = errors.read().decode(errors="replace").strip()
+            raise RuntimeError(f"ffmpeg failed to decode {path}: {message}")
+        if usable:
+            yield np.frombuffer(pending[:usable], dtype=np.float32).reshape(-1, channels)
+    finally:
+        # Stop ffmpeg if the consumer bailed out early
+        if proc.poll() is None:
+            proc.kill()
+        proc.stdout.close()
+        proc.wait()
+        errors.close()
+
+
+def chunk_bounds(first_chunk, n_chunks, chunk_duration, sample_rate):
+    """Absolute sample boundaries of chunks [first_chunk, first_chunk + n_chunks]."""
+    idx = np.arange(first_chunk, first_chunk + n_chunks + 1)
+    return np.round(idx * chunk_duration * sample_rate).astype(np.int64)
+
+
+def levels_for_bounds(samples, bounds):
+    """
+    Compute peak and RMS for each [bounds[i], bounds[i + 1]) range of samples.
+
+    `peak` is the maximum sample value in each chunk across all channels. Empty
+    ranges get a peak of -inf and an RMS of 0.
+    """
+    samples = np.asarray(samples, dtype=np.float32)
+    if samples.ndim > 1:
+        # Collapse channels: peak is the max over all channels, energy is averaged.
+        # Reducing column by column is far faster than max/mean over a short axis 1.
+        peak_src = samples[:, 0].copy()
+        energy_src = samples[:, 0] ** 2
+        for c in range(1, samples.shape[1]):
+            np.maximum(peak_src, samples[:, c], out=peak_src)
+            energy_src += samples[:, c] ** 2
+        energy_src /= samples.shape[1]
+    else:
+        peak_src = samples
+        energy_src = samples**2
+    n_chunks = len(bounds) - 1
+    bounds = np.minimum(bounds, len(peak_src))
+    peak_src, energy_src = peak_src[: bounds[-1]], energy_src[: bounds[-1]]
+    starts, ends = bounds[:-1], bounds[1:]
+    valid = ends > starts
+    peak = np.full(n_chunks, -np.inf, dtype=np.float32)
+    rms = np.zeros(n_chunks, dtype=np.float32)
+    if valid.any():
+        # reduceat reduces [starts[i], starts[i + 1]) so only non-empty chunks are passed
+        idx = starts[valid]
+        peak[valid] = np.maximum.reduceat(peak_src, idx)
+        sums = np.add.reduceat(energy_src, idx)
+        rms[valid] = np.sqrt(sums / (ends[valid] - idx))
+    return peak, rms
+
+
+def chunk_levels(samples, sample_rate, chunk_duration, n_chunks):
+    """
+    Compute per-chunk loudness for a block of audio in one vectorized pass.
+
+    Args:
+        samples (np.ndarray): Audio samples, shape (n,) or (n, channels).
+        sample_rate (int): Sample rate of `samples` in Hz.
+        chunk_duration (float): Chunk duration in seconds.
+        n_chunks (int): Number of chunks to compute, starting at sample 0.
+
+    Returns:
+        tuple of np.ndarray: (peak, rms) arrays of length n_chunks.
+    """
+    return levels_for_bounds(samples, chunk_bounds(0, n_chunks, chunk_duration, sample_rate))
+
+
+def iter_chunk_levels(blocks, sample_rate, chunk_duration):
+    """
+    Turn a stream of audio blocks into a stream of per-chunk loudness values.
+
+    Blocks may have any length; samples that do not yet fill a chunk are carried
+    over to the next block. A trailing partial chunk is dropped.
+
+    Args:
+        blocks (iterable of np.ndarray): Consecutive audio blocks.
+        sample_rate (int): Sample rate of the blocks in Hz.
+        chunk_duration (float): Chunk duration in seconds.
+
+    Yields:
+        tuple: (first_chunk_index, peak, rms) for the chunks completed by each block.
+    """
+    carry = None
+    offset = 0  # Absolute sample index of carry[0]
+    next_chunk = 0
+    for block in blocks:
+        buf = block if carry is None or len(carry) == 0 else np.concatenate([carry, block])
+        available = offset + len(buf)
+        # Number of chunks that end inside the buffered samples
+        n_done = int(np.floor(available / (chunk_duration * sample_rate) + 1e-9)) - next_chunk
+        while n_done > 0 and chunk_bounds(next_chunk + n_done - 1, 1, chunk_duration, sample_rate)[-1] > available:
+            n_done -= 1
+        if n_done > 0:
+            bounds = chunk_bounds(next_chunk, n_done, chunk_duration, sample_rate)
+            peak, rms = levels_for_bounds(buf, bounds - offset)
+            yield next_chunk, peak, rms
+            next_chunk += n_done
+            consumed = int(bounds[-1] - offset)
+            buf = buf[consumed:]
+            offset += consumed
+        carry = buf
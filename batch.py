@@ -0,0 +1,313 @@
+from absl import app, flags
+import json
+import os
+import tempfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from analysis_cache import DEFAULT_CACHE_DIR, AnalysisCache, file_fingerprint
+from silence_remover import (
+    detect_loud_segments,
+    merge_close_segments,
+    pad_segments,
+    render_segments,
+)
+
+FLAGS = flags.FLAGS
+
+# Same naming as silence_remover.py: <input>_cleaned.mov
+OUTPUT_SUFFIX = "_cleaned.mov"
+VIDEO_EXTENSIONS = (".mov", ".mp4", ".m4v", ".mkv", ".avi", ".webm")
+STATE_FILE_NAME = ".vidcleanser-batch.json"
+
+
+def define_flags():
+    flags.DEFINE_string(
+        "input", None, "Directory of videos, or a manifest file listing one video path per line"
+    )
+    flags.DEFINE_string(
+        "output_dir", None, "Directory for the cleaned videos (default: next to each input)"
+    )
+    flags.DEFINE_string(
+        "state_path",
+        None,
+        f"Progress file used to resume a batch (default: {STATE_FILE_NAME} in the output "
+        "directory, or next to the input)",
+    )
+    flags.DEFINE_integer("analysis_workers", 2, "Number of files analyzed at the same time")
+    flags.DEFINE_integer("encode_workers", 1, "Number of files encoded at the same time")
+    flags.DEFINE_float("silence_threshold", 0.03, "Silence threshold (linear amplitude)")
+    flags.DEFINE_float("chunk_duration", 0.5, "Chunk duration in seconds")
+    flags.DEFINE_bool("merge", True, "Merge consecutive loud segments")
+    flags.DEFINE_float("merge_gap_threshold", 0.05, "Max gap to merge segments in seconds")
+    flags.DEFINE_float("padding", 0.2, "Padding duration in seconds")
+    flags.DEFINE_bool("fade_in_out", True, "Apply fade in/out effects")
+    flags.DEFINE_float("fade_duration", 0.3, "Fade in/out duration in seconds")
+    flags.DEFINE_bool(
+        "stream_copy",
+        False,
+        "Copy untouched GOPs from the source and only re-encode cut boundaries "
+        "(ignored when --fade_in_out is set)",
+    )
+    flags.DEFINE_bool(
+        "sequential_render",
+        False,
+        "Decode the source once, front to back, and pipe kept frames straight to the encoder",
+    )
+    flags.DEFINE_string("cache_dir", DEFAULT_CACHE_DIR, "Directory for cached analysis results")
+    flags.DEFINE_bool("cache", True, "Reuse cached analysis results for unchanged inputs")
+
+
+def find_inputs(path):
+    """
+    List the videos to process.
+
+    Args:
+        path (str): A directory (its videos are processed, cleaned outputs excluded)
+            or a manifest file with one path per line; blank lines and lines starting
+            with '#' are ignored and relative paths are relative to the manifest.
+
+    Returns:
+        list of str: Absolute input paths in a stable order.
+    """
+    if os.path.isdir(path):
+        names = sorted(os.listdir(path))
+        return [
+            os.path.abspath(os.path.join(path, name))
+            for name in names
+            if name.lower().endswith(VIDEO_EXTENSIONS)
+            and not name.endswith((OUTPUT_SUFFIX, partial_path_for(OUTPUT_SUFFIX)))
+        ]
+    base = os.path.dirname(os.path.abspath(path))
+    with open(path, "r") as f:
+        lines = [line.strip() for line in f]
+    return [os.path.abspath(os.path.join(base, line)) for line in lines if line and not line.startswith("#")]
+
+
+def output_path_for(input_path, output_dir=None):
+    """Path of the cleaned video for an input."""
+    if output_dir is None:
+        return input_path + OUTPUT_SUFFIX
+    return os.path.join(output_dir, os.path.basename(input_path) + OUTPUT_SUFFIX)
+
+
+def is_up_to_date(input_path, output_path):
+    """Whether the output exists and is newer than the input."""
+    return os.path.exists(output_path) and os.path.getmtime(output_path) >= os.path.getmtime(input_path)
+
+
+class BatchState:
+    """
+    Per-file progress of a batch, persisted to a JSON file after every change.
+
+    Each entry records the input's fingerprint and the analysis settings it was
+    analyzed with, so a resumed run only reuses work done on the same file with
+    the same settings.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        if os.path.exists(path):
+            with open(path, "r") as f:
+                self.entries = json.load(f)
+
+    def get(self, input_path, fingerprint, settings):
+        """Return the entry for input_path if it still matches, else None."""
+        entry = self.entries.get(input_path)
+        if entry and entry.get("fingerprint") == fingerprint and entry.get("settings") == settings:
+            return entry
+        return None
+
+    def update(self, input_path, **fields):
+        """Merge fields into the entry for input_path and save the state file."""
+        self.entries.setdefault(input_path, {}).update(fields)
+        self.save()
+
+    def save(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(self.entries, f, indent=2)
+        os.replace(tmp, self.path)
+
+
+def plan_batch(inputs, state, output_dir, settings):
+    """
+    Decide what each input still needs.
+
+    Returns:
+        list of tuple: (input_path, output_path, action, entry) where action is
+        "skip" (output is up to date, or the file has nothing to keep), "encode"
+        (analysis is recorded in the state) or "analyze". entry is the state entry,
+        or {"fingerprint": ...} for files to analyze.
+
+    The state entry decides first: an output only counts as finished when its
+    entry is "done". The output's mtime is only consulted for files the state
+    knows nothing about, e.g. outputs made before the state file existed.
+    """
+    plan = []
+    for input_path in inputs:
+        output_path = output_path_for(input_path, output_dir)
+        fingerprint = file_fingerprint(input_path)
+        entry = state.get(input_path, fingerprint, settings)
+        done = entry.get("status") == "done" if entry else is_up_to_date(input_path, output_path)
+        if done and os.path.exists(output_path):
+            plan.append((input_path, output_path, "skip", entry))
+        elif entry and entry.get("status") == "empty":
+            plan.append((input_path, output_path, "skip", entry))
+        elif entry and entry.get("segments") is not None:
+            plan.append((input_path, output_path, "encode", entry))
+        else:
+            plan.append((input_path, output_path, "analyze", {"fingerprint": fingerprint}))
+    return plan
+
+
+def analyze_file(job):
+    """Process-pool task: find the segments of a file to keep."""
+    from moviepy import VideoFileClip
+
+    input_path, settings, cache_dir = job
+    cache = AnalysisCache(cache_dir) if cache_dir else None
+    clip = VideoFileClip(input_path)
+    try:
+        segments = detect_loud_segments(
+            clip, settings["chunk_duration"], settings["silence_threshold"], cache
+        )
+        if settings["merge"]:
+            segments = merge_close_segments(segments, settings["merge_gap_threshold"])
+        return pad_segments(segments, settings["padding"], clip.duration)
+    finally:
+        clip.close()
+
+
+def partial_path_for(output_path):
+    """Path an output is rendered to before it is complete; keeps the extension for the muxer."""
+    base, ext = os.path.splitext(output_path)
+    return f"{base}.partial{ext}"
+
+
+def encode_file(job):
+    """
+    Process-pool task: render the kept segments of a file.
+
+    The output is rendered to a partial file and only moved into place once the
+    render succeeded, so an interrupted encode never leaves a truncated output.
+    """
+    input_path, segments, output_path, render_options, max_threads = job
+    partial_path = partial_path_for(output_path)
+    try:
+        render_segments(
+            input_path, segments, partial_path, max_threads=max_threads, raise_errors=True, **render_options
+        )
+        if not os.path.exists(partial_path):
+            raise RuntimeError(f"No output written to {output_path}")
+        os.replace(partial_path, output_path)
+    finally:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+
+
+def run_batch(plan, state, settings, render_options, analysis_workers, encode_workers, cache_dir=None):
+    """
+    Analyze and encode the planned files on two process pools.
+
+    A file is handed to the encode pool as soon as its analysis finishes, so both
+    stages run at the same time with their own concurrency. Progress is recorded in
+    `state` after every step.
+
+    Returns:
+        dict: Number of files per final status ("done", "skipped", "empty", "failed").
+    """
+    counts = {"done": 0, "skipped": 0, "empty": 0, "failed": 0}
+    outputs = {}
+    # Give every concurrent encode an equal share of the CPU
+    max_threads = max(1, (os.cpu_count() or 1) // max(1, encode_workers))
+    with ProcessPoolExecutor(max_workers=analysis_workers) as analysis_pool, ProcessPoolExecutor(
+        max_workers=encode_workers
+    ) as encode_pool:
+        pending = {}
+
+        def submit_encode(input_path, segments):
+            job = (input_path, segments, outputs[input_path], render_options, max_threads)
+            pending[encode_pool.submit(encode_file, job)] = ("encode", input_path)
+
+        for input_path, output_path, action, entry in plan:
+            outputs[input_path] = output_path
+            if action == "skip":
+                print(f"Skipping {input_path}: nothing left to do.")
+                counts["skipped"] += 1
+            elif action == "encode":
+                print(f"Resuming {input_path} at encoding.")
+                submit_encode(input_path, entry["segments"])
+            else:
+                job = (input_path, settings, cache_dir)
+                pending[analysis_pool.submit(analyze_file, job)] = ("analyze", input_path)
+                state.update(
+                    input_path, fingerprint=entry["fingerprint"], settings=settings, status="analyzing", segments=None
+                )
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage, input_path = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"Failed to {stage} {input_path}: {e}")
+                    state.update(input_path, status="failed", error=str(e))
+                    counts["failed"] += 1
+                    continue
+                if stage == "encode":
+                    print(f"Finished {outputs[input_path]}")
+                    state.update(input_path, status="done", output=outputs[input_path], error=None)
+                    counts["done"] += 1
+                elif not result:
+                    print(f"No loud segments in {input_path}.")
+                    state.update(input_path, status="empty", segments=result)
+                    counts["empty"] += 1
+                else:
+                    state.update(input_path, status="analyzed", segments=result)
+                    submit_encode(input_path, result)
+    return counts
+
+
+def main(argv):
+    inputs = find_inputs(FLAGS.input)
+    print(f"Found {len(inputs)} input files.")
+    if FLAGS.output_dir:
+        os.makedirs(FLAGS.output_dir, exist_ok=True)
+    state_dir = FLAGS.output_dir or (FLAGS.input if os.path.isdir(FLAGS.input) else os.path.dirname(FLAGS.input))
+    state = BatchState(FLAGS.state_path or os.path.join(state_dir, STATE_FILE_NAME))
+
+    settings = {
+        "silence_threshold": FLAGS.silence_threshold,
+        "chunk_duration": FLAGS.chunk_duration,
+        "merge": FLAGS.merge,
+        "merge_gap_threshold": FLAGS.merge_gap_threshold,
+        "padding": FLAGS.padding,
+    }
+    render_options = {
+        "fade": FLAGS.fade_in_out,
+        "fade_duration": FLAGS.fade_duration,
+        "stream_copy": FLAGS.stream_copy,
+        "sequential_render": FLAGS.sequential_render,
+    }
+    plan = plan_batch(inputs, state, FLAGS.output_dir, settings)
+    counts = run_batch(
+        plan,
+        state,
+        settings,
+        render_options,
+        FLAGS.analysis_workers,
+        FLAGS.encode_workers,
+        FLAGS.cache_dir if FLAGS.cache else None,
+    )
+    print(
+        f"Batch finished: {counts['done']} encoded, {counts['skipped']} skipped, "
+        f"{counts['empty']} without loud segments, {counts['failed']} failed."
+    )
+
+
+if __name__ == "__main__":
+    define_flags()
+    app.run(main)
@@ -0,0 +1,283 @@
+from absl import app, flags
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import numpy as np
+from analysis_cache import DEFAULT_CACHE_DIR
+from ffmpeg_tools import ffmpeg_binary
+from filler_remover import detect_filler_segments
+from intervals import IntervalSet
+from silence_remover import (
+    crossfade_sequence,
+    detect_loud_segments,
+    merge_close_segments,
+    pad_segments,
+    render_segments,
+)
+from transcript_index import TranscriptIndex
+
+FLAGS = flags.FLAGS
+
+# Synthetic media: a tiny gray video with 16 kHz mono audio of tone bursts over faint noise
+BENCH_SAMPLE_RATE = 16000
+BENCH_FPS = 10
+BENCH_SIZE = "64x36"
+TONE_HZ = 440.0
+TONE_AMPLITUDE = 0.3
+NOISE_AMPLITUDE = 0.005
+DEFAULT_FILLERS = ["um", "uh", "ah", "like", "you know", "i mean", "so"]
+
+
+def define_flags():
+    flags.DEFINE_string("output", "bench_results.json", "Where `run` writes its results")
+    flags.DEFINE_string("baseline", None, "Results to compare against after `run`")
+    flags.DEFINE_float("tolerance", 0.25, "Relative slowdown reported as a regression")
+    flags.DEFINE_list("durations", ["60", "600", "7200"], "Lengths of the synthetic videos in seconds")
+    flags.DEFINE_list("densities", ["2", "20"], "Loud segments per minute of synthetic video")
+    flags.DEFINE_list("transcript_words", ["10000", "1000000"], "Sizes of the synthetic transcripts")
+    flags.DEFINE_integer("repeats", 3, "Runs per benchmark; the fastest one is reported")
+    flags.DEFINE_float("export_max_duration", 60, "Only export synthetic videos up to this length")
+    flags.DEFINE_string(
+        "media_dir", os.path.join(DEFAULT_CACHE_DIR, "bench"), "Directory for the generated media"
+    )
+
+
+def synthetic_loud_intervals(duration, per_minute, seed=0):
+    """Random, non-overlapping loud intervals of 0.3 to 3 seconds, per_minute on average."""
+    rng = np.random.default_rng(seed)
+    n = int(duration / 60 * per_minute)
+    starts = np.sort(rng.uniform(0, duration, n))
+    return IntervalSet(starts, starts + rng.uniform(0.3, 3.0, n)).merge().clip(0, duration)
+
+
+def iter_synthetic_audio(duration, loud, sample_rate=BENCH_SAMPLE_RATE, block_duration=10.0, seed=0):
+    """
+    Generate the audio of a synthetic video block by block.
+
+    Yields:
+        np.ndarray: float32 mono samples; a tone inside the `loud` intervals and
+        faint noise elsewhere.
+    """
+    rng = np.random.default_rng(seed)
+    total = int(duration * sample_rate)
+    step = int(block_duration * sample_rate)
+    for first in range(0, total, step):
+        t = np.arange(first, min(first + step, total)) / sample_rate
+        block = rng.uniform(-NOISE_AMPLITUDE, NOISE_AMPLITUDE, len(t))
+        tone = loud.contains(t)
+        block[tone] = TONE_AMPLITUDE * np.sin(2 * np.pi * TONE_HZ * t[tone])
+        yield block.astype(np.float32)
+
+
+def make_synthetic_video(path, duration, per_minute, seed=0):
+    """Encode a synthetic video whose audio follows synthetic_loud_intervals."""
+    loud = synthetic_loud_intervals(duration, per_minute, seed)
+    cmd = [
+        ffmpeg_binary(), "-y", "-v", "error",
+        "-f", "lavfi", "-i", f"color=c=gray:s={BENCH_SIZE}:r={BENCH_FPS}:d={duration}",
+        "-f", "f32le", "-ar", str(BENCH_SAMPLE_RATE), "-ac", "1", "-i", "-",
+        "-map", "0:v", "-map", "1:a",
+        "-c:v", "libx264", "-preset", "ultrafast", "-pix_fmt", "yuv420p",
+        "-c:a", "aac", "-shortest", path,
+    ]
+    proc = subprocess.Popen(cmd, stdin=subprocess.PIPE)
+    try:
+        for block in iter_synthetic_audio(duration, loud, seed=seed):
+            proc.stdin.write(block.tobytes())
+    finally:
+        proc.stdin.close()
+        proc.wait()
+    if proc.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed to generate {path}")
+
+
+def synthetic_media(media_dir, duration, per_minute, seed=0):
+    """Path of a synthetic video, generated on first use."""
+    os.makedirs(media_dir, exist_ok=True)
+    path = os.path.join(media_dir, f"synthetic-{duration:g}s-{per_minute:g}pm-{seed}.mp4")
+    if not os.path.exists(path):
+        print(f"Generating {path}...")
+        make_synthetic_video(path + ".tmp.mp4", duration, per_minute, seed)
+        os.replace(path + ".tmp.mp4", path)
+    return path
+
+
+def synthetic_transcript(n_words, filler_rate=0.05, vocab_size=5000, seed=0):
+    """
+    Whisper-style transcript of n_words random words with fillers mixed in at filler_rate.
+
+    Multi-word fillers such as "you know" take one word entry per word, as Whisper
+    emits them.
+    """
+    rng = np.random.default_rng(seed)
+    items = np.array([f"word{i}" for i in range(vocab_size)], dtype=object)[rng.integers(0, vocab_size, n_words)]
+    is_filler = rng.random(n_words) < filler_rate
+    items[is_filler] = np.array(DEFAULT_FILLERS, dtype=object)[rng.integers(0, len(DEFAULT_FILLERS), is_filler.sum())]
+    words = np.array([w for item in items for w in item.split()][:n_words])
+    starts = np.arange(n_words) * 0.4
+    segments = []
+    for first in range(0, n_words, 20):
+        segments.append(
+            {
+                "words": [
+                    {"word": " " + w, "start": s, "end": s + 0.3}
+                    for w, s in zip(words[first : first + 20].tolist(), starts[first : first + 20].tolist())
+                ]
+            }
+        )
+    return {"segments": segments}
+
+
+def time_best(fn, repeats):
+    """Fastest wall time of `repeats` calls to fn."""
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_benchmarks(durations, densities, transcript_words, repeats, media_dir, export_max_duration):
+    """
+    Time the main stages on synthetic media and transcripts.
+
+    Returns:
+        dict: Benchmark name -> {"seconds": fastest wall time, "params": {...}}.
+    """
+    from moviepy import VideoFileClip
+
+    results = {}
+
+    def record(name, seconds, **params):
+        print(f"{name}: {seconds:.4f}s")
+        results[name] = {"seconds": seconds, "params": params}
+
+    for duration in durations:
+        for per_minute in densities:
+            path = synthetic_media(media_dir, duration, per_minute)
+            tag = f"{duration:g}s/{per_minute:g}pm"
+            clip = VideoFileClip(path)
+            try:
+                found = []
+                record(
+                    f"detect_loud_segments/{tag}",
+                    time_best(lambda: found.append(detect_loud_segments(clip, 0.5, 0.03)), repeats),
+                    duration=duration,
+                    per_minute=per_minute,
+                )
+                chunks = found[-1]
+                merged = []
+                record(
+                    f"merge_pad/{tag}",
+                    time_best(
+                        lambda: merged.append(pad_segments(merge_close_segments(chunks, 0.05), 0.2, clip.duration)),
+                        repeats,
+                    ),
+                    segments=len(chunks),
+                )
+                segments = merged[-1]
+                if not segments:
+                    continue
+
+                def build_and_sample():
+                    subclips = [clip.subclipped(s, e) for s, e in segments]
+                    video = crossfade_sequence(subclips, 0.3)
+                    for t in np.linspace(0, video.duration, 50, endpoint=False):
+                        video.get_frame(t)
+
+                record(f"crossfade_sequence/{tag}", time_best(build_and_sample, repeats), segments=len(segments))
+            finally:
+                clip.close()
+            if duration <= export_max_duration:
+                out = os.path.join(media_dir, "export.mp4")
+                record(
+                    f"export/{tag}",
+                    time_best(lambda: render_segments(path, segments, out, True, 0.3), 1),
+                    segments=len(segments),
+                )
+                os.remove(out)
+
+    for n_words in transcript_words:
+        index = TranscriptIndex.from_whisper(synthetic_transcript(n_words))
+        record(
+            f"detect_filler_segments/{n_words}",
+            time_best(lambda: detect_filler_segments(index, DEFAULT_FILLERS), repeats),
+            words=n_words,
+        )
+    return results
+
+
+def compare_results(baseline, current, tolerance):
+    """
+    Compare two result sets.
+
+    Returns:
+        list of tuple: (name, baseline_seconds, current_seconds) of every benchmark
+        that got slower by more than `tolerance` (a fraction, e.g. 0.25 for 25%).
+    """
+    regressions = []
+    for name in sorted(set(baseline) & set(current)):
+        before, after = baseline[name]["seconds"], current[name]["seconds"]
+        if after > before * (1 + tolerance):
+            regressions.append((name, before, after))
+    return regressions
+
+
+def report_comparison(baseline, current, tolerance):
+    """Print a comparison table and return the number of regressions."""
+    for name in sorted(set(baseline) & set(current)):
+        before, after = baseline[name]["seconds"], current[name]["seconds"]
+        print(f"{name}: {before:.4f}s -> {after:.4f}s ({after / before:.2f}x)")
+    regressions = compare_results(baseline, current, tolerance)
+    for name, before, after in regressions:
+        print(f"REGRESSION {name}: {after / before:.2f}x slower than the baseline")
+    if not regressions:
+        print(f"No regressions beyond {tolerance:.0%}.")
+    return len(regressions)
+
+
+def load_results(path):
+    with open(path, "r") as f:
+        return json.load(f)["results"]
+
+
+def main(argv):
+    command = argv[1] if len(argv) > 1 else "run"
+    if command == "compare":
+        if len(argv) != 4:
+            raise app.UsageError("Usage: benchmark.py compare BASELINE.json CURRENT.json")
+        regressions = report_comparison(load_results(argv[2]), load_results(argv[3]), FLAGS.tolerance)
+        sys.exit(1 if regressions else 0)
+    if command != "run":
+        raise app.UsageError(f"Unknown command {command!r}; use `run` or `compare`")
+
+    results = run_benchmarks(
+        [float(d) for d in FLAGS.durations],
+        [float(d) for d in FLAGS.densities],
+        [int(n) for n in FLAGS.transcript_words],
+        FLAGS.repeats,
+        FLAGS.media_dir,
+        FLAGS.export_max_duration,
+    )
+    meta = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": np.__version__,
+        "cpu_count": os.cpu_count(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    with open(FLAGS.output, "w") as f:
+        json.dump({"meta": meta, "results": results}, f, indent=2)
+    print(f"Results written to {FLAGS.output}")
+    if FLAGS.baseline:
+        regressions = report_comparison(load_results(FLAGS.baseline), results, FLAGS.tolerance)
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    define_flags()
+    app.run(main)
@@ -1,108 +1,140 @@
-clip_path = "/Users/ari/Movies/2025-05-17 19-32-05.mov"
-
-import tensorflow as tf
-import tensorflow_hub as hub
-import librosa
+from absl import app, flags
+import csv
 import numpy as np
-import requests # For fetching the class map
+from decoded_audio import DECODED_SAMPLE_RATE, load_decoded_audio
+from intervals import IntervalSet
+
+FLAGS = flags.FLAGS
+
+YAMNET_MODEL_URL = 'https://tfhub.dev/google/yamnet/1'
+# YAMNet scores patches of 0.96 seconds with a hop of 0.48 seconds.
+FRAME_HOP_SECONDS = 0.48
+FRAME_WINDOW_SECONDS = 0.96
+# Shortest input YAMNet turns into one patch: the patch plus one 25 ms STFT window
+# minus its 10 ms hop. A window of this plus (n - 1) hops yields exactly n patches.
+MIN_WAVEFORM_SECONDS = 0.975
+# Patches scored per model call (about 5 minutes of audio)
+BATCH_FRAMES = 600
+
+
+def define_flags():
+    flags.DEFINE_string("clip_path", None, "Path to the input audio/video file")
+    flags.DEFINE_string(
+        "class_map", None, "YAMNet class map CSV (default: the one bundled with the model)"
+    )
+    flags.DEFINE_float("min_score", 0.0, "Minimum YAMNet score of a cough frame")
+
+
+def load_class_names(class_map_path):
+    """Read the display names of YAMNet's 521 classes from its class map CSV."""
+    with open(class_map_path, newline="") as f:
+        rows = csv.reader(f)
+        next(rows)  # Header: index, mid, display_name
+        return [row[2] for row in rows]
+
+
+def load_yamnet(class_map_path=None):
+    """
+    Load YAMNet from TensorFlow Hub together with its class names.
+
+    The class names are read from the class map CSV bundled with the model, so
+    nothing is fetched besides the (cached) model itself.
 
-def detect_cough_in_audio(audio_file_path=clip_path):
+    Returns:
+        tuple: (model, class_names)
     """
-    Detects cough and throat clearing sounds in an audio file using YAMNet.
+    # TensorFlow is only imported when the cough detector is actually used
+    import tensorflow_hub as hub
+
+    model = hub.load(YAMNET_MODEL_URL)
+    if class_map_path is None:
+        class_map_path = model.class_map_path().numpy().decode()
+    return model, load_class_names(class_map_path)
+
+
+def is_cough_class(class_name):
+    """Whether a YAMNet class is a cough or throat sound (e.g. "Cough", "Throat clearing")."""
+    return "cough" in class_name.lower() or "throat" in class_name.lower()
+
+
+def iter_score_batches(audio, model, batch_frames=BATCH_FRAMES, sample_rate=DECODED_SAMPLE_RATE):
+    """
+    Stream audio through YAMNet in windows of batch_frames patches.
+
+    Windows start on patch boundaries and overlap by the part of a patch that
+    spills into the next window, so the scores are the same as for the whole file
+    while only one window of samples is resident at a time.
+
+    Yields:
+        tuple: (first_frame, scores) with scores of shape (n_frames, n_classes).
+    """
+    hop = int(round(FRAME_HOP_SECONDS * sample_rate))
+    span = (batch_frames - 1) * hop + int(round(MIN_WAVEFORM_SECONDS * sample_rate))
+    first = 0
+    while True:
+        start = first * hop
+        window = np.asarray(audio[start : start + span], dtype=np.float32)
+        scores, _, _ = model(window)
+        scores = np.asarray(scores)
+        yield first, scores
+        first += len(scores)
+        if start + span >= len(audio):
+            return
+
+
+def cough_frame_mask(scores, cough_classes, min_score=0.0):
+    """Frames whose top class is one of cough_classes with a score of at least min_score."""
+    top = scores.argmax(axis=1)
+    return np.isin(top, cough_classes) & (scores[np.arange(len(scores)), top] >= min_score)
+
+
+def detect_cough_segments(audio, model, class_names, min_score=0.0, batch_frames=BATCH_FRAMES):
+    """
+    Find coughs and throat clearing in 16 kHz mono audio.
+
+    Args:
+        audio (np.ndarray): Samples in [-1.0, 1.0], e.g. from load_decoded_audio.
+        model: Loaded YAMNet model.
+        class_names (list of str): YAMNet class display names.
+        min_score (float): Minimum score of the top class for a frame to count.
+        batch_frames (int): Patches scored per model call.
+
+    Returns:
+        list of tuple: Merged (start, end) time ranges to cut, in seconds.
+    """
+    cough_classes = [i for i, name in enumerate(class_names) if is_cough_class(name)]
+    frames = []
+    for first, scores in iter_score_batches(audio, model, batch_frames):
+        frames.append(np.flatnonzero(cough_frame_mask(scores, cough_classes, min_score)) + first)
+    starts = np.concatenate(frames) * FRAME_HOP_SECONDS
+    return IntervalSet(starts, starts + FRAME_WINDOW_SECONDS).merge().to_list()
+
+
+def detect_cough_in_audio(audio_file_path, class_map_path=None, min_score=0.0):
+    """
+    Detects cough and throat clearing sounds in an audio or video file using YAMNet.
+
+    Returns:
+        list of tuple: Merged (start, end) time ranges of the coughs, in seconds.
     """
     print("Loading YAMNet model...")
-    try:
-        # Load YAMNet model from TensorFlow Hub
-        # YAMNet is a pre-trained deep net that predicts 521 audio event classes.
-        model = hub.load('https://tfhub.dev/google/yamnet/1')
-    except Exception as e:
-        print(f"Error loading YAMNet model: {e}")
-        return
-
-    print(f"Loading audio file: {audio_file_path}...")
-    try:
-        # Load audio file using librosa
-        # YAMNet expects 16 kHz, mono audio. librosa.load handles resampling and mono conversion by default.
-        # It also normalizes the audio to the range [-1.0, 1.0].
-        waveform, sr = librosa.load(audio_file_path, sr=16000, mono=True)
-    except FileNotFoundError:
-        print(f"Error: Audio file not found at {audio_file_path}")
-        return
-    except Exception as e:
-        print(f"Error loading audio file: {e}")
-        return
-
-    if waveform.size == 0:
-        print("Error: Audio file is empty.")
-        return
-
-    print("Running inference with YAMNet...")
-    try:
-        # Perform inference. The model returns scores, embeddings, and the log mel spectrogram.
-        # Scores are per-frame predictions for 521 classes.
-        # Waveform needs to be a 1D float32 Tensor or NumPy array.
-        scores, embeddings, spectrogram = model(waveform)
-    except Exception as e:
-        print(f"Error during model inference: {e}")
-        return
-
-    # Scores are logits (uncalibrated log-odds).
-    # To get probabilities, you can apply tf.sigmoid(scores).
-
-    print("Loading class labels...")
-    labels_csv_url = "https://raw.githubusercontent.com/tensorflow/models/master/research/audioset/yamnet/yamnet_class_map.csv"
-    try:
-        response = requests.get(labels_csv_url)
-        response.raise_for_status() # Raise an exception for HTTP errors
-        labels_raw = response.text
-        # The CSV has columns: index, mid, display_name
-        # We need the display_name. Skip the header row.
-        class_names = [line.split(',')[2].strip().strip('"') for line in labels_raw.splitlines()][1:]
-    except requests.exceptions.RequestException as e:
-        print(f"Error fetching class labels: {e}")
-        return
-    except Exception as e:
-        print(f"Error parsing class labels: {e}")
-        return
-
-    # YAMNet processes audio in frames of 0.96 seconds with a hop of 0.48 seconds.
-    # Therefore, one set of scores is produced every 0.48 seconds.
-    frame_hop_seconds = 0.48
-    # Create an array of timestamps corresponding to the center of each frame's analysis window
-    # The first score corresponds to analysis centered roughly at 0.48s (window 0 to 0.96s)
-    # More accurately, the timestamp represents the beginning of the hop that leads to that score.
-    times = np.arange(len(scores)) * frame_hop_seconds
-
-    print(f"\n--- Detection Results ---")
-    print(f"Audio Duration: {len(waveform)/sr:.2f} seconds")
-    print(f"Number of YAMNet frames analyzed: {len(scores)}")
-
-    found_event_count = 0
-    for i, frame_scores in enumerate(scores):
-        # Find the class with the highest score for this frame
-        top_class_index = tf.argmax(frame_scores).numpy()
-        top_class_name = class_names[top_class_index]
-        top_class_score_logit = frame_scores[top_class_index].numpy()
-        top_class_score_prob = tf.sigmoid(top_class_score_logit).numpy() # Convert logit to probability
-
-
-        # Check if the top class is 'Cough' or related to throat sounds
-        # You can adjust the keywords or add more specific class checks if needed.
-        # Example YAMNet classes: "Cough", "Throat clearing", "Snoring"
-        if "cough" in top_class_name.lower() or "throat" in top_class_name.lower():
-            # The timestamp 'times[i]' marks the beginning of the 0.48s hop
-            # for which this score was generated. The actual event could be within
-            # the 0.96s window centered around (times[i] + 0.48s / 2) for a more precise center,
-            # or simply stated to occur around this time.
-            print(f"Frame {i}: Possible event '{top_class_name}' detected around {times[i]:.2f}s (Score: {top_class_score_prob:.2f})")
-            found_event_count += 1
-
-    if found_event_count == 0:
-        print("No cough or throat clearing events detected as the top class in any frame.")
+    model, class_names = load_yamnet(class_map_path)
+    # YAMNet expects 16 kHz mono audio, which is the decode shared with the other detectors
+    audio = load_decoded_audio(audio_file_path)
+    print(f"Audio Duration: {len(audio) / DECODED_SAMPLE_RATE:.2f} seconds")
+    return detect_cough_segments(audio, model, class_names, min_score)
+
+
+def main(argv):
+    segments = detect_cough_in_audio(FLAGS.clip_path, FLAGS.class_map, FLAGS.min_score)
+    for start, end in segments:
+        print(f"Cough: {start:.2f} - {end:.2f}")
+    if not segments:
+        print("No cough or throat clearing events detected.")
     else:
-        print(f"\nFound {found_event_count} potential event frame(s).")
+        print(f"\nFound {len(segments)} cough segment(s).")
+
 
 if __name__ == '__main__':
-    # Replace "your_audio_file.wav" with the path to your audio file
-    # Ensure the audio file is accessible by the script.
-    detect_cough_in_audio(audio_file_path="input.wav")
\ No newline at end of file
+    define_flags()
+    app.run(main)
@@ -0,0 +1,103 @@
+import json
+import os
+import tempfile
+import numpy as np
+from analysis_cache import file_fingerprint
+from audio_stream import iter_pcm_blocks
+from profiling import stage
+
+# Whisper and YAMNet analyze 16 kHz mono audio
+DECODED_SAMPLE_RATE = 16000
+DECODE_BLOCK_DURATION = 10.0
+
+
+def decoded_audio_paths(path, sample_rate=DECODED_SAMPLE_RATE):
+    """Paths of the decoded .npy stored next to a source file and of its metadata."""
+    base = f"{path}.{sample_rate}hz"
+    return base + ".npy", base + ".json"
+
+
+def decode_audio(path, sample_rate=DECODED_SAMPLE_RATE):
+    """Decode the audio track of a file into an in-memory mono float32 array."""
+    with stage("decode") as s:
+        blocks = [b.reshape(-1) for b in iter_pcm_blocks(path, sample_rate=sample_rate, channels=1)]
+        samples = np.concatenate(blocks) if blocks else np.zeros(0, np.float32)
+        s["media_seconds"] = len(samples) / sample_rate
+    return samples
+
+
+def write_decoded_audio(path, npy_path, sample_rate=DECODED_SAMPLE_RATE):
+    """
+    Stream the audio of a file into a mono float32 .npy without holding it in memory.
+
+    The header is written for an empty array and rewritten with the final length
+    once decoding ends; NumPy pads headers so the length fits in place.
+    """
+    directory = os.path.dirname(os.path.abspath(npy_path))
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f, stage("decode") as s:
+            header = {"descr": "<f4", "fortran_order": False, "shape": (0,)}
+            np.lib.format.write_array_header_1_0(f, header)
+            data_start = f.tell()
+            n = 0
+            for block in iter_pcm_blocks(
+                path, sample_rate=sample_rate, channels=1, block_duration=DECODE_BLOCK_DURATION
+            ):
+                f.write(block.astype("<f4", copy=False).tobytes())
+                n += len(block)
+            f.seek(0)
+            np.lib.format.write_array_header_1_0(f, dict(header, shape=(n,)))
+            if f.tell() != data_start:
+                raise RuntimeError("Decoded audio header changed size")
+            s["media_seconds"] = n / sample_rate
+        os.chmod(tmp, 0o644)  # mkstemp creates files readable by the owner only
+        os.replace(tmp, npy_path)
+    except BaseException:
+        os.remove(tmp)
+        raise
+
+
+def load_decoded_audio(path, sample_rate=DECODED_SAMPLE_RATE):
+    """
+    Return the mono audio of a file as a read-only memory-mapped array.
+
+    The first call decodes the file once to `<path>.<rate>hz.npy`; later calls from
+    any detector map that file instead of decoding again, and slices of the result
+    are zero-copy views. The decode is redone when the source's fingerprint no
+    longer matches. If the source's directory is not writable, the audio is
+    decoded into memory instead.
+
+    Args:
+        path (str): Path to the source audio/video file.
+        sample_rate (int): Sample rate of the decode in Hz.
+
+    Returns:
+        np.ndarray: float32 samples of shape (n,).
+    """
+    npy_path, meta_path = decoded_audio_paths(path, sample_rate)
+    fingerprint = file_fingerprint(path)
+    try:
+        with open(meta_path, "r") as f:
+            fresh = json.load(f).get("source") == fingerprint
+    except (OSError, ValueError):
+        fresh = False
+    if fresh and os.path.exists(npy_path):
+        return np.load(npy_path, mmap_mode="r")
+
+    print(f"Decoding audio to {npy_path}...")
+    try:
+        write_decoded_audio(path, npy_path, sample_rate)
+        with open(meta_path, "w") as f:
+            json.dump({"source": fingerprint, "sample_rate": sample_rate}, f)
+    except OSError as e:
+        print(f"Warning: Could not store decoded audio next to {path}: {e}")
+        return decode_audio(path, sample_rate)
+    return np.load(npy_path, mmap_mode="r")
+
+
+def iter_array_blocks(samples, sample_rate, block_duration=DECODE_BLOCK_DURATION):
+    """Yield consecutive views of block_duration seconds from an array of samples."""
+    step = max(1, int(block_duration * sample_rate))
+    for i in range(0, len(samples), step):
+        yield samples[i : i + step]
@@ -0,0 +1,126 @@
+import json
+import os
+import re
+from analysis_cache import file_fingerprint
+
+EDIT_LIST_VERSION = 1
+# Timecode rate of EDLs for sources without video frames (audio-only inputs)
+NOMINAL_EDL_FPS = 30
+# Timecodes of an EDL: HH:MM:SS:FF
+TIMECODE_PATTERN = re.compile(r"^(\d+):(\d\d):(\d\d)[:;](\d\d)$")
+
+
+def timecode(seconds, fps):
+    """Format seconds as a non-drop-frame HH:MM:SS:FF timecode at a whole frame rate."""
+    return frames_timecode(int(round(seconds * fps)), fps)
+
+
+def frames_timecode(frames, fps):
+    """Format a frame count as a non-drop-frame HH:MM:SS:FF timecode."""
+    rate = round(fps)
+    return (
+        f"{frames // (3600 * rate):02d}:{frames // (60 * rate) % 60:02d}:"
+        f"{frames // rate % 60:02d}:{frames % rate:02d}"
+    )
+
+
+def parse_timecode(text, fps):
+    """Parse an HH:MM:SS:FF timecode back into seconds."""
+    m = TIMECODE_PATTERN.match(text)
+    if not m:
+        raise ValueError(f"Invalid timecode: {text}")
+    hours, minutes, secs, frames = (int(g) for g in m.groups())
+    rate = round(fps)
+    return ((hours * 3600 + minutes * 60 + secs) * rate + frames) / fps
+
+
+def format_edl(segments, source, fps, title="VidCleanser"):
+    """
+    Describe kept segments as a CMX 3600 EDL of hard cuts.
+
+    Every segment becomes one event; record times follow each other without gaps.
+    Times are rounded to whole frames.
+    """
+    lines = [f"TITLE: {title}", "FCM: NON-DROP FRAME", ""]
+    record = 0
+    for n, (start, end) in enumerate(segments, start=1):
+        first, last = int(round(start * fps)), int(round(end * fps))
+        lines.append(
+            f"{n:03d}  AX       AA/V  C        {frames_timecode(first, fps)} {frames_timecode(last, fps)} "
+            f"{frames_timecode(record, fps)} {frames_timecode(record + last - first, fps)}"
+        )
+        lines.append(f"* FROM CLIP NAME: {os.path.basename(source)}")
+        lines.append("")
+        record += last - first
+    return "\n".join(lines)
+
+
+def parse_edl(text, fps):
+    """
+    Read the source ranges of the events of a CMX 3600 EDL.
+
+    Returns:
+        list of tuple: (start, end) source ranges in seconds, in event order.
+    """
+    segments = []
+    for line in text.splitlines():
+        fields = line.split()
+        if len(fields) >= 8 and fields[0].isdigit():
+            segments.append((parse_timecode(fields[-4], fps), parse_timecode(fields[-3], fps)))
+    return segments
+
+
+def write_edit_list(path, segments, source, settings=None, fps=None):
+    """
+    Write kept segments for reuse by a later render.
+
+    Paths ending in .edl are written as a CMX 3600 EDL (for editing software; timed
+    in frames of fps, or of NOMINAL_EDL_FPS for sources without video), anything
+    else as JSON that also records the source's fingerprint and the settings the
+    segments were found with.
+    """
+    if path.lower().endswith(".edl"):
+        if not fps:
+            print(f"{source} has no video frame rate; timing the EDL at a nominal {NOMINAL_EDL_FPS} fps.")
+            fps = NOMINAL_EDL_FPS
+        text = format_edl(segments, source, fps)
+    else:
+        text = json.dumps(
+            {
+                "version": EDIT_LIST_VERSION,
+                "source": os.path.abspath(source),
+                "fingerprint": file_fingerprint(source),
+                "settings": settings or {},
+                "segments": [[s, e] for s, e in segments],
+            },
+            indent=2,
+        )
+    with open(path, "w") as f:
+        f.write(text)
+    print(f"Edit list written to {path}")
+
+
+def read_edit_list(path, fps=None):
+    """
+    Read an edit list written by write_edit_list.
+
+    Args:
+        path (str): JSON or .edl file.
+        fps (float): Source frame rate, needed to read EDL timecodes (None for
+            sources without video, whose EDLs use NOMINAL_EDL_FPS).
+
+    Returns:
+        dict: "segments" (list of (start, end) tuples), plus "source", "fingerprint"
+        and "settings" for JSON edit lists (None for EDLs).
+    """
+    with open(path, "r") as f:
+        text = f.read()
+    if path.lower().endswith(".edl"):
+        return {"segments": parse_edl(text, fps or NOMINAL_EDL_FPS), "source": None, "fingerprint": None, "settings": None}
+    data = json.loads(text)
+    return {
+        "segments": [tuple(s) for s in data["segments"]],
+        "source": data.get("source"),
+        "fingerprint": data.get("fingerprint"),
+        "settings": data.get("settings"),
+    }
@@ -0,0 +1,158 @@
+import functools
+import os
+import re
+import shutil
+import subprocess
+
+# Channel counts of the layout names ffmpeg prints in its stream summary
+CHANNEL_LAYOUTS = {
+    "mono": 1, "stereo": 2, "2.1": 3, "3.0": 3, "quad": 4, "4.0": 4, "4.1": 5,
+    "5.0": 5, "5.1": 6, "6.0": 6, "6.1": 7, "7.0": 7, "7.1": 8,
+}
+
+
+@functools.lru_cache(maxsize=None)
+def ffmpeg_binary():
+    """
+    Path of the ffmpeg binary, resolved like moviepy.config does.
+
+    Importing moviepy.config imports all of moviepy (and IPython, when installed),
+    which would dominate the startup of commands that only need ffmpeg.
+    """
+    binary = os.getenv("FFMPEG_BINARY", "ffmpeg-imageio")
+    if binary == "ffmpeg-imageio":
+        import imageio_ffmpeg
+
+        return imageio_ffmpeg.get_ffmpeg_exe()
+    if binary == "auto-detect":
+        return shutil.which("ffmpeg") or "ffmpeg"
+    return binary
+
+
+def run_ffmpeg(args):
+    """
+    Run ffmpeg with the given arguments and raise on failure.
+
+    Args:
+        args (list of str): Arguments passed after the ffmpeg binary.
+
+    Raises:
+        RuntimeError: If ffmpeg exits with a non-zero status; the message holds its stderr.
+    """
+    cmd = [ffmpeg_binary(), "-nostdin", "-y", "-v", "error"] + [str(a) for a in args]
+    proc = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    if proc.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed: {proc.stderr.decode(errors='replace').strip()}")
+
+
+def probe_video(path):
+    """
+    Find the keyframe times and pixel format of the first video stream.
+
+    Only keyframes are decoded (-skip_frame nokey), so this is cheap even for
+    long recordings.
+
+    Returns:
+        tuple: (keyframe_times, pix_fmt) where keyframe_times is a sorted list of
+        seconds and pix_fmt is a string such as "yuv420p" (None if unknown).
+    """
+    cmd = [
+        ffmpeg_binary(), "-nostdin", "-hide_banner",
+        "-skip_frame", "nokey",
+        "-i", path,
+        "-map", "0:v:0",
+        "-vf", "showinfo",
+        "-f", "null", "-",
+    ]
+    proc = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    if proc.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed to probe {path}")
+    return parse_showinfo(proc.stderr.decode(errors="replace"))
+
+
+def parse_showinfo(text):
+    """Extract keyframe times and pixel format from ffmpeg showinfo output."""
+    keyframes = []
+    pix_fmt = None
+    for line in text.splitlines():
+        if "pts_time:" not in line:
+            continue
+        if "iskey:1" in line:
+            keyframes.append(float(re.search(r"pts_time:\s*([-\d.]+)", line).group(1)))
+        if pix_fmt is None:
+            m = re.search(r"fmt:(\w+)", line)
+            pix_fmt = m.group(1) if m else None
+    return sorted(keyframes), pix_fmt
+
+
+def probe_frame_rate(path):
+    """
+    Read the frame rate of the first video stream from ffmpeg's stream summary.
+
+    Unlike moviepy's parser this works on files that are still being written,
+    whose duration is not known yet.
+
+    Returns:
+        float: Frames per second, or None if the file has no video stream yet.
+    """
+    cmd = [ffmpeg_binary(), "-nostdin", "-hide_banner", "-i", path]
+    proc = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    for line in proc.stderr.decode(errors="replace").splitlines():
+        if "Video:" in line:
+            m = re.search(r"([\d.]+) fps", line) or re.search(r"([\d.]+)k? tbr", line)
+            return float(m.group(1)) if m else None
+    return None
+
+
+def probe_media(path):
+    """
+    Read the duration and streams of a file from ffmpeg's stream summary.
+
+    Covers what the analysis needs from moviepy's ffmpeg_parse_infos without
+    importing moviepy, which takes longer than a cached analysis itself.
+
+    Returns:
+        dict: "duration" in seconds (None if unknown), "audio_found", "video_found",
+        "video_fps" (None without a video stream), and the "audio_fps" and
+        "audio_nchannels" of the first audio stream (None if unknown).
+
+    Raises:
+        RuntimeError: If ffmpeg cannot open the file; the message holds its error.
+    """
+    cmd = [ffmpeg_binary(), "-nostdin", "-hide_banner", "-i", path]
+    proc = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    text = proc.stderr.decode(errors="replace")
+    if "Input #0" not in text:
+        raise RuntimeError(f"ffmpeg failed to open {path}: {text.strip()}")
+    return parse_stream_summary(text)
+
+
+def parse_stream_summary(text):
+    """Extract duration and stream information from the output of `ffmpeg -i`."""
+    infos = {
+        "duration": None,
+        "audio_found": False,
+        "video_found": False,
+        "video_fps": None,
+        "audio_fps": None,
+        "audio_nchannels": None,
+    }
+    for line in text.splitlines():
+        m = re.search(r"Duration: (\d+):(\d+):([\d.]+)", line)
+        if m and infos["duration"] is None:
+            h, mins, secs = m.groups()
+            infos["duration"] = int(h) * 3600 + int(mins) * 60 + float(secs)
+        elif re.search(r"Stream #0:\S*: Audio:", line) and not infos["audio_found"]:
+            infos["audio_found"] = True
+            m = re.search(r"(\d+) Hz, ([^,]+)", line)
+            if m:
+                infos["audio_fps"] = int(m.group(1))
+                layout = m.group(2).split("(")[0].strip()
+                n = re.match(r"(\d+) channels", layout)
+                infos["audio_nchannels"] = int(n.group(1)) if n else CHANNEL_LAYOUTS.get(layout)
+        # Cover art of audio files shows up as a single-frame video stream
+        elif re.search(r"Stream #0:\S*: Video:", line) and "attached pic" not in line and not infos["video_found"]:
+            infos["video_found"] = True
+            m = re.search(r"([\d.]+) fps", line) or re.search(r"([\d.]+)k? tbr", line)
+            infos["video_fps"] = float(m.group(1)) if m else None
+    return infos
@@ -1,14 +1,26 @@
-from absl import app, flags
-from moviepy import VideoFileClip, concatenate_videoclips
-import whisper
+from absl import app, flags, logging
 import json
 import os
-import torch
-import re
+import tempfile
+import numpy as np
+from analysis_cache import DEFAULT_CACHE_DIR, AnalysisCache, file_fingerprint
+from decoded_audio import load_decoded_audio
+from intervals import IntervalSet
+from profiling import stage, write_report
+from sequential_render import export_sequential
+from ffmpeg_tools import probe_media
+from silence_remover import envelope_loud_segments, pad_segments
+from transcribe_server import DEFAULT_SOCKET_PATH, request_transcription
+from transcript_index import TranscriptIndex, parse_timestamp
+from transcription import transcribe_chunked
 
 # === Define flags ===
 FLAGS = flags.FLAGS
 
+WHISPER_MODEL = "large"
+# Key of the transcript JSON that records which video and settings it was made from
+TRANSCRIPT_SOURCE_KEY = "vidcleanser"
+
 def define_flags():
     flags.DEFINE_string(
         "clip_path",
@@ -28,63 +40,174 @@ def define_flags():
         ["um", "uh", "ah", "like", "you know", "i mean", "so"],
         "Comma-separated list of filler words to remove",
     )
+    flags.DEFINE_string(
+        "cache_dir", DEFAULT_CACHE_DIR, "Directory for cached transcripts"
+    )
+    flags.DEFINE_bool("cache", True, "Reuse cached transcripts for unchanged inputs")
+    flags.DEFINE_string("whisper_model", WHISPER_MODEL, "Whisper model size (tiny, base, small, medium, large)")
+    flags.DEFINE_integer(
+        "transcribe_workers", 1, "Number of worker processes transcribing speech chunks in parallel"
+    )
+    flags.DEFINE_string(
+        "transcribe_server",
+        DEFAULT_SOCKET_PATH,
+        "Socket of a running transcribe_server.py; empty to always transcribe in-process",
+    )
+    flags.DEFINE_bool("vad", True, "Only transcribe loud (speech) segments found by the silence detector")
+    flags.DEFINE_float("vad_threshold", 0.03, "Silence threshold used to find speech (linear amplitude)")
+    flags.DEFINE_bool(
+        "sequential_render",
+        False,
+        "Decode the source once, front to back, and pipe kept frames straight to the encoder",
+    )
+    flags.DEFINE_string(
+        "profile_report", None, "Write per-stage timings, CPU, memory and throughput to this JSON file"
+    )
 
 
-# === Helper to parse timestamp "00:01:02,480" -> seconds
-def parse_timestamp(ts):
-    h, m, s_ms = ts.split(":")
-    s, ms = s_ms.split(",")
-    return int(h) * 3600 + int(m) * 60 + int(s) + int(ms) / 1000
-
-
-def transcribe_with_whisper(video_path, transcript_path):
-    """Transcribe audio with Whisper and save to transcript_path if not already present."""
-    if not os.path.exists(transcript_path):
-        print("Transcribing audio with Whisper...")
-        device = "cuda" if torch.cuda.is_available() else "cpu"
-        print(f"Using device: {device}")
-        model = whisper.load_model("large", device=device)
-        result = model.transcribe(video_path, word_timestamps=True)
-        with open(transcript_path, "w") as f:
-            json.dump(result, f)
-        print("Transcript saved.")
+def detect_speech_ranges(video_path, silence_threshold, cache=None):
+    """Find the padded loud segments of a file with the silence detector."""
+    infos = probe_media(video_path)
+    if not infos["audio_found"]:
+        return []
+    segments = envelope_loud_segments(video_path, infos["duration"], 0.5, silence_threshold, cache)
+    return pad_segments(segments, 0.2, infos["duration"])
+
+
+def transcribe_with_whisper(
+    video_path,
+    transcript_path,
+    cache=None,
+    model_name=WHISPER_MODEL,
+    speech_ranges=None,
+    workers=1,
+    server_socket=None,
+    audio=None,
+):
+    """
+    Transcribe audio with Whisper and save the result to transcript_path.
+
+    Transcripts are stored in the analysis cache keyed by the video's content and
+    the Whisper settings, so an unchanged video is never transcribed twice and an
+    edited one always is. transcript_path records the same video fingerprint and
+    settings, and an existing one is reused (e.g. without a cache) only when they
+    match.
+
+    When speech_ranges is given, only those ranges are transcribed; with more than
+    one worker, chunks are transcribed in parallel processes (see transcribe_chunked).
+    If a transcription server is listening on server_socket, the job is sent to its
+    already loaded model instead. Local transcription reads `audio` (the video's
+    decoded 16 kHz mono samples) when given, or the decode shared with the other
+    detectors when caching is enabled, rather than decoding the file again.
+    """
+    settings = {"model": model_name, "word_timestamps": True, "speech_ranges": speech_ranges}
+    key = cache.key(video_path, "whisper", **settings) if cache else None
+    # The settings as they read back from JSON, where tuples become lists
+    source = json.loads(json.dumps({"fingerprint": file_fingerprint(video_path), "settings": settings}))
+    # Leave a matching transcript untouched, so caches keyed by its content stay valid
+    if transcript_source(transcript_path) == source:
+        print("Transcript matches the video and settings. Skipping transcription.")
+        return
+    result = cache.load_json(key) if key else None
+    if result is not None:
+        print("Using cached transcript.")
     else:
-        print("Transcript already exists. Skipping transcription.")
+        media_seconds = sum(e - s for s, e in speech_ranges) if speech_ranges else None
+        with stage("transcription", media_seconds):
+            if server_socket:
+                result = request_transcription(video_path, model_name, speech_ranges, server_socket)
+            if result is not None:
+                print("Transcribed by the transcription server.")
+            else:
+                print("Transcribing audio with Whisper...")
+                # PyTorch and Whisper take seconds to import, so only a transcription loads them
+                import torch
+                import whisper
 
+                device = "cuda" if torch.cuda.is_available() else "cpu"
+                print(f"Using device: {device}")
+                if audio is None and cache is not None:
+                    audio = load_decoded_audio(video_path)
+                if speech_ranges is None and workers <= 1:
+                    model = whisper.load_model(model_name, device=device)
+                    result = model.transcribe(video_path if audio is None else np.array(audio), word_timestamps=True)
+                else:
+                    if speech_ranges is None:
+                        speech_ranges = [(0, probe_media(video_path)["duration"])]
+                    result = transcribe_chunked(video_path, speech_ranges, model_name, workers, device, audio)
+        if key:
+            cache.save_json(key, result)
+    with open(transcript_path, "w") as f:
+        json.dump(dict(result, **{TRANSCRIPT_SOURCE_KEY: source}), f)
+    print("Transcript saved.")
 
-def detect_filler_segments(words, fillers):
-    """Detect filler word segments in the transcript."""
-    filler_segments = []
-    for i, word_info in enumerate(words):
-        word = re.sub(r"[^\w]+", "", word_info["text"].lower())
 
-        # skip "so" at beginning of sentence (heuristic: skip if previous is "")
-        if word == "so" and i > 0 and words[i - 1]["text"].strip() == "":
-            continue
+def transcript_source(transcript_path):
+    """The video fingerprint and settings recorded in a transcript file, or None."""
+    try:
+        with open(transcript_path, "r") as f:
+            return json.load(f).get(TRANSCRIPT_SOURCE_KEY)
+    except (OSError, ValueError, AttributeError):
+        return None
 
-        if word in fillers:
-            start_time = parse_timestamp(word_info["timestamps"]["from"])
-            end_time = parse_timestamp(word_info["timestamps"]["to"])
-            print(f"Filler: {word} @ {start_time:.2f} - {end_time:.2f}")
-            filler_segments.append((start_time, end_time))
-    return filler_segments
 
+def load_transcript_index(transcript_path, cache=None):
+    """
+    Load a transcript JSON (openai-whisper or whisper.cpp format) as a TranscriptIndex.
 
-def remove_filler_segments_from_video(video_path, filler_segments):
-    """Remove filler segments from the video and return the list of non-filler clips."""
-    clip = VideoFileClip(video_path)
-    parts = []
-    prev_end = 0
+    The columnar index is cached by the transcript's content, so the JSON is only
+    parsed the first time a transcript is seen.
+    """
+    key = cache.key(transcript_path, "transcript-index") if cache else None
+    arrays = cache.load_arrays(key) if key else None
+    if arrays is not None:
+        return TranscriptIndex.from_arrays(arrays)
+    with open(transcript_path, "r") as f:
+        index = TranscriptIndex.from_transcript(json.load(f))
+    if key:
+        cache.save_arrays(key, **index.to_arrays())
+    return index
+
+
+def detect_filler_segments(index, fillers):
+    """
+    Detect filler word segments in the transcript.
+
+    Args:
+        index (TranscriptIndex or list): Transcript index, or the "transcription"
+            list of a whisper.cpp transcript.
+        fillers (iterable of str): Filler words and phrases, e.g. "um" or "you know".
 
-    for start, end in filler_segments:
-        if start > prev_end:
-            parts.append(clip.subclipped(prev_end, start))
-        prev_end = max(prev_end, end)
+    Returns:
+        list of tuple: (start, end) time of every filler occurrence.
+    """
+    if not isinstance(index, TranscriptIndex):
+        index = TranscriptIndex.from_whisper_cpp(index)
+    fillers = sorted(fillers)
+    first, n_words, phrase = index.find_phrases(fillers)
+    # Keep "so" when it starts a sentence, where it is rarely a filler
+    so = [n for n, f in enumerate(fillers) if f == "so"]
+    keep = ~(np.isin(phrase, so) & index.sentence_start[first])
+    first, n_words, phrase = first[keep], n_words[keep], phrase[keep]
+    starts = index.starts[first]
+    ends = index.ends[first + n_words - 1]
+    if logging.level_debug():
+        for n, start_time, end_time in zip(phrase, starts, ends):
+            logging.debug("Filler: %s @ %.2f - %.2f", fillers[n], start_time, end_time)
+    return list(zip(starts.tolist(), ends.tolist()))
 
-    if prev_end < clip.duration:
-        parts.append(clip.subclipped(prev_end, clip.duration))
 
-    return parts
+def filler_keep_ranges(filler_segments, duration):
+    """Return the (start, end) ranges between filler segments."""
+    return IntervalSet.from_pairs(filler_segments).complement(0, duration).to_list()
+
+
+def remove_filler_segments_from_video(video_path, filler_segments):
+    """Remove filler segments from the video and return the list of non-filler clips."""
+    from moviepy import VideoFileClip
+
+    clip = VideoFileClip(video_path)
+    return [clip.subclipped(start, end) for start, end in filler_keep_ranges(filler_segments, clip.duration)]
 
 
 def main(argv):
@@ -95,34 +218,63 @@ def main(argv):
     transcript_path = FLAGS.transcript_path or (clip_path + "transcript.json")
     fillers = set([f.strip().lower() for f in FLAGS.fillers])
 
-    # === Transcribe with Whisper if transcript doesn't exist ===
-    transcribe_with_whisper(clip_path, transcript_path)
+    # === Transcribe with Whisper unless a valid transcript is available ===
+    cache = AnalysisCache(FLAGS.cache_dir) if FLAGS.cache else None
+    speech_ranges = None
+    if FLAGS.vad:
+        with stage("detect_speech"):
+            speech_ranges = detect_speech_ranges(clip_path, FLAGS.vad_threshold, cache)
+    transcribe_with_whisper(
+        clip_path,
+        transcript_path,
+        cache,
+        FLAGS.whisper_model,
+        speech_ranges,
+        FLAGS.transcribe_workers,
+        FLAGS.transcribe_server,
+    )
 
     # === Load transcript ===
-    with open(transcript_path, "r") as f:
-        data = json.load(f)
-
-    words = data.get("transcription", [])
+    index = load_transcript_index(transcript_path, cache)
 
     # === Detect filler segments ===
-    filler_segments = detect_filler_segments(words, fillers)
+    with stage("detect_fillers"):
+        filler_segments = detect_filler_segments(index, fillers)
 
     print(f"\nDetected {len(filler_segments)} filler segments.")
     if not filler_segments:
         print("No filler words found. Exiting.")
         return
 
-    # === Remove filler segments from video ===
-    parts = remove_filler_segments_from_video(clip_path, filler_segments)
+    from moviepy import concatenate_videoclips
+    from moviepy.video.io.ffmpeg_reader import ffmpeg_parse_infos
 
-    # === Export cleaned video ===
-    final = concatenate_videoclips(parts, method="compose")
-    final.write_videofile(
-        output_path,
-        codec="libx264",
-        audio_codec="aac",
-        ffmpeg_params=["-crf", "18", "-preset", "fast"],
-    )
+    infos = ffmpeg_parse_infos(clip_path)
+    keep = filler_keep_ranges(filler_segments, infos["duration"])
+    output_duration = sum(e - s for s, e in keep)
+    output_frames = int(output_duration * infos["video_fps"])
+    if FLAGS.sequential_render:
+        with stage("encode", output_duration, output_frames):
+            export_sequential(clip_path, keep, output_path, False, 0.0, os.cpu_count())
+    else:
+        # === Remove filler segments from video ===
+        with stage("subclip_build"):
+            parts = remove_filler_segments_from_video(clip_path, filler_segments)
+
+        # === Export cleaned video ===
+        with stage("composite"):
+            final = concatenate_videoclips(parts, method="compose")
+        with stage("encode", output_duration, output_frames):
+            with tempfile.TemporaryDirectory(prefix="vidcleanser-") as tmp:
+                final.write_videofile(
+                    output_path,
+                    codec="libx264",
+                    audio_codec="aac",
+                    ffmpeg_params=["-crf", "18", "-preset", "fast"],
+                    temp_audiofile_path=tmp,
+                )
+    if FLAGS.profile_report:
+        write_report(FLAGS.profile_report, input=clip_path, fillers=len(filler_segments))
 
 
 if __name__ == "__main__":
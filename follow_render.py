@@ -0,0 +1,228 @@
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from audio_stream import iter_chunk_levels, iter_pcm_blocks
+from ffmpeg_tools import probe_frame_rate, run_ffmpeg
+from intervals import IntervalSet
+from parallel_render import join_shards, render_shard
+from sequential_render import output_layout
+
+# Same analysis format as silence_remover.py, read in short blocks to keep latency low
+FOLLOW_SAMPLE_RATE = 16000
+FOLLOW_CHANNELS = 2
+FOLLOW_BLOCK_DURATION = 1.0
+# How often to check for an input that has not been created yet
+FOLLOW_POLL_INTERVAL = 1.0
+
+
+class LiveSegmenter:
+    """
+    Turns loud chunks found in a growing recording into final kept segments.
+
+    Chunks closer than the larger of the merge gap and twice the padding end up in
+    the same padded segment, so a group of chunks can no longer change once the
+    analysis is further than that past its end (no later chunk can join it). The
+    segments produced are the same as merge_close_segments followed by
+    pad_segments on the finished file.
+
+    Args:
+        merge_gap (float): Max gap between loud chunks that are merged (0 to only
+            merge chunks whose padding overlaps).
+        padding (float): Padding added on both sides of every segment.
+        lookahead (float): Minimum audio, in seconds, analyzed past a segment before
+            it is final.
+    """
+
+    def __init__(self, merge_gap, padding, lookahead=0.0):
+        self.gap = max(merge_gap, 2 * padding)
+        self.padding = padding
+        self.horizon = max(self.gap, lookahead)
+        self.pending = IntervalSet()  # Merged groups that may still grow
+
+    def add(self, chunks):
+        """Add loud (start, end) chunks in time order."""
+        if chunks:
+            self.pending = self.pending.union(IntervalSet.from_pairs(chunks)).merge(self.gap)
+
+    def finalize(self, analyzed_until, duration=None):
+        """
+        Return the segments that became final, padded and in time order.
+
+        Args:
+            analyzed_until (float): End of the audio analyzed so far, in seconds.
+            duration (float): Length of the finished recording; when given, every
+                pending group is final and clipped to it.
+        """
+        if duration is None:
+            done = int(np.searchsorted(self.pending.ends, analyzed_until - self.horizon, side="left"))
+            upper = np.inf
+        else:
+            done, upper = len(self.pending), duration
+        final = IntervalSet(self.pending.starts[:done], self.pending.ends[:done])
+        self.pending = IntervalSet(self.pending.starts[done:], self.pending.ends[done:])
+        return final.pad(self.padding).clip(0, upper).to_list()
+
+
+def plan_live_shard(segments, overlap, t0, fps, shard_duration):
+    """
+    Find the next shard of a growing output timeline, if enough of it is final.
+
+    Shards are cut right after the crossfade into a segment finishes, as in
+    plan_shards, so only the head of that segment has to be final. The first cut at
+    least shard_duration seconds after t0 is used.
+
+    Args:
+        segments (list of tuple): Final kept (start, end) ranges of the source.
+        overlap (float): Crossfade duration between clips (0 for a plain concatenation).
+        t0 (float): Output time where the shard starts.
+        fps (float): Output frame rate; cuts are snapped to its frame grid.
+        shard_duration (float): Minimum output duration of a shard.
+
+    Returns:
+        tuple: (first_clip, last_clip, t1) where clips first_clip..last_clip-1 are
+        active in the output window [t0, t1), or None if no cut is available yet.
+    """
+    if len(segments) < 2:
+        return None
+    starts = output_layout(segments, overlap)
+    cuts = np.round((starts[1:] + overlap) * fps) / fps
+    ready = np.flatnonzero(cuts - t0 >= shard_duration)
+    if len(ready) == 0:
+        return None
+    t1 = float(cuts[ready[0]])
+    ends = starts + np.array([e - s for s, e in segments])
+    active = np.flatnonzero((starts < t1) & (ends > t0))
+    return int(active[0]), int(active[-1]) + 1, t1
+
+
+def render_live_shard(job):
+    """
+    Process-pool task: render one shard of a recording that may still be growing.
+
+    moviepy cannot open a file whose duration is not known yet, so the source
+    range the shard needs is first cut out losslessly into a finished file.
+    """
+    clip_path, segments, fade, overlap, base, t0, t1, out_path, threads = job
+    first = segments[0][0]
+    source = out_path + ".source.mkv"
+    run_ffmpeg(["-ss", first, "-i", clip_path, "-t", segments[-1][1] - first,
+                "-map", "0:v:0", "-map", "0:a:0?", "-c:v", "libx264", "-preset", "ultrafast",
+                "-qp", "0", "-c:a", "pcm_s16le", source])
+    try:
+        local = [(s - first, e - first) for s, e in segments]
+        return render_shard((source, local, fade, overlap, base, t0, t1, out_path, threads))
+    finally:
+        os.remove(source)
+
+
+def iter_followed_audio(clip_path, idle_timeout, counter):
+    """Tail the stereo analysis audio of a growing file, counting samples in counter[0]."""
+    for block in iter_pcm_blocks(
+        clip_path, FOLLOW_SAMPLE_RATE, channels=FOLLOW_CHANNELS, block_duration=FOLLOW_BLOCK_DURATION,
+        follow_timeout=idle_timeout,
+    ):
+        counter[0] += len(block)
+        yield block
+
+
+def export_follow(
+    clip_path,
+    output_path,
+    chunk_duration,
+    silence_threshold,
+    merge_gap,
+    padding,
+    fade,
+    fade_duration,
+    lookahead,
+    shard_duration,
+    idle_timeout,
+    render_workers,
+    max_threads,
+):
+    """
+    Clean a recording while it is still being written.
+
+    The audio is analyzed as it is appended to the file. Segments are final once
+    the analysis is `lookahead` seconds past them, and every shard_duration seconds
+    of final output are rendered to a shard in the background. The recording is
+    considered finished once the file has not grown for idle_timeout seconds; then
+    only the last shard is rendered and all shards are joined.
+
+    Args:
+        clip_path (str): Recording to follow (MKV, or any container readable while
+            being written).
+        output_path (str): Path for the output video file.
+        chunk_duration (float): Chunk duration in seconds.
+        silence_threshold (float): Chunks whose peak exceeds this are loud.
+        merge_gap (float): Max gap to merge loud chunks (0 to disable merging).
+        padding (float): Padding duration in seconds.
+        fade (bool): Crossfade consecutive segments.
+        fade_duration (float): Crossfade duration in seconds.
+        lookahead (float): Seconds analyzed past a segment before it is final.
+        shard_duration (float): Output seconds rendered per shard.
+        idle_timeout (float): Seconds without growth after which the recording is done.
+        render_workers (int): Number of shards rendered at the same time.
+        max_threads (int): Total encoder threads, divided between the workers.
+
+    Returns:
+        bool: Whether an output was written (False if nothing loud was found).
+    """
+    waited = 0.0
+    while not os.path.exists(clip_path):
+        if waited >= idle_timeout:
+            raise FileNotFoundError(clip_path)
+        print(f"Waiting for {clip_path} to appear...")
+        time.sleep(FOLLOW_POLL_INTERVAL)
+        waited += FOLLOW_POLL_INTERVAL
+
+    overlap = fade_duration if fade else 0.0
+    threads = max(1, max_threads // render_workers)
+    segmenter = LiveSegmenter(merge_gap, padding, lookahead)
+    segments = []
+    futures = []
+    counter = [0]
+    fps = None
+    t0 = 0.0
+
+    with tempfile.TemporaryDirectory(prefix="vidcleanser-") as tmp, ProcessPoolExecutor(
+        max_workers=render_workers
+    ) as pool:
+
+        def submit(first, last, t1):
+            base = float(output_layout(segments, overlap)[first])
+            out_path = os.path.join(tmp, f"shard_{len(futures):05d}.mkv")
+            job = (clip_path, segments[first:last], fade, overlap, base, t0, t1, out_path, threads)
+            futures.append(pool.submit(render_live_shard, job))
+            print(f"Rendering shard {len(futures)} ({t0:.1f}s - {t1:.1f}s of output)...")
+
+        print(f"Following {clip_path}; stops after {idle_timeout:g}s without new data.")
+        blocks = iter_followed_audio(clip_path, idle_timeout, counter)
+        for first_chunk, peak, _ in iter_chunk_levels(blocks, FOLLOW_SAMPLE_RATE, chunk_duration):
+            loud = (np.flatnonzero(peak > silence_threshold) + first_chunk).tolist()
+            segmenter.add([(i * chunk_duration, (i + 1) * chunk_duration) for i in loud])
+            segments.extend(segmenter.finalize((first_chunk + len(peak)) * chunk_duration))
+            if fps is None:
+                fps = probe_frame_rate(clip_path)
+            shard = plan_live_shard(segments, overlap, t0, fps, shard_duration) if fps else None
+            while shard:
+                submit(*shard)
+                t0 = shard[2]
+                shard = plan_live_shard(segments, overlap, t0, fps, shard_duration)
+
+        duration = counter[0] / FOLLOW_SAMPLE_RATE
+        print(f"Recording ended after {duration:.2f}s.")
+        segments.extend(segmenter.finalize(duration, duration))
+        if not segments:
+            return False
+        starts = output_layout(segments, overlap)
+        total = float(starts[-1] + segments[-1][1] - segments[-1][0])
+        if t0 < total:
+            ends = starts + np.array([e - s for s, e in segments])
+            active = np.flatnonzero((starts < total) & (ends > t0))
+            submit(int(active[0]), int(active[-1]) + 1, total)
+        shard_paths = [f.result() for f in futures]
+        join_shards(shard_paths, output_path, tmp)
+    return True
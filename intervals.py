@@ -0,0 +1,114 @@
+import numpy as np
+
+
+class IntervalSet:
+    """
+    Set of [start, end] time intervals backed by two NumPy arrays.
+
+    Every operation is vectorized, so edit lists with hundreds of thousands of
+    entries stay fast. Operations return new sets; `merge`, `union`, `intersect`
+    and `complement` always return sorted, non-overlapping intervals.
+
+    Args:
+        starts (array-like): Interval start times in seconds.
+        ends (array-like): Interval end times in seconds, same length as starts.
+    """
+
+    def __init__(self, starts=(), ends=()):
+        self.starts = np.asarray(starts, dtype=float).reshape(-1)
+        self.ends = np.asarray(ends, dtype=float).reshape(-1)
+        if self.starts.shape != self.ends.shape:
+            raise ValueError("starts and ends must have the same length")
+
+    @classmethod
+    def from_pairs(cls, pairs):
+        """Build a set from an iterable of (start, end) tuples."""
+        arr = np.asarray(list(pairs), dtype=float).reshape(-1, 2)
+        return cls(arr[:, 0], arr[:, 1])
+
+    def to_list(self):
+        """Return the intervals as a list of (start, end) float tuples."""
+        return list(zip(self.starts.tolist(), self.ends.tolist()))
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __iter__(self):
+        return iter(self.to_list())
+
+    def __repr__(self):
+        return f"IntervalSet({self.to_list()})"
+
+    @property
+    def duration(self):
+        """Total length of the intervals (overlaps counted once only after merge())."""
+        return float(np.sum(self.ends - self.starts))
+
+    def _sorted(self):
+        order = np.argsort(self.starts, kind="stable")
+        return self.starts[order], self.ends[order]
+
+    def merge(self, gap=0.0):
+        """
+        Merge intervals that overlap or are separated by at most `gap` seconds.
+
+        Touching intervals (gap of exactly 0) are merged as well.
+        """
+        if len(self) == 0:
+            return IntervalSet()
+        starts, ends = self._sorted()
+        running_end = np.maximum.accumulate(ends)
+        # A new group begins wherever the gap to everything before it exceeds `gap`
+        new_group = np.concatenate([[True], starts[1:] - running_end[:-1] > gap])
+        first = np.flatnonzero(new_group)
+        return IntervalSet(starts[first], np.maximum.reduceat(ends, first))
+
+    def pad(self, before, after=None):
+        """Extend every interval by `before` seconds at the start and `after` at the end."""
+        after = before if after is None else after
+        return IntervalSet(self.starts - before, self.ends + after)
+
+    def clip(self, lower, upper):
+        """Clamp intervals to [lower, upper] and drop the ones left empty."""
+        starts = np.maximum(self.starts, lower)
+        ends = np.minimum(self.ends, upper)
+        keep = ends > starts
+        return IntervalSet(starts[keep], ends[keep])
+
+    def drop_shorter(self, min_duration):
+        """Drop intervals shorter than `min_duration` seconds."""
+        keep = self.ends - self.starts >= min_duration
+        return IntervalSet(self.starts[keep], self.ends[keep])
+
+    def union(self, other):
+        """Intervals covered by either set."""
+        return IntervalSet(
+            np.concatenate([self.starts, other.starts]), np.concatenate([self.ends, other.ends])
+        ).merge()
+
+    def complement(self, lower, upper):
+        """Gaps of this set within [lower, upper]."""
+        merged = self.merge().clip(lower, upper)
+        starts = np.concatenate([[lower], merged.ends])
+        ends = np.concatenate([merged.starts, [upper]])
+        keep = ends > starts
+        return IntervalSet(starts[keep], ends[keep])
+
+    def intersect(self, other):
+        """Intervals covered by both sets."""
+        a, b = self.merge(), other.merge()
+        if len(a) == 0 or len(b) == 0:
+            return IntervalSet()
+        # Elementary pieces between consecutive breakpoints of both sets
+        points = np.unique(np.concatenate([a.starts, a.ends, b.starts, b.ends]))
+        mids = (points[:-1] + points[1:]) / 2
+        keep = a.contains(mids) & b.contains(mids)
+        return IntervalSet(points[:-1][keep], points[1:][keep]).merge()
+
+    def contains(self, times):
+        """Boolean mask of which `times` fall inside an interval (requires a merged set)."""
+        times = np.asarray(times, dtype=float)
+        idx = np.searchsorted(self.starts, times, side="right") - 1
+        inside = idx >= 0
+        inside[inside] = times[inside] <= self.ends[idx[inside]]
+        return inside
@@ -0,0 +1,129 @@
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from ffmpeg_tools import run_ffmpeg
+
+# Shards are cut finer than the worker count so uneven shards still balance out
+SHARDS_PER_WORKER = 2
+
+
+def plan_shards(segments, overlap, n_shards, fps):
+    """
+    Split the output timeline into independent shards.
+
+    Clip i starts on the output timeline at the sum of the previous clip durations
+    minus one overlap per transition, as in crossfade_sequence. Shards are cut right
+    after a transition finishes, so no fade window ever straddles two shards, and
+    cut times are snapped to the output frame grid so the shards join frame-exactly.
+
+    Args:
+        segments (list of tuple): Kept (start, end) ranges of the source.
+        overlap (float): Crossfade duration between clips (0 for a plain concatenation).
+        n_shards (int): Desired number of shards.
+        fps (float): Output frame rate.
+
+    Returns:
+        list of tuple: (first_clip, last_clip, t0, t1) where clips first_clip..last_clip-1
+        are active in the output window [t0, t1).
+    """
+    durations = np.array([e - s for s, e in segments], dtype=float)
+    starts = np.concatenate([[0.0], np.cumsum(durations[:-1] - overlap)])
+    ends = starts + durations
+    total = float(ends[-1])
+
+    cuts = []
+    for k in range(1, n_shards):
+        i = int(np.searchsorted(starts, total * k / n_shards))
+        if 0 < i < len(segments):
+            cut = round((starts[i] + overlap) * fps) / fps
+            if cut < total and (not cuts or cut > cuts[-1]):
+                cuts.append(cut)
+    bounds = [0.0] + cuts + [total]
+
+    shards = []
+    for t0, t1 in zip(bounds[:-1], bounds[1:]):
+        active = np.flatnonzero((starts < t1) & (ends > t0))
+        shards.append((int(active[0]), int(active[-1]) + 1, t0, t1))
+    return shards
+
+
+def render_shard(job):
+    """
+    Render one shard of the output in a worker process.
+
+    The worker opens its own reader on the source, rebuilds only the clips active
+    in its window and writes them with lossless PCM audio so shards can be joined
+    without audio gaps.
+    """
+    from moviepy import VideoFileClip
+    from silence_remover import crossfade_sequence
+    from timeline import TimelineClip
+
+    clip_path, segments, fade, overlap, base, t0, t1, out_path, threads = job
+    clip = VideoFileClip(clip_path)
+    subclips = [clip.subclipped(start, end) for (start, end) in segments]
+    if fade:
+        sequence = crossfade_sequence(subclips, overlap)
+    else:
+        sequence = TimelineClip(subclips)
+    shard = sequence.subclipped(t0 - base, t1 - base)
+    try:
+        shard.write_videofile(
+            out_path,
+            codec="libx264",
+            audio_codec="pcm_s16le",
+            ffmpeg_params=["-preset", "ultrafast", "-crf", "23"],
+            threads=threads,
+            # Keep moviepy's intermediate audio in the job's private directory
+            temp_audiofile_path=os.path.dirname(out_path),
+            logger=None,
+        )
+    finally:
+        for c in subclips:
+            c.close()
+        sequence.close()
+        clip.close()
+    return out_path
+
+
+def export_parallel(clip_path, segments, output_path, fade, overlap, fps, n_workers, max_threads):
+    """
+    Render the kept segments in parallel worker processes and join the shards.
+
+    Args:
+        clip_path (str): Path to the source video.
+        segments (list of tuple): Kept (start, end) ranges of the source.
+        output_path (str): Path for the output video file.
+        fade (bool): Whether clips are crossfaded (see crossfade_sequence).
+        overlap (float): Crossfade duration in seconds.
+        fps (float): Output frame rate.
+        n_workers (int): Number of worker processes.
+        max_threads (int): Total encoder threads, divided between the workers.
+    """
+    overlap = overlap if fade else 0.0
+    shards = plan_shards(segments, overlap, n_workers * SHARDS_PER_WORKER, fps)
+    durations = [e - s for s, e in segments]
+    starts = np.concatenate([[0.0], np.cumsum(np.array(durations[:-1]) - overlap)])
+    threads = max(1, max_threads // n_workers)
+    print(f"Rendering {len(shards)} shards on {n_workers} workers...")
+
+    with tempfile.TemporaryDirectory(prefix="vidcleanser-") as tmp:
+        jobs = [
+            (clip_path, segments[first:last], fade, overlap, float(starts[first]), t0, t1,
+             os.path.join(tmp, f"shard_{n:05d}.mkv"), threads)
+            for n, (first, last, t0, t1) in enumerate(shards)
+        ]
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            shard_paths = list(pool.map(render_shard, jobs))
+        join_shards(shard_paths, output_path, tmp)
+
+
+def join_shards(shard_paths, output_path, tmp):
+    """Concatenate rendered shards without re-encoding video, converting audio to AAC."""
+    list_path = os.path.join(tmp, "shards.txt")
+    with open(list_path, "w") as f:
+        f.writelines(f"file '{p}'\n" for p in shard_paths)
+    print(f"Joining shards into {output_path}...")
+    run_ffmpeg(["-f", "concat", "-safe", "0", "-i", list_path,
+                "-c:v", "copy", "-c:a", "aac", "-movflags", "+faststart", output_path])
@@ -0,0 +1,214 @@
+from absl import app, flags
+import os
+from concurrent.futures import ThreadPoolExecutor
+from analysis_cache import DEFAULT_CACHE_DIR, AnalysisCache
+from caugh_remover import detect_cough_segments, load_yamnet
+from decoded_audio import DECODED_SAMPLE_RATE, decode_audio, load_decoded_audio
+from ffmpeg_tools import probe_media
+from filler_remover import WHISPER_MODEL, detect_filler_segments, load_transcript_index, transcribe_with_whisper
+from intervals import IntervalSet
+from profiling import stage, write_report
+from silence_remover import (
+    ENVELOPE_RESOLUTION,
+    envelope_chunk_peaks,
+    iter_loud_segments,
+    load_loudness_envelope,
+    merge_close_segments,
+    pad_segments,
+    render_segments,
+)
+from transcribe_server import DEFAULT_SOCKET_PATH
+
+FLAGS = flags.FLAGS
+
+
+def define_flags():
+    flags.DEFINE_string("clip_path", None, "Path to the input video file")
+    flags.DEFINE_string(
+        "output_path", None, "Path for the output video file (default: <input>_cleaned.mov)"
+    )
+    flags.DEFINE_bool("remove_silence", True, "Cut silent parts")
+    flags.DEFINE_bool("remove_fillers", True, "Cut filler words found by Whisper")
+    flags.DEFINE_bool("remove_coughs", False, "Cut coughs and throat clearing found by YAMNet")
+    # Silence detection
+    flags.DEFINE_float("silence_threshold", 0.03, "Silence threshold (linear amplitude)")
+    flags.DEFINE_float("chunk_duration", 0.5, "Chunk duration in seconds")
+    flags.DEFINE_float("merge_gap_threshold", 0.05, "Max gap to merge loud segments in seconds")
+    flags.DEFINE_float("padding", 0.2, "Padding kept around loud segments in seconds")
+    # Filler detection
+    flags.DEFINE_list(
+        "fillers",
+        ["um", "uh", "ah", "like", "you know", "i mean", "so"],
+        "Comma-separated list of filler words to remove",
+    )
+    flags.DEFINE_string(
+        "transcript_path", None, "Path for the transcript JSON file (default: <clip_path>transcript.json)"
+    )
+    flags.DEFINE_string("whisper_model", WHISPER_MODEL, "Whisper model size (tiny, base, small, medium, large)")
+    flags.DEFINE_integer(
+        "transcribe_workers", 1, "Number of worker processes transcribing speech chunks in parallel"
+    )
+    flags.DEFINE_string(
+        "transcribe_server",
+        DEFAULT_SOCKET_PATH,
+        "Socket of a running transcribe_server.py; empty to always transcribe in-process",
+    )
+    # Rendering
+    flags.DEFINE_bool("fade_in_out", True, "Apply fade in/out effects")
+    flags.DEFINE_float("fade_duration", 0.3, "Fade in/out duration in seconds")
+    flags.DEFINE_bool(
+        "stream_copy",
+        False,
+        "Copy untouched GOPs from the source and only re-encode cut boundaries "
+        "(ignored when --fade_in_out is set)",
+    )
+    flags.DEFINE_bool(
+        "sequential_render",
+        False,
+        "Decode the source once, front to back, and pipe kept frames straight to the encoder",
+    )
+    flags.DEFINE_integer(
+        "render_workers", 1, "Number of worker processes that render shards of the output in parallel"
+    )
+    flags.DEFINE_string("cache_dir", DEFAULT_CACHE_DIR, "Directory for cached analysis results")
+    flags.DEFINE_bool("cache", True, "Reuse cached analysis results for unchanged inputs")
+    flags.DEFINE_string(
+        "profile_report", None, "Write per-stage timings, CPU, memory and throughput to this JSON file"
+    )
+
+
+def find_speech(envelope_peak, resolution, duration, chunk_duration, silence_threshold, merge_gap, padding):
+    """
+    Find the padded loud segments of a loudness envelope, as the silence remover does.
+
+    Returns:
+        list of tuple: Sorted, non-overlapping (start, end) ranges to keep.
+    """
+    n_chunks = int(duration / chunk_duration)
+    peak = envelope_chunk_peaks(envelope_peak, resolution, chunk_duration, n_chunks)
+    segments = iter_loud_segments([(0, peak, None)], chunk_duration, silence_threshold, duration)
+    return pad_segments(merge_close_segments(segments, merge_gap), padding, duration)
+
+
+def detect_filler_cuts(clip_path, audio, speech, fillers, transcript_path, cache=None, **whisper_options):
+    """
+    Transcribe the speech of a video and return the filler words as cut intervals.
+
+    Args:
+        clip_path (str): Path to the input video.
+        audio (np.ndarray): The video's decoded 16 kHz mono samples.
+        speech (list of tuple): Ranges to transcribe.
+        fillers (iterable of str): Filler words and phrases.
+        transcript_path (str): Where the transcript JSON is written.
+        cache (AnalysisCache): Cache for transcripts, or None.
+        **whisper_options: model_name, workers and server_socket for transcribe_with_whisper.
+
+    Returns:
+        IntervalSet: Time ranges of the fillers.
+    """
+    transcribe_with_whisper(clip_path, transcript_path, cache, speech_ranges=speech, audio=audio, **whisper_options)
+    index = load_transcript_index(transcript_path, cache)
+    with stage("detect_fillers"):
+        return IntervalSet.from_pairs(detect_filler_segments(index, fillers))
+
+
+def detect_cough_cuts(audio):
+    """Run YAMNet over decoded 16 kHz mono audio and return coughs as cut intervals."""
+    print("Loading YAMNet model...")
+    model, class_names = load_yamnet()
+    with stage("detect_coughs", len(audio) / DECODED_SAMPLE_RATE):
+        return IntervalSet.from_pairs(detect_cough_segments(audio, model, class_names))
+
+
+def build_edit_list(duration, cuts):
+    """
+    Combine the cut intervals of every detector into the ranges to keep.
+
+    Args:
+        duration (float): Duration of the source in seconds.
+        cuts (dict): Detector name -> IntervalSet of time ranges to remove.
+
+    Returns:
+        list of tuple: Sorted, non-overlapping (start, end) ranges to keep.
+    """
+    removed = IntervalSet()
+    for name, intervals in cuts.items():
+        intervals = intervals.clip(0, duration).merge()
+        print(f"{name}: {len(intervals)} cuts, {intervals.duration:.2f}s")
+        removed = removed.union(intervals)
+    return removed.complement(0, duration).to_list()
+
+
+def main(argv):
+    clip_path = FLAGS.clip_path
+    output_path = FLAGS.output_path or clip_path + "_cleaned.mov"
+    transcript_path = FLAGS.transcript_path or (clip_path + "transcript.json")
+    cache = AnalysisCache(FLAGS.cache_dir) if FLAGS.cache else None
+    duration = probe_media(clip_path)["duration"]
+
+    # Silence is measured on the silence remover's envelope, so thresholds mean the same in both
+    resolution = min(ENVELOPE_RESOLUTION, FLAGS.chunk_duration)
+    with stage("detect_silence", duration):
+        envelope_peak, _ = load_loudness_envelope(clip_path, resolution, cache)
+        speech = find_speech(
+            envelope_peak,
+            resolution,
+            duration,
+            FLAGS.chunk_duration,
+            FLAGS.silence_threshold,
+            FLAGS.merge_gap_threshold,
+            FLAGS.padding,
+        )
+    print(f"Detected {len(speech)} loud segments.")
+
+    # Whisper and YAMNet share the same 16 kHz mono decode and run side by side
+    audio = None
+    if FLAGS.remove_fillers or FLAGS.remove_coughs:
+        audio = load_decoded_audio(clip_path) if FLAGS.cache else decode_audio(clip_path)
+    cuts = {}
+    if FLAGS.remove_silence:
+        cuts["silence"] = IntervalSet.from_pairs(speech).complement(0, duration)
+    with ThreadPoolExecutor() as pool:
+        running = {}
+        if FLAGS.remove_fillers:
+            running["fillers"] = pool.submit(
+                detect_filler_cuts,
+                clip_path,
+                audio,
+                speech,
+                [f.strip().lower() for f in FLAGS.fillers],
+                transcript_path,
+                cache,
+                model_name=FLAGS.whisper_model,
+                workers=FLAGS.transcribe_workers,
+                server_socket=FLAGS.transcribe_server,
+            )
+        if FLAGS.remove_coughs:
+            running["coughs"] = pool.submit(detect_cough_cuts, audio)
+        for name, future in running.items():
+            cuts[name] = future.result()
+
+    with stage("merge_pad"):
+        segments = build_edit_list(duration, cuts)
+    if not segments:
+        print("Nothing left to keep. Exiting.")
+        return
+    print(f"Keeping {len(segments)} segments.")
+    render_segments(
+        clip_path,
+        segments,
+        output_path,
+        FLAGS.fade_in_out,
+        FLAGS.fade_duration,
+        FLAGS.stream_copy,
+        FLAGS.sequential_render,
+        FLAGS.render_workers,
+        os.cpu_count(),
+    )
+    if FLAGS.profile_report:
+        write_report(FLAGS.profile_report, input=clip_path, segments=len(segments))
+
+
+if __name__ == "__main__":
+    define_flags()
+    app.run(main)
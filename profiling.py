@@ -0,0 +1,101 @@
+import json
+import os
+import resource
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from absl import logging
+
+# ru_maxrss is reported in kilobytes on Linux and in bytes on macOS
+RSS_UNIT_BYTES = 1 if sys.platform == "darwin" else 1024
+
+
+def cpu_seconds():
+    """CPU time used by this process and its finished child processes (e.g. ffmpeg)."""
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+
+def peak_rss_mb(who=resource.RUSAGE_SELF):
+    """Peak resident set size in megabytes."""
+    return resource.getrusage(who).ru_maxrss * RSS_UNIT_BYTES / 1024**2
+
+
+class StageProfiler:
+    """
+    Records the cost of each processing stage (decode, detect, encode, ...).
+
+    Every stage records wall time, CPU time (of the whole process and of the child
+    processes that finished during the stage), the process's peak RSS so far and,
+    when the stage reports how much media it processed, frames per second and
+    realtime factor. The peak RSS is a high-water mark of the whole process, so a
+    stage only raised it if it is higher than that of the stage before.
+    Stages running in parallel threads are recorded independently, so their CPU
+    times overlap.
+    """
+
+    def __init__(self):
+        self.stages = []
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name, media_seconds=None, frames=None):
+        """
+        Time the enclosed block as stage `name`.
+
+        Yields a dict in which the block may set "media_seconds" (duration of media
+        processed) and "frames" (video frames produced) once they are known.
+        """
+        record = {"name": name, "media_seconds": media_seconds, "frames": frames}
+        wall_start = time.perf_counter()
+        cpu_start = cpu_seconds()
+        try:
+            yield record
+        finally:
+            wall = time.perf_counter() - wall_start
+            record["wall_seconds"] = wall
+            record["cpu_seconds"] = cpu_seconds() - cpu_start
+            record["process_peak_rss_mb"] = peak_rss_mb()
+            media, frames = record["media_seconds"], record["frames"]
+            record["realtime_factor"] = media / wall if media and wall > 0 else None
+            record["frames_per_second"] = frames / wall if frames and wall > 0 else None
+            with self._lock:
+                self.stages.append(record)
+            logging.debug("Stage %s: %.3fs wall, %.3fs CPU", name, wall, record["cpu_seconds"])
+
+    def report(self, **info):
+        """Return all recorded stages and process totals as a JSON-serializable dict."""
+        with self._lock:
+            stages = list(self.stages)
+        return dict(
+            info,
+            total_wall_seconds=time.perf_counter() - self.started,
+            total_cpu_seconds=cpu_seconds(),
+            peak_rss_mb=peak_rss_mb(),
+            children_peak_rss_mb=peak_rss_mb(resource.RUSAGE_CHILDREN),
+            stages=stages,
+        )
+
+    def write_report(self, path, **info):
+        """Write report(**info) to `path` as JSON."""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(self.report(**info), f, indent=2)
+        print(f"Profile report written to {path}")
+
+
+# Process-wide profiler shared by every stage of a run
+PROFILER = StageProfiler()
+
+
+def stage(name, media_seconds=None, frames=None):
+    """Time a block as a stage of the process-wide profiler (see StageProfiler.stage)."""
+    return PROFILER.stage(name, media_seconds, frames)
+
+
+def write_report(path, **info):
+    """Write the process-wide profiler's report to `path`."""
+    PROFILER.write_report(path, **info)
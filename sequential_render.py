@@ -0,0 +1,277 @@
+import os
+import subprocess
+import tempfile
+import threading
+import wave
+import numpy as np
+from audio_stream import iter_pcm_blocks
+from ffmpeg_tools import ffmpeg_binary, run_ffmpeg
+
+OUTPUT_SAMPLE_RATE = 44100
+
+
+def output_layout(segments, overlap):
+    """Output start time of each kept segment when consecutive ones overlap by `overlap`."""
+    durations = np.array([e - s for s, e in segments], dtype=float)
+    return np.concatenate([[0.0], np.cumsum(durations[:-1] - overlap)])
+
+
+def plan_frame_sources(segments, overlap, fps):
+    """
+    Map every output frame to the source frame it shows.
+
+    Output frame n shows the latest segment to have started at n / fps, as in
+    TimelineClip. Segments are sorted, so the source frame indices never decrease
+    and the source can be decoded in a single forward pass.
+
+    Returns:
+        tuple of np.ndarray: (source_frame, fade) per output frame, where fade is the
+        fade-in gain in [0, 1] (1 outside fade windows).
+    """
+    starts = output_layout(segments, overlap)
+    seg_start = np.array([s for s, _ in segments], dtype=float)
+    duration = starts[-1] + (segments[-1][1] - segments[-1][0])
+    # Same frame count and times as moviepy's Clip.iter_frames
+    t = np.arange(0, int(duration * fps)) / fps
+    i = np.clip(np.searchsorted(starts, t, side="right") - 1, 0, len(segments) - 1)
+    local = t - starts[i]
+    # Same rounding as moviepy's FFMPEG_VideoReader.get_frame
+    source_frame = (fps * (seg_start[i] + local) + 0.00001).astype(np.int64)
+    fade = np.ones(len(t))
+    if overlap > 0:
+        fading = (i > 0) & (local < overlap)
+        fade[fading] = local[fading] / overlap
+    return source_frame, fade
+
+
+def mix_audio(blocks, segments, overlap, sample_rate):
+    """
+    Cut and mix the kept audio from a forward stream of source blocks.
+
+    Segment i is placed at its output start; overlapping tails and heads are summed,
+    like CompositeAudioClip. Only the unfinished overlap window is buffered.
+
+    Yields:
+        np.ndarray: Finished output samples in order.
+    """
+    seg = np.round(np.array(segments, dtype=float) * sample_rate).astype(np.int64)
+    out_start = np.round(output_layout(segments, overlap) * sample_rate).astype(np.int64)
+    pending = np.zeros((0, 2), dtype=np.float32)  # Output samples from `flushed` on
+    flushed = 0
+    src = 0
+    i = 0
+    for block in blocks:
+        block_end = src + len(block)
+        while i < len(seg):
+            s, e = seg[i]
+            lo, hi = max(s, src), min(e, block_end)
+            if lo < hi:
+                dst = out_start[i] + (lo - s) - flushed
+                if dst + (hi - lo) > len(pending):
+                    pending = np.concatenate(
+                        [pending, np.zeros((dst + (hi - lo) - len(pending), 2), np.float32)]
+                    )
+                pending[dst : dst + (hi - lo)] += block[lo - src : hi - src]
+            if e > block_end:
+                break
+            i += 1
+        # Output is final up to where the current segment resumes writing, and
+        # before the next segment's start (which overlaps the current tail)
+        if i < len(seg):
+            ready_upto = out_start[i] + max(0, block_end - seg[i][0])
+            if i + 1 < len(seg):
+                ready_upto = min(ready_upto, out_start[i + 1])
+        else:
+            ready_upto = flushed + len(pending)
+        ready = min(ready_upto - flushed, len(pending))
+        if ready > 0:
+            yield pending[:ready]
+            pending = pending[ready:]
+            flushed += ready
+        src = block_end
+        if i >= len(seg):
+            break
+    if len(pending):
+        yield pending
+
+
+def read_pcm_blocks(stream, sample_rate, channels=2, block_duration=10.0):
+    """Read float32 PCM from an open binary stream in blocks of shape (n, channels)."""
+    block_bytes = max(1, int(block_duration * sample_rate)) * 4 * channels
+    while True:
+        data = stream.read(block_bytes)
+        if len(data) < 4 * channels:
+            return
+        yield np.frombuffer(data[: len(data) - len(data) % (4 * channels)], dtype=np.float32).reshape(-1, channels)
+
+
+def write_wav(path, chunks, sample_rate, channels=2):
+    """Write float chunks of shape (n, channels) to a 16-bit PCM WAV file."""
+    with wave.open(path, "wb") as w:
+        w.setnchannels(channels)
+        w.setsampwidth(2)
+        w.setframerate(sample_rate)
+        for chunk in chunks:
+            w.writeframes((np.clip(chunk, -1, 1) * 32767).astype("<i2").tobytes())
+
+
+def scaled_size(width, height, target_height):
+    """Frame size scaled to target_height, keeping the aspect ratio and even dimensions."""
+    if not target_height or target_height >= height:
+        return width, height
+    target_height = max(2, target_height // 2 * 2)
+    return max(2, round(width * target_height / height / 2) * 2), target_height
+
+
+def export_sequential(
+    clip_path,
+    segments,
+    output_path,
+    fade,
+    overlap,
+    max_threads,
+    height=None,
+    fps=None,
+    keyframes_only=False,
+    audio_only=False,
+    crf=23,
+):
+    """
+    Render kept segments while reading the source exactly once, front to back.
+
+    A single ffmpeg process decodes the source in order and writes its frames and
+    its audio to two pipes. Frames in cut ranges are discarded and kept frames are
+    piped straight into the encoder, while a thread mixes the kept audio into a
+    WAV file; the encoded video and the audio are muxed once both are done, so the
+    source is never seeked or read twice.
+
+    The optional arguments render a proxy of the same edit: the decoder scales and
+    resamples frames before they reach Python, and with keyframes_only it decodes
+    only keyframes (each is held until the next), which makes decoding high
+    resolution sources far cheaper.
+
+    Args:
+        clip_path (str): Path to the source video.
+        segments (list of tuple): Sorted, non-overlapping (start, end) ranges to keep.
+        output_path (str): Path for the output video file.
+        fade (bool): Crossfade segments as crossfade_sequence does.
+        overlap (float): Crossfade duration in seconds.
+        max_threads (int): Number of threads to use for encoding.
+        height (int): Output frame height (default: the source's).
+        fps (float): Output frame rate (default: the source's).
+        keyframes_only (bool): Decode only the source's keyframes.
+        audio_only (bool): Write only the mixed audio track, as AAC.
+        crf (int): x264 quality; higher is smaller and faster.
+    """
+    from moviepy.video.io.ffmpeg_reader import ffmpeg_parse_infos
+
+    overlap = overlap if fade else 0.0
+    infos = ffmpeg_parse_infos(clip_path)
+
+    with tempfile.TemporaryDirectory(prefix="vidcleanser-") as tmp:
+        has_audio = bool(infos.get("audio_found"))
+        audio_path = os.path.join(tmp, "audio.wav") if has_audio else None
+        if audio_only:
+            if not has_audio:
+                raise RuntimeError(f"{clip_path} has no audio track")
+            blocks = iter_pcm_blocks(clip_path, sample_rate=OUTPUT_SAMPLE_RATE)
+            write_wav(audio_path, mix_audio(blocks, segments, overlap, OUTPUT_SAMPLE_RATE), OUTPUT_SAMPLE_RATE)
+            run_ffmpeg(["-i", audio_path, "-c:a", "aac", "-movflags", "+faststart", output_path])
+            return
+
+        proxy = bool(height or fps or keyframes_only)
+        width, height = scaled_size(*infos["video_size"], height)
+        fps = fps or infos["video_fps"]
+        source_frame, gain = plan_frame_sources(segments, overlap, fps)
+        frame_bytes = width * height * 3
+        video_path = os.path.join(tmp, "video.mkv") if has_audio else output_path
+
+        skip, filters = [], []
+        if proxy:
+            # Resample so frame n of the decoded stream is the source frame shown at n / fps
+            filters = ["-vf", f"scale={width}:{height},fps={fps}"]
+            if keyframes_only:
+                skip = ["-skip_frame", "nokey"]
+        audio_output, pass_fds = [], ()
+        if has_audio:
+            # The decoder's second output: the audio track as float PCM on another pipe
+            audio_read, audio_write = os.pipe()
+            audio_output = ["-map", "0:a:0", "-ac", "2", "-ar", str(OUTPUT_SAMPLE_RATE),
+                            "-f", "f32le", f"pipe:{audio_write}"]
+            pass_fds = (audio_write,)
+        decoder = subprocess.Popen(
+            [ffmpeg_binary(), "-nostdin", "-v", "error"] + skip + ["-i", clip_path, "-map", "0:v:0"]
+            + filters + ["-f", "rawvideo", "-pix_fmt", "rgb24", "pipe:1"] + audio_output,
+            stdout=subprocess.PIPE,
+            pass_fds=pass_fds,
+        )
+        audio_errors = []
+        mixed = threading.Event()
+        mixer = None
+        if has_audio:
+            os.close(audio_write)
+
+            def write_audio_track():
+                try:
+                    with os.fdopen(audio_read, "rb") as stream:
+                        blocks = read_pcm_blocks(stream, OUTPUT_SAMPLE_RATE)
+                        write_wav(audio_path, mix_audio(blocks, segments, overlap, OUTPUT_SAMPLE_RATE),
+                                  OUTPUT_SAMPLE_RATE)
+                        mixed.set()
+                        # Keep draining, since a closed pipe would stop the decoder's video output too
+                        while stream.read(1 << 16):
+                            pass
+                except Exception as e:
+                    audio_errors.append(e)
+                finally:
+                    mixed.set()
+
+            mixer = threading.Thread(target=write_audio_track, daemon=True)
+            mixer.start()
+        encoder = subprocess.Popen(
+            [ffmpeg_binary(), "-nostdin", "-y", "-v", "error", "-f", "rawvideo", "-pix_fmt", "rgb24",
+             "-s", f"{width}x{height}", "-r", f"{fps}", "-i", "-", "-map", "0:v:0",
+             "-c:v", "libx264", "-preset", "ultrafast", "-crf", str(crf), "-pix_fmt", "yuv420p",
+             "-threads", str(max_threads)]
+            + ([] if has_audio else ["-movflags", "+faststart"]) + [video_path],
+            stdin=subprocess.PIPE,
+        )
+        print(f"Rendering {len(source_frame)} frames in one pass...")
+        try:
+            decoded = -1
+            frame = None
+            for wanted, g in zip(source_frame, gain):
+                # Decode forward to the wanted frame, dropping frames in cut ranges
+                while decoded < wanted:
+                    raw = decoder.stdout.read(frame_bytes)
+                    if len(raw) < frame_bytes:
+                        break  # Source ended early; repeat the last frame
+                    frame = raw
+                    decoded += 1
+                if frame is None:
+                    break
+                if g < 1:
+                    faded = np.frombuffer(frame, dtype=np.uint8) * g
+                    encoder.stdin.write(faded.astype(np.uint8).tobytes())
+                else:
+                    encoder.stdin.write(frame)
+            # The audio may trail the frames in the decoder's output; keep the
+            # decoder running until the mixer has read past the last segment
+            while mixer is not None and not mixed.is_set():
+                if not decoder.stdout.read(frame_bytes):
+                    break
+        finally:
+            encoder.stdin.close()
+            encoder.wait()
+            decoder.kill()
+            decoder.stdout.close()
+            decoder.wait()
+            if mixer is not None:
+                mixer.join()
+        if encoder.returncode != 0:
+            raise RuntimeError(f"ffmpeg failed to encode {output_path}")
+        if audio_errors:
+            raise audio_errors[0]
+        if has_audio:
+            run_ffmpeg(["-i", video_path, "-i", audio_path, "-map", "0:v:0", "-map", "1:a:0",
+                        "-c:v", "copy", "-c:a", "aac", "-movflags", "+faststart", output_path])
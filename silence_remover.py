@@ -1,15 +1,44 @@
-from absl import app, flags
+from absl import app, flags, logging
 import os
-from moviepy import VideoFileClip, concatenate_videoclips
-from moviepy.Clip import Clip
-from moviepy.video.compositing.CompositeVideoClip import CompositeVideoClip
-from moviepy.video.fx.FadeIn import FadeIn
-from moviepy.video.fx.FadeOut import FadeOut
+import tempfile
+from typing import TYPE_CHECKING
+import numpy as np
+from analysis_cache import DEFAULT_CACHE_DIR, AnalysisCache, file_fingerprint
+from audio_render import export_audio, is_audio_path
+from audio_stream import iter_chunk_levels, iter_pcm_blocks, levels_for_bounds
+from edit_list import read_edit_list, write_edit_list
+from ffmpeg_tools import probe_frame_rate, probe_media, probe_video
+from follow_render import export_follow
+from intervals import IntervalSet
+from parallel_render import export_parallel
+from profiling import stage, write_report
+from sequential_render import export_sequential
+from smart_render import export_stream_copy
+
+# moviepy takes most of the startup time, so it is only imported by the code paths
+# that open or composite video, after flags are parsed
+if TYPE_CHECKING:
+    from moviepy.Clip import Clip
+    from timeline import TimelineClip
 
 FLAGS = flags.FLAGS
 
+# Name of moviepy's intermediate audio file inside each export's private temp directory
 TEMP_AUDIO_FILE = "temp-audio.m4a"
 
+# Audio analysis runs on a 16 kHz decode, read in blocks of this many seconds
+ANALYSIS_FPS = 16000
+# Loudness is the peak over both channels of a stereo decode (as moviepy's reader
+# returns it), so a voice recorded on one channel is measured at its full level
+ANALYSIS_CHANNELS = 2
+ANALYSIS_BLOCK_DURATION = 10.0
+# Largest single read handed to moviepy's audio reader (must fit in its buffer)
+AUDIO_READ_DURATION = 1.0
+# Frame duration of the cached loudness envelope that chunks are aggregated from
+ENVELOPE_RESOLUTION = 0.01
+# x264 quality of preview renders, which only need to show the cuts
+PREVIEW_CRF = 32
+
 def define_flags():
     flags.DEFINE_string(
         "clip_path",
@@ -26,10 +55,109 @@ def define_flags():
     flags.DEFINE_bool("merge", True, "Merge consecutive loud segments")
     flags.DEFINE_float("merge_gap_threshold", 0.05, "Max gap to merge segments in seconds")
     flags.DEFINE_bool("fade_in_out", True, "Apply fade in/out effects")
+    flags.DEFINE_bool(
+        "stream_copy",
+        False,
+        "Copy untouched GOPs from the source and only re-encode cut boundaries "
+        "(ignored when --fade_in_out is set)",
+    )
+    flags.DEFINE_string(
+        "cache_dir", DEFAULT_CACHE_DIR, "Directory for cached analysis results"
+    )
+    flags.DEFINE_bool("cache", True, "Reuse cached analysis results for unchanged inputs")
+    flags.DEFINE_bool(
+        "sequential_render",
+        False,
+        "Decode the source once, front to back, and pipe kept frames straight to the encoder",
+    )
+    flags.DEFINE_integer(
+        "render_workers",
+        1,
+        "Number of worker processes that render shards of the output in parallel",
+    )
+    flags.DEFINE_string(
+        "profile_report", None, "Write per-stage timings, CPU, memory and throughput to this JSON file"
+    )
+    flags.DEFINE_bool(
+        "follow",
+        False,
+        "Clean a recording that is still being written, rendering finished parts as it grows",
+    )
+    flags.DEFINE_float(
+        "follow_lookahead",
+        5.0,
+        "Seconds of audio analyzed past a segment before it is final in --follow mode",
+    )
+    flags.DEFINE_float(
+        "follow_shard_duration", 60.0, "Seconds of output rendered per shard in --follow mode"
+    )
+    flags.DEFINE_float(
+        "follow_idle_timeout",
+        30.0,
+        "Seconds without new data after which a followed recording is considered finished",
+    )
+    flags.DEFINE_bool(
+        "preview",
+        False,
+        "Render a fast low-resolution proxy of the edit instead of the final video "
+        "(default output: <input>_preview.mp4)",
+    )
+    flags.DEFINE_integer("preview_height", 360, "Frame height of the preview")
+    flags.DEFINE_float("preview_fps", 10.0, "Frame rate of the preview")
+    flags.DEFINE_bool(
+        "preview_keyframes_only",
+        True,
+        "Decode only keyframes for the preview, holding each until the next",
+    )
+    flags.DEFINE_bool("preview_audio_only", False, "Render only the audio of the preview")
+    flags.DEFINE_string(
+        "edit_list", None, "Write the kept segments to this file (JSON, or CMX 3600 if it ends in .edl)"
+    )
+    flags.DEFINE_string(
+        "from_edit_list", None, "Render the segments of this edit list instead of analyzing the audio"
+    )
+    flags.DEFINE_enum(
+        "analysis",
+        "chunks",
+        ["chunks", "hysteresis"],
+        "chunks: keep every --chunk_duration chunk louder than --silence_threshold; hysteresis: "
+        "start segments above --silence_threshold and end them at --off_threshold, on a "
+        f"{ENVELOPE_RESOLUTION * 1000:g} ms envelope",
+    )
+    flags.DEFINE_float(
+        "off_threshold", None, "Level that ends a segment in hysteresis analysis (default: half of --silence_threshold)"
+    )
+    flags.DEFINE_float(
+        "min_segment_duration", 0.25, "Shortest loud segment kept by hysteresis analysis, in seconds"
+    )
+    flags.DEFINE_float(
+        "min_gap_duration", 0.3, "Gaps up to this long are closed by hysteresis analysis, in seconds"
+    )
+    flags.DEFINE_enum(
+        "snap",
+        "none",
+        ["none", "frames", "keyframes"],
+        "Move cut points onto video frame boundaries, or onto keyframes within "
+        "--keyframe_snap_tolerance (and frame boundaries elsewhere)",
+    )
+    flags.DEFINE_float(
+        "keyframe_snap_tolerance", 1.0, "Farthest a cut point moves to reach a keyframe, in seconds"
+    )
+    flags.DEFINE_bool(
+        "audio_only",
+        False,
+        "Write only the cleaned audio (WAV, FLAC, AAC, ... by the output extension; default "
+        "output: <input>_cleaned.wav); always used for audio inputs",
+    )
+    flags.DEFINE_bool(
+        "render", True, "Render the output; --norender only analyzes (e.g. to write --edit_list)"
+    )
 
 # === Helper Functions ===
 def load_video_clip(path):
     """Load a video file and handle errors gracefully."""
+    from moviepy import VideoFileClip
+
     try:
         return VideoFileClip(path)
     except Exception as e:
@@ -37,92 +165,274 @@ def load_video_clip(path):
         exit()
 
 
-def detect_loud_segments(clip, chunk_duration, silence_threshold):
-    """Detect loud segments in the video based on audio amplitude."""
-    segments = []
-    # Iterate over the video in chunks of chunk_duration seconds
-    for t_start in range(0, int(clip.duration / chunk_duration)):
-        start = t_start * chunk_duration
-        end = min((t_start + 1) * chunk_duration, clip.duration)
-        if end <= start:
-            continue  # Skip invalid or zero-length chunks
-        sub = clip.subclipped(start, end)  # Extract subclip for this chunk
-        if sub.audio:
-            # Convert audio to numpy array for analysis
-            audio = sub.audio.to_soundarray(fps=16000)
-            # Check if the chunk is loud enough
-            print(f"Analyzing chunk: {start:.2f} - {end:.2f} with max {audio.max():.4f}")
-            if audio.size > 0 and audio.max() > silence_threshold:
-                segments.append((start, end))  # Mark as a loud segment
+def iter_clip_audio_blocks(clip, fps, block_duration):
+    """
+    Decode the audio track of a clip front to back in large blocks.
+
+    Each block is assembled from consecutive reads of at most AUDIO_READ_DURATION
+    seconds, which keeps every request inside the moviepy reader's buffer so the
+    track is streamed sequentially without seeking.
+
+    Yields:
+        np.ndarray: Samples for consecutive blocks of block_duration seconds.
+    """
+    t = 0.0
+    while t < clip.duration:
+        end = min(t + block_duration, clip.duration)
+        tt = np.arange(round(t * fps), round(end * fps)) / fps
+        if len(tt) == 0:
+            break
+        step = max(1, int(AUDIO_READ_DURATION * fps))
+        parts = [
+            clip.audio.to_soundarray(tt=tt[i : i + step], fps=fps)
+            for i in range(0, len(tt), step)
+        ]
+        yield np.concatenate(parts)
+        t = end
+
+
+def clip_file(clip):
+    """The existing file behind a clip (or a path itself), or None."""
+    path = clip if isinstance(clip, str) else getattr(clip, "filename", None)
+    return path if isinstance(path, str) and os.path.exists(path) else None
+
+
+def iter_audio_blocks(clip):
+    """
+    Stream the clip's stereo audio for analysis.
+
+    Clips backed by a file, and file paths, are decoded by piping PCM straight
+    from ffmpeg; other clips fall back to moviepy's reader.
+    """
+    path = clip_file(clip)
+    if path:
+        return iter_pcm_blocks(path, sample_rate=ANALYSIS_FPS, channels=ANALYSIS_CHANNELS)
+    return iter_clip_audio_blocks(clip, ANALYSIS_FPS, ANALYSIS_BLOCK_DURATION)
+
+
+def iter_loud_segments(levels, chunk_duration, silence_threshold, duration):
+    """
+    Yield loud (start, end) chunks from a stream of per-chunk levels.
+
+    Args:
+        levels (iterable): (first_chunk_index, peak, rms) tuples from iter_chunk_levels.
+        chunk_duration (float): Chunk duration in seconds.
+        silence_threshold (float): Chunks whose peak exceeds this are loud.
+        duration (float): Clip duration; chunks past int(duration / chunk_duration) are ignored.
+    """
+    n_chunks = int(duration / chunk_duration)
+    for first_chunk, peak, _ in levels:
+        for i in (np.flatnonzero(peak > silence_threshold) + first_chunk).tolist():
+            if i >= n_chunks:
+                return
+            start = i * chunk_duration
+            end = min((i + 1) * chunk_duration, duration)
+            if end > start:
+                yield (start, end)  # Mark as a loud segment
+        if first_chunk + len(peak) >= n_chunks:
+            return
+
+
+def compute_loudness_envelope(clip, resolution):
+    """
+    Stream the clip's audio once and return its (peak, rms) envelope.
+
+    Each envelope frame covers `resolution` seconds; chunk levels for any coarser
+    chunk duration can then be derived from the envelope without decoding again.
+    Peaks are taken over all channels.
+    """
+    peaks, rms = [np.zeros(0, np.float32)], [np.zeros(0, np.float32)]
+    for _, p, r in iter_chunk_levels(iter_audio_blocks(clip), ANALYSIS_FPS, resolution):
+        peaks.append(p)
+        rms.append(r)
+    return np.concatenate(peaks), np.concatenate(rms)
+
+
+def load_loudness_envelope(clip, resolution, cache=None):
+    """
+    Return the clip's loudness envelope, from the analysis cache when possible.
+
+    Args:
+        clip (VideoClip or str): Clip or media file to analyze; only files are cached.
+        resolution (float): Envelope frame duration in seconds.
+        cache (AnalysisCache): Cache to read from and write to, or None.
+
+    Returns:
+        tuple of np.ndarray: (peak, rms) per envelope frame.
+    """
+    path = clip_file(clip)
+    key = None
+    if cache is not None and path:
+        key = cache.key(path, "loudness", sample_rate=ANALYSIS_FPS, channels=ANALYSIS_CHANNELS, resolution=resolution)
+        cached = cache.load_arrays(key)
+        if cached is not None:
+            print("Using cached loudness envelope.")
+            return cached["peak"], cached["rms"]
+    peak, rms = compute_loudness_envelope(clip, resolution)
+    if key is not None:
+        cache.save_arrays(key, peak=peak, rms=rms)
+    return peak, rms
+
+
+def envelope_chunk_peaks(envelope_peak, resolution, chunk_duration, n_chunks):
+    """Aggregate envelope peaks into n_chunks chunks of chunk_duration seconds."""
+    bounds = np.round(np.arange(n_chunks + 1) * chunk_duration / resolution).astype(np.int64)
+    peak, _ = levels_for_bounds(envelope_peak, bounds)
+    return peak
+
+
+def detect_loud_segments(clip, chunk_duration, silence_threshold, cache=None):
+    """
+    Detect loud segments in the video based on audio amplitude.
+
+    The audio track is reduced once to a fine loudness envelope (streamed in
+    fixed-size blocks, or read from `cache`), and every chunk is scored from it.
+    Changing the threshold or chunk duration therefore never decodes again.
+    """
+    if not clip.audio:
+        return []
+    return envelope_loud_segments(clip, clip.duration, chunk_duration, silence_threshold, cache)
+
+
+def envelope_loud_segments(clip, duration, chunk_duration, silence_threshold, cache=None):
+    """
+    Score the chunks of a clip or media file with an audio track, as detect_loud_segments does.
+
+    Taking the duration separately lets callers that only have a path analyze it
+    without opening it with moviepy.
+    """
+    resolution = min(ENVELOPE_RESOLUTION, chunk_duration)
+    envelope_peak, _ = load_loudness_envelope(clip, resolution, cache)
+    n_chunks = int(duration / chunk_duration)
+    peak = envelope_chunk_peaks(envelope_peak, resolution, chunk_duration, n_chunks)
+    segments = list(iter_loud_segments([(0, peak, None)], chunk_duration, silence_threshold, duration))
+    logging.debug("Analyzed %d chunks of %.2fs.", n_chunks, chunk_duration)
     return segments
 
 
+def hysteresis_segments(peak, resolution, on_threshold, off_threshold, min_segment, min_gap, duration):
+    """
+    Find loud segments in a fine loudness envelope with hysteresis.
+
+    A segment starts where the peak exceeds on_threshold and lasts until it drops
+    to off_threshold or below, so levels wavering between the two thresholds do
+    not split it. Gaps of at most min_gap are then closed, and segments shorter
+    than min_segment (isolated clicks and bumps) are dropped.
+
+    Args:
+        peak (np.ndarray): Peak level per envelope frame.
+        resolution (float): Envelope frame duration in seconds.
+        on_threshold (float): Level above which a segment starts.
+        off_threshold (float): Level at or below which a segment ends.
+        min_segment (float): Minimum segment duration in seconds.
+        min_gap (float): Gaps up to this many seconds are closed.
+        duration (float): Media duration; segments end no later than this.
+
+    Returns:
+        list of tuple: Sorted, non-overlapping (start, end) ranges.
+    """
+    off_threshold = min(off_threshold, on_threshold)
+    idx = np.arange(len(peak))
+    # Each frame takes the state of the latest frame that crossed either threshold
+    last_on = np.maximum.accumulate(np.where(peak > on_threshold, idx, -1))
+    last_off = np.maximum.accumulate(np.where(peak <= off_threshold, idx, -1))
+    edges = np.diff(np.concatenate([[0], (last_on > last_off).astype(np.int8), [0]]))
+    # Merge and filter in whole frames, so durations equal to the limits count as within them
+    eps = 1e-6
+    frames = IntervalSet(np.flatnonzero(edges == 1), np.flatnonzero(edges == -1))
+    frames = frames.merge(min_gap / resolution + eps).drop_shorter(min_segment / resolution - eps)
+    segments = IntervalSet(frames.starts * resolution, frames.ends * resolution)
+    return segments.clip(0, duration).to_list()
+
+
+def snap_segments(segments, fps, duration, keyframes=None, keyframe_tolerance=0.0):
+    """
+    Move cut points onto video frame boundaries, or onto nearby keyframes.
+
+    Segments only ever grow: starts move back and ends move forward. With
+    keyframes, a start within keyframe_tolerance after a keyframe moves back to
+    it and an end within keyframe_tolerance before one moves forward to it, so
+    stream copy can take whole GOPs there instead of re-encoding partial ones.
+    Every other cut point is moved to the enclosing frame boundary. Segments that
+    meet after snapping are merged.
+
+    Args:
+        segments (list of tuple): Sorted (start, end) ranges in seconds.
+        fps (float): Frame rate of the video.
+        duration (float): Media duration; segments end no later than this.
+        keyframes (list of float): Sorted keyframe times, or None to snap to frames only.
+        keyframe_tolerance (float): Farthest a cut point moves to reach a keyframe.
+
+    Returns:
+        list of tuple: Snapped, merged (start, end) ranges.
+    """
+    if not segments:
+        return []
+    arr = np.asarray(segments, dtype=float).reshape(-1, 2)
+    # Tolerance against float error in times that already sit on a frame
+    eps = 1e-6
+    starts = np.floor(arr[:, 0] * fps + eps) / fps
+    ends = np.ceil(arr[:, 1] * fps - eps) / fps
+    if keyframes:
+        k = np.asarray(keyframes, dtype=float)
+        before = np.searchsorted(k, arr[:, 0] + eps, side="right") - 1
+        prev_k = k[np.maximum(before, 0)]
+        move = (before >= 0) & (arr[:, 0] - prev_k <= keyframe_tolerance)
+        starts[move] = prev_k[move]
+        after = np.searchsorted(k, arr[:, 1] - eps, side="left")
+        next_k = k[np.minimum(after, len(k) - 1)]
+        move = (after < len(k)) & (next_k - arr[:, 1] <= keyframe_tolerance)
+        ends[move] = next_k[move]
+    return IntervalSet(starts, ends).clip(0, duration).merge().to_list()
+
+
 def merge_close_segments(segments, gap_threshold):
     """
     Merge consecutive segments if the gap between them is less than or equal to gap_threshold.
 
     Args:
-        segments (list of tuple): List of (start, end) tuples representing segments.
+        segments (iterable of tuple): (start, end) tuples representing segments.
         gap_threshold (float): Maximum allowed gap (in seconds) to merge segments.
 
     Returns:
         list of tuple: Merged list of (start, end) tuples.
     """
-    if not segments:
-        return []
-    merged = []
-    s, e = segments[0]
-    for ns, ne in segments[1:]:
-        # If the next segment starts within the threshold, extend the current segment
-        if ns - e <= gap_threshold:
-            e = ne
-        else:
-            merged.append((s, e))
-            s, e = ns, ne
-    merged.append((s, e))  # Add the last segment
-    return merged
+    return IntervalSet.from_pairs(segments).merge(gap_threshold).to_list()
+
 
 def pad_segments(segments, padding, clip_duration):
-    padded = []
-    for start, end in segments:
-        padded_start = max(0, start - padding)
-        padded_end = min(clip_duration, end + padding)
-        padded.append((padded_start, padded_end))
-    return padded
+    """
+    Pad every segment by `padding` seconds on both sides, within the clip.
+
+    Segments that overlap or touch after padding are merged, so the result never
+    renders the same frame twice.
+    """
+    return IntervalSet.from_pairs(segments).pad(padding).clip(0, clip_duration).merge().to_list()
 
 
-def crossfade_sequence(clips: list[Clip], overlap: float) -> CompositeVideoClip:
+def crossfade_sequence(clips: list["Clip"], overlap: float) -> "TimelineClip":
     """
     Build a composite video by sequencing clips with crossfade transitions.
 
-    Each clip is placed sequentially, with optional fade-in and fade-out effects
-    applied to create smooth transitions between clips.
+    Each clip is placed sequentially, overlapping the previous one by `overlap`
+    seconds, and fades in over that overlap. Clips are laid out on an indexed
+    timeline, so rendering a frame only touches the clip visible at that time
+    regardless of how many clips there are.
 
     Args:
         clips (list[Clip]): List of video clips to sequence.
         overlap (float): Duration (in seconds) of the crossfade between clips.
 
     Returns:
-        CompositeVideoClip: The resulting composite video with crossfades.
-    """
-    result = []
-    t = 0  # Track the start time for each clip in the sequence
-    for i, clip in enumerate(clips):
-        c = clip.with_start(t)  # Set the start time for the current clip
-        if i > 0:
-            # Apply fade-in to all but the first clip
-            c = c.with_effects([FadeIn(overlap)])
-        if i < len(clips) - 1:
-            # Apply fade-out to all but the last clip
-            c = c.with_effects([FadeOut(overlap)])
-        result.append(c)
-        # Move the timeline forward, overlapping by the fade duration
-        t += clip.duration - overlap
-    return CompositeVideoClip(result)
+        TimelineClip: The resulting composite video with crossfades.
+    """
+    from timeline import TimelineClip
+
+    return TimelineClip(clips, overlap, fade=True)
 
 
 # === Export ===
-def export_final_video(final_video, output_path, subclips, clip, max_threads):
+def export_final_video(final_video, output_path, subclips, clip, max_threads, raise_errors=False):
     """
     Export the final video to disk and handle cleanup.
 
@@ -132,14 +442,18 @@ def export_final_video(final_video, output_path, subclips, clip, max_threads):
         subclips (list): List of subclip objects to close after export.
         clip (VideoClip): The original loaded video clip to close after export.
         max_threads (int): Number of threads to use for encoding.
+        raise_errors (bool): Re-raise export errors instead of only printing them.
     """
+    # A private directory per export, so concurrent jobs never share temp files
+    tmp = tempfile.TemporaryDirectory(prefix="vidcleanser-")
+    temp_audio_file = os.path.join(tmp.name, TEMP_AUDIO_FILE)
     try:
         print(f"Exporting to {output_path}...")
         final_video.write_videofile(
             output_path,
             codec="libx264",
             audio_codec="aac",
-            temp_audiofile=TEMP_AUDIO_FILE,
+            temp_audiofile=temp_audio_file,
             remove_temp=True,
             ffmpeg_params=["-preset", "ultrafast", "-crf", "23", "-movflags", "+faststart"],
             threads=max_threads,
@@ -148,7 +462,7 @@ def export_final_video(final_video, output_path, subclips, clip, max_threads):
         #     output_path,
         #     codec="h264_videotoolbox",  # ✅ Hardware-accelerated on Apple Silicon
         #     audio_codec="aac",
-        #     temp_audiofile=TEMP_AUDIO_FILE,
+        #     temp_audiofile=temp_audio_file,
         #     remove_temp=True,
         #     ffmpeg_params=[
         #         "-b:v", "25000k",           # Fixed high bitrate for good quality
@@ -159,18 +473,166 @@ def export_final_video(final_video, output_path, subclips, clip, max_threads):
         print("Done exporting.")
     except Exception as e:
         print(f"Error during export: {e}")
+        if raise_errors:
+            raise
     finally:
         # Clean up all resources to avoid file locks or memory leaks
         for c in subclips:
             c.close()
         final_video.close()
         clip.close()
-        # Remove temp audio file if it exists
-        if os.path.exists(TEMP_AUDIO_FILE):
-            try:
-                os.remove(TEMP_AUDIO_FILE)
-            except Exception as e:
-                print(f"Warning: Could not remove {TEMP_AUDIO_FILE}: {e}")
+        # Remove the temp directory and anything moviepy left in it
+        tmp.cleanup()
+
+
+def render_segments(
+    clip_path,
+    segments,
+    output_path,
+    fade,
+    fade_duration,
+    stream_copy=False,
+    sequential_render=False,
+    render_workers=1,
+    max_threads=None,
+    raise_errors=False,
+):
+    """
+    Render the kept segments of a video into a single output file.
+
+    Args:
+        clip_path (str): Path to the source video.
+        segments (list of tuple): Sorted, non-overlapping (start, end) ranges to keep.
+        output_path (str): Path for the output video file.
+        fade (bool): Crossfade consecutive segments.
+        fade_duration (float): Crossfade duration in seconds.
+        stream_copy (bool): Copy untouched GOPs and only re-encode cut boundaries.
+        sequential_render (bool): Decode the source once, front to back.
+        render_workers (int): Number of processes rendering shards in parallel.
+        max_threads (int): Number of threads to use for encoding.
+        raise_errors (bool): Raise if the moviepy export fails, instead of only printing the error.
+    """
+    max_threads = max_threads or os.cpu_count()
+    overlap = fade_duration if fade else 0.0
+    output_duration = sum(e - s for s, e in segments) - overlap * (len(segments) - 1)
+    output_frames = int(output_duration * (probe_frame_rate(clip_path) or 0))
+    if stream_copy:
+        if fade:
+            print("--stream_copy cannot apply fades; using a full re-encode instead.")
+        else:
+            with stage("encode", output_duration, output_frames) as s:
+                s["mode"] = "stream_copy"
+                copied = export_stream_copy(clip_path, segments, output_path, max_threads)
+            if copied:
+                print("Done exporting.")
+                return
+
+    if sequential_render:
+        with stage("encode", output_duration, output_frames) as s:
+            s["mode"] = "sequential"
+            export_sequential(clip_path, segments, output_path, fade, fade_duration, max_threads)
+        print("Done exporting.")
+        return
+
+    clip = load_video_clip(clip_path)
+    if render_workers > 1:
+        fps = clip.fps
+        clip.close()
+        with stage("encode", output_duration, output_frames) as s:
+            s["mode"] = "parallel"
+            export_parallel(
+                clip_path, segments, output_path, fade, fade_duration, fps, render_workers, max_threads
+            )
+        print("Done exporting.")
+        return
+
+    print("Converting segments to subclips...")
+    with stage("subclip_build"):
+        subclips = [clip.subclipped(start, end) for (start, end) in segments]
+    print(f"Created {len(subclips)} subclips.")
+
+    print("Creating final video...")
+    from timeline import TimelineClip
+
+    with stage("composite"):
+        if fade:
+            final_video = crossfade_sequence(subclips, fade_duration)
+        else:
+            final_video = TimelineClip(subclips)
+
+    print("Exporting final video...")
+    with stage("encode", output_duration, output_frames) as s:
+        s["mode"] = "moviepy"
+        export_final_video(final_video, output_path, subclips, clip, max_threads, raise_errors)
+
+
+def find_segments(
+    clip_path,
+    chunk_duration,
+    silence_threshold,
+    merge,
+    merge_gap_threshold,
+    padding,
+    cache=None,
+    hysteresis=None,
+):
+    """
+    Detect, merge and pad the loud segments of a video or audio file.
+
+    With hysteresis set to (off_threshold, min_segment, min_gap), segments are found
+    by hysteresis_segments instead of by chunks, and silence_threshold is the
+    level that starts a segment. The file is probed with ffmpeg rather than opened
+    with moviepy, so a cached analysis returns without importing moviepy.
+    """
+    try:
+        infos = probe_media(clip_path)
+    except RuntimeError as e:
+        print(f"Error loading video file: {e}")
+        exit()
+    duration = infos["duration"]
+
+    print("Detecting loud segments...")
+    with stage("detect_silence", duration):
+        if not infos["audio_found"]:
+            segments = []
+        elif hysteresis:
+            envelope_peak, _ = load_loudness_envelope(clip_path, ENVELOPE_RESOLUTION, cache)
+            segments = hysteresis_segments(
+                envelope_peak, ENVELOPE_RESOLUTION, silence_threshold, *hysteresis, duration
+            )
+        else:
+            segments = envelope_loud_segments(clip_path, duration, chunk_duration, silence_threshold, cache)
+    print(f"Detected {len(segments)} segments.")
+
+    with stage("merge_pad"):
+        if merge:
+            print("Merging close segments...")
+            segments = merge_close_segments(segments, merge_gap_threshold)
+
+        print("Adding padding to segments...")
+        segments = pad_segments(segments, padding, duration)
+    print("Padding done")
+    return segments
+
+
+def snap_cut_points(clip_path, segments, keyframes, keyframe_tolerance):
+    """Snap segments to the frames, or keyframes, of a video with snap_segments."""
+    infos = probe_media(clip_path)
+    if not infos["video_found"] or not infos["video_fps"]:
+        return segments
+    times = probe_video(clip_path)[0] if keyframes else None
+    snapped = snap_segments(segments, infos["video_fps"], infos["duration"], times, keyframe_tolerance)
+    print(f"Snapped {len(segments)} segments to {len(snapped)} on {'keyframes' if keyframes else 'frames'}.")
+    return snapped
+
+
+def load_edit_list_segments(path, clip_path):
+    """Read the segments of an edit list, warning if it was made for another file."""
+    edits = read_edit_list(path, probe_frame_rate(clip_path))
+    if edits["fingerprint"] and edits["fingerprint"] != file_fingerprint(clip_path):
+        print(f"Warning: {path} was made for a different version of {clip_path}.")
+    print(f"Loaded {len(edits['segments'])} segments from {path}.")
+    return edits["segments"]
 
 
 def main(argv):
@@ -186,38 +648,117 @@ def main(argv):
     MERGE_GAP_THRESHOLD = FLAGS.merge_gap_threshold
     FADE_IN_OUT = FLAGS.fade_in_out
     PADDING = FLAGS.padding
-
-    clip = load_video_clip(clip_path)
-
-    print("Detecting loud segments...")
-    segments = detect_loud_segments(clip, CHUNK_DURATION, SILENCE_THRESHOLD)
-    print(f"Detected {len(segments)} segments.")
-
-    if MERGE_CONSECUTIVE_CLIPS:
-        print("Merging close segments...")
-        segments = merge_close_segments(segments, MERGE_GAP_THRESHOLD)
-    
-    print("Adding padding to segments...")
-    segments = pad_segments(segments, PADDING, clip.duration)
-    print("Padding done")
+    HYSTERESIS = None
+    if FLAGS.analysis == "hysteresis":
+        off_threshold = FLAGS.off_threshold if FLAGS.off_threshold is not None else SILENCE_THRESHOLD / 2
+        HYSTERESIS = (off_threshold, FLAGS.min_segment_duration, FLAGS.min_gap_duration)
+
+    if FLAGS.follow:
+        if FLAGS.stream_copy or FLAGS.sequential_render:
+            print("--follow renders rolling shards; ignoring --stream_copy and --sequential_render.")
+        with stage("follow"):
+            written = export_follow(
+                clip_path,
+                output_path,
+                CHUNK_DURATION,
+                SILENCE_THRESHOLD,
+                MERGE_GAP_THRESHOLD if MERGE_CONSECUTIVE_CLIPS else 0.0,
+                PADDING,
+                FADE_IN_OUT,
+                FADE_DURATION,
+                FLAGS.follow_lookahead,
+                FLAGS.follow_shard_duration,
+                FLAGS.follow_idle_timeout,
+                FLAGS.render_workers,
+                max_threads,
+            )
+        print("Done exporting." if written else "No loud segments found.")
+        if FLAGS.profile_report:
+            write_report(FLAGS.profile_report, input=clip_path, follow=True)
+        return
+
+    # Audio is cut by slicing decoded samples, without opening or encoding video
+    audio_only = FLAGS.audio_only or is_audio_path(clip_path)
+
+    if FLAGS.from_edit_list:
+        segments = load_edit_list_segments(FLAGS.from_edit_list, clip_path)
+    else:
+        segments = find_segments(
+            clip_path,
+            CHUNK_DURATION,
+            SILENCE_THRESHOLD,
+            MERGE_CONSECUTIVE_CLIPS,
+            MERGE_GAP_THRESHOLD,
+            PADDING,
+            AnalysisCache(FLAGS.cache_dir) if FLAGS.cache else None,
+            HYSTERESIS,
+        )
+        if FLAGS.snap != "none" and not audio_only:
+            with stage("snap"):
+                segments = snap_cut_points(clip_path, segments, FLAGS.snap == "keyframes", FLAGS.keyframe_snap_tolerance)
+        if FLAGS.edit_list:
+            settings = {
+                "silence_threshold": SILENCE_THRESHOLD,
+                "chunk_duration": CHUNK_DURATION,
+                "merge": MERGE_CONSECUTIVE_CLIPS,
+                "merge_gap_threshold": MERGE_GAP_THRESHOLD,
+                "padding": PADDING,
+                "analysis": FLAGS.analysis,
+                "snap": FLAGS.snap,
+            }
+            if HYSTERESIS:
+                settings["off_threshold"], settings["min_segment_duration"], settings["min_gap_duration"] = HYSTERESIS
+            write_edit_list(FLAGS.edit_list, segments, clip_path, settings, probe_frame_rate(clip_path))
 
     if not segments:
         print("No loud segments found. Exiting.")
-        clip.close()
         exit()
 
-    print("Converting segments to subclips...")
-    subclips = [clip.subclipped(start, end) for (start, end) in segments]
-    print(f"Created {len(subclips)} subclips.")
-
-    print("Creating final video...")
-    if FADE_IN_OUT:
-        final_video = crossfade_sequence(subclips, FADE_DURATION)
+    if not FLAGS.render:
+        print(f"Found {len(segments)} segments to keep; skipping render.")
+    elif audio_only:
+        audio_path = FLAGS.output_path if FLAGS.output_path else clip_path + "_cleaned.wav"
+        print(f"Exporting audio to {audio_path}...")
+        with stage("encode") as s:
+            s["mode"] = "audio"
+            s["media_seconds"] = export_audio(
+                clip_path, segments, audio_path, FADE_DURATION if FADE_IN_OUT else 0.0
+            )
+        print("Done exporting.")
+    elif FLAGS.preview:
+        suffix = "_preview.m4a" if FLAGS.preview_audio_only else "_preview.mp4"
+        preview_path = FLAGS.output_path if FLAGS.output_path else clip_path + suffix
+        print(f"Rendering preview to {preview_path}...")
+        with stage("encode") as s:
+            s["mode"] = "preview"
+            export_sequential(
+                clip_path,
+                segments,
+                preview_path,
+                FADE_IN_OUT,
+                FADE_DURATION,
+                max_threads,
+                height=FLAGS.preview_height,
+                fps=FLAGS.preview_fps,
+                keyframes_only=FLAGS.preview_keyframes_only,
+                audio_only=FLAGS.preview_audio_only,
+                crf=PREVIEW_CRF,
+            )
+        print("Done exporting.")
     else:
-        final_video = concatenate_videoclips(subclips, method="compose")
-
-    print("Exporting final video...")
-    export_final_video(final_video, output_path, subclips, clip, max_threads)
+        render_segments(
+            clip_path,
+            segments,
+            output_path,
+            FADE_IN_OUT,
+            FADE_DURATION,
+            FLAGS.stream_copy,
+            FLAGS.sequential_render,
+            FLAGS.render_workers,
+            max_threads,
+        )
+    if FLAGS.profile_report:
+        write_report(FLAGS.profile_report, input=clip_path, segments=len(segments))
 
 
 if __name__ == "__main__":
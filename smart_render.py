@@ -0,0 +1,195 @@
+import bisect
+import os
+import tempfile
+from ffmpeg_tools import probe_video, run_ffmpeg
+
+# Source codecs whose boundary GOPs can be re-encoded to match the copied ones.
+# Parameter sets are repeated in-band so decoders pick them up at each join.
+SMART_RENDER_ENCODERS = {
+    "h264": ["-c:v", "libx264", "-x264-params", "repeat-headers=1"],
+    "hevc": ["-c:v", "libx265", "-x265-params", "repeat-headers=1"],
+}
+
+# Copy ranges shorter than this are not worth splitting out of a re-encode
+MIN_COPY_DURATION = 0.5
+
+
+def plan_smart_segments(segments, keyframes, frame_duration, min_copy=MIN_COPY_DURATION):
+    """
+    Split kept segments into stream-copy and re-encode pieces.
+
+    The whole GOPs inside each segment are copied; only the partial GOP before the
+    first keyframe and after the last keyframe are re-encoded.
+
+    Args:
+        segments (list of tuple): Sorted (start, end) ranges to keep.
+        keyframes (list of float): Sorted keyframe times of the source video.
+        frame_duration (float): Duration of one video frame, used as a snapping tolerance.
+        min_copy (float): Minimum duration of a copy piece.
+
+    Returns:
+        list of tuple: (start, end, mode) pieces with mode "copy" or "encode".
+    """
+    tol = frame_duration / 2
+    pieces = []
+    for start, end in segments:
+        # First keyframe at/after start and last keyframe at/before end
+        i = bisect.bisect_left(keyframes, start - tol)
+        j = bisect.bisect_right(keyframes, end + tol) - 1
+        if i > j or keyframes[j] - keyframes[i] < min_copy:
+            pieces.append((start, end, "encode"))
+            continue
+        k_first, k_last = keyframes[i], keyframes[j]
+        if k_first - start > tol:
+            pieces.append((start, k_first, "encode"))
+        pieces.append((max(start, k_first), k_last, "copy"))
+        if end - k_last > tol:
+            pieces.append((k_last, end, "encode"))
+    return pieces
+
+
+def build_audio_filter(segments):
+    """Build an ffmpeg filter that keeps only the given ranges of the audio track."""
+    keep = "+".join(f"between(t,{s:.6f},{e:.6f})" for s, e in segments)
+    return f"[0:a:0]aselect='{keep}',asetpts=N/SR/TB[aout]"
+
+
+def split_at_keyframes(clip_path, times, tol, out_dir):
+    """
+    Split the source video into stream-copied files at the given keyframe times.
+
+    Runs in a single -c copy pass. The segment muxer only cuts on keyframe packets,
+    so every file holds whole GOPs: the first one starts at 0, each later one at
+    one of `times`, and the last one runs to the end of the video.
+
+    The times in the muxer's segment list are shifted by the delay the muxer adds
+    to keep timestamps non-negative (the B-frame reorder delay of most MP4 files).
+    That shift is measured from the first cut and removed, so the returned spans
+    are on the same time base as probe_video's keyframe times.
+
+    Args:
+        clip_path (str): Path to the source video.
+        times (list of float): Sorted keyframe times to cut at; a time at 0 is ignored.
+        tol (float): Tolerance for matching a cut to its keyframe, e.g. half a frame.
+        out_dir (str): Directory for the files and the segment list.
+
+    Returns:
+        list of tuple: Sorted (start_time, end_time, path) of the files written.
+
+    Raises:
+        RuntimeError: If the muxer did not cut exactly at the given times.
+    """
+    # A cut at 0 makes the muxer cut again at the next keyframe instead
+    times = [t for t in times if t > tol]
+    list_path = os.path.join(out_dir, "gops.csv")
+    run_ffmpeg(
+        ["-i", clip_path, "-map", "0:v:0", "-an", "-c:v", "copy",
+         "-f", "segment", "-reset_timestamps", "1"]
+        + (["-segment_times", ",".join(f"{t - tol:.6f}" for t in times)] if times else [])
+        + ["-segment_list", list_path, "-segment_list_type", "csv",
+           os.path.join(out_dir, "gop_%05d.mkv")]
+    )
+    rows = []
+    with open(list_path) as f:
+        for line in f:
+            name, start, end = line.strip().rsplit(",", 2)
+            rows.append((float(start), float(end), os.path.join(out_dir, name)))
+    rows.sort()
+    if len(rows) != len(times) + 1:
+        raise RuntimeError(f"Expected {len(times) + 1} stream-copied files from {clip_path}, got {len(rows)}")
+    shift = rows[1][0] - times[0] if times else 0.0
+    files = []
+    for n, (start, end, path) in enumerate(rows):
+        start = start - shift if n else 0.0
+        if n and abs(start - times[n - 1]) > tol:
+            raise RuntimeError(f"Stream copy of {clip_path} was cut at {start:.3f}s instead of {times[n - 1]:.3f}s")
+        files.append((start, end - shift, path))
+    return files
+
+
+def copy_file_for(gop_files, start, end, tol):
+    """
+    Find the file from split_at_keyframes that spans exactly [start, end].
+
+    Raises:
+        RuntimeError: If no file matches, which would put the wrong frames in the output.
+    """
+    for file_start, file_end, path in gop_files:
+        if abs(file_start - start) <= tol and abs(file_end - end) <= tol:
+            return path
+    raise RuntimeError(f"No stream-copied file spans {start:.3f}-{end:.3f}s")
+
+
+def export_stream_copy(clip_path, segments, output_path, max_threads):
+    """
+    Export kept segments by copying untouched GOPs from the source.
+
+    Each segment is split into pieces by plan_smart_segments. Copy pieces come from
+    one -c copy pass that splits the source at the chosen keyframes, boundary pieces are re-encoded with the source's
+    codec and pixel format, and all pieces are joined with ffmpeg's concat demuxer.
+    The audio is cut in a single pass and muxed with the joined video.
+
+    Args:
+        clip_path (str): Path to the source video.
+        segments (list of tuple): Sorted, non-overlapping (start, end) ranges to keep.
+        output_path (str): Path for the output video file.
+        max_threads (int): Number of threads to use for re-encoding.
+
+    Returns:
+        bool: False if the source codec cannot be smart-rendered (nothing is written),
+        True once the output has been written.
+    """
+    from moviepy.video.io.ffmpeg_reader import ffmpeg_parse_infos
+
+    infos = ffmpeg_parse_infos(clip_path)
+    encoder = SMART_RENDER_ENCODERS.get(infos.get("video_codec_name"))
+    if encoder is None:
+        print(f"Stream copy not supported for codec {infos.get('video_codec_name')}.")
+        return False
+
+    keyframes, pix_fmt = probe_video(clip_path)
+    fps = infos.get("video_fps") or 30.0
+    pieces = plan_smart_segments(segments, keyframes, 1.0 / fps)
+    n_copy = sum(1 for p in pieces if p[2] == "copy")
+    print(f"Smart render: {n_copy} copied and {len(pieces) - n_copy} re-encoded pieces.")
+
+    with tempfile.TemporaryDirectory(prefix="vidcleanser-") as tmp:
+        # Split the source at every copy boundary in a single -c copy pass. The
+        # segment muxer cuts on keyframe packets, so each file holds whole GOPs.
+        boundaries = sorted({t for start, end, mode in pieces if mode == "copy" for t in (start, end)})
+        gop_files = split_at_keyframes(clip_path, boundaries, 0.5 / fps, tmp)
+
+        list_lines = []
+        for n, (start, end, mode) in enumerate(pieces):
+            if mode == "copy":
+                piece_path = copy_file_for(gop_files, start, end, 0.5 / fps)
+            else:
+                piece_path = os.path.join(tmp, f"piece_{n:05d}.mkv")
+                codec_args = encoder + ["-preset", "veryfast", "-crf", "18", "-threads", max_threads]
+                if pix_fmt:
+                    codec_args += ["-pix_fmt", pix_fmt]
+                run_ffmpeg(
+                    ["-ss", f"{start:.6f}", "-i", clip_path, "-t", f"{end - start:.6f}",
+                     "-map", "0:v:0", "-an"] + codec_args + [piece_path]
+                )
+            list_lines.append(f"file '{piece_path}'\n")
+
+        list_path = os.path.join(tmp, "pieces.txt")
+        with open(list_path, "w") as f:
+            f.writelines(list_lines)
+
+        inputs = ["-f", "concat", "-safe", "0", "-i", list_path]
+        maps = ["-map", "0:v:0"]
+        if infos.get("audio_found"):
+            filter_path = os.path.join(tmp, "audio_filter.txt")
+            with open(filter_path, "w") as f:
+                f.write(build_audio_filter(segments))
+            audio_path = os.path.join(tmp, "audio.m4a")
+            run_ffmpeg(["-i", clip_path, "-filter_complex_script", filter_path,
+                        "-map", "[aout]", "-c:a", "aac", audio_path])
+            inputs += ["-i", audio_path]
+            maps += ["-map", "1:a:0"]
+
+        print(f"Joining pieces into {output_path}...")
+        run_ffmpeg(inputs + maps + ["-c", "copy", "-movflags", "+faststart", output_path])
+    return True
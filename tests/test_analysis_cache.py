@@ -0,0 +1,67 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+import numpy as np
+from analysis_cache import AnalysisCache
+
+
+class TestAnalysisCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = AnalysisCache(os.path.join(self.tmp.name, "cache"))
+        self.src = os.path.join(self.tmp.name, "input.mov")
+        with open(self.src, "wb") as f:
+            f.write(b"x" * 100)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_arrays_round_trip(self):
+        key = self.cache.key(self.src, "loudness", resolution=0.01)
+        self.assertIsNone(self.cache.load_arrays(key))
+        self.cache.save_arrays(key, peak=np.arange(3.0))
+        np.testing.assert_array_equal(self.cache.load_arrays(key)["peak"], [0, 1, 2])
+
+    def test_json_round_trip(self):
+        key = self.cache.key(self.src, "whisper", model="large")
+        self.cache.save_json(key, {"text": "hi"})
+        self.assertEqual(self.cache.load_json(key), {"text": "hi"})
+
+    def test_key_depends_on_params_and_content(self):
+        key = self.cache.key(self.src, "loudness", resolution=0.01)
+        self.assertNotEqual(key, self.cache.key(self.src, "loudness", resolution=0.02))
+        with open(self.src, "wb") as f:
+            f.write(b"y" * 100)
+        self.assertNotEqual(key, AnalysisCache(self.cache.cache_dir).key(self.src, "loudness", resolution=0.01))
+
+    def test_evicts_least_recently_used(self):
+        cache = AnalysisCache(self.cache.cache_dir, max_bytes=1500)
+        cache.save_json("a", "x" * 600)
+        old = time.time() - 100
+        os.utime(os.path.join(cache.cache_dir, "a.json"), (old, old))
+        cache.save_json("b", "x" * 600)
+        cache.save_json("c", "x" * 600)
+        self.assertIsNone(cache.load_json("a"))
+        self.assertIsNotNone(cache.load_json("c"))
+
+    def test_evict_skips_entries_removed_concurrently(self):
+        cache = AnalysisCache(self.cache.cache_dir, max_bytes=1000)
+        cache.save_json("a", "x" * 600)
+        real_stat = os.stat
+
+        def stat(path, *args, **kwargs):
+            if path.endswith("b.json"):
+                raise FileNotFoundError(path)
+            return real_stat(path, *args, **kwargs)
+
+        with open(os.path.join(cache.cache_dir, "b.json"), "w") as f:
+            f.write("1")
+        with patch("analysis_cache.os.stat", side_effect=stat), \
+                patch("analysis_cache.os.remove", side_effect=FileNotFoundError):
+            cache.save_json("c", "x" * 600)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import os
+import tempfile
+import unittest
+import wave
+from unittest.mock import MagicMock, patch
+import numpy as np
+from audio_render import cut_audio, export_audio, is_audio_path, iter_cut_audio, write_audio
+
+
+class TestAudioRender(unittest.TestCase):
+    def test_is_audio_path(self):
+        self.assertTrue(is_audio_path("episode.FLAC"))
+        self.assertTrue(is_audio_path("/x/talk.m4a"))
+        self.assertFalse(is_audio_path("talk.mov"))
+
+    def test_cut_audio_concatenates_without_overlap(self):
+        src = np.arange(100, dtype=np.float32)[:, None].repeat(2, axis=1)
+        out = cut_audio(src, [(1, 3), (4, 6)], sample_rate=10)
+        np.testing.assert_array_equal(out[:, 0], np.concatenate([src[10:30, 0], src[40:60, 0]]))
+
+    def test_cut_audio_crossfade_keeps_level(self):
+        src = np.ones((100, 2), dtype=np.float32)
+        out = cut_audio(src, [(1, 3), (4, 6)], sample_rate=10, overlap=0.5)
+        # 20 + 20 samples overlapping by 5; complementary ramps sum to one
+        self.assertEqual(len(out), 35)
+        np.testing.assert_allclose(out, 1.0, atol=1e-6)
+
+    def test_cut_audio_crossfade_ramps(self):
+        src = np.zeros(100, dtype=np.float32)
+        src[40:60] = 1.0
+        out = cut_audio(src, [(1, 3), (4, 6)], sample_rate=10, overlap=0.5)
+        np.testing.assert_allclose(out[15:20], [0, 0.2, 0.4, 0.6, 0.8], atol=1e-6)
+
+    def test_cut_audio_clamps_overlap_to_shortest_segment(self):
+        src = np.ones(100, dtype=np.float32)
+        out = cut_audio(src, [(0, 0.2), (1, 3)], sample_rate=10, overlap=1.0)
+        self.assertEqual(len(out), 20)
+
+    def test_iter_cut_audio_matches_in_memory_cut(self):
+        src = np.random.default_rng(0).uniform(-1, 1, (1000, 2)).astype(np.float32)
+        segments = [(0.5, 2.0), (3.03, 3.2), (5.0, 9.0)]
+        blocks = (src[i : i + 70] for i in range(0, len(src), 70))
+        streamed = np.concatenate(list(iter_cut_audio(blocks, segments, 100, overlap=0.1)))
+        np.testing.assert_allclose(streamed, cut_audio(src, segments, 100, overlap=0.1), atol=1e-6)
+
+    def test_write_audio_wav(self):
+        samples = np.linspace(-0.5, 0.5, 50, dtype=np.float32)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "out.wav")
+            self.assertEqual(write_audio(path, [samples[:20], samples[20:]], 8000, 1), 50)
+            with wave.open(path) as w:
+                self.assertEqual((w.getnchannels(), w.getframerate(), w.getnframes()), (1, 8000, 50))
+
+    @patch("audio_render.ffmpeg_binary", return_value="ffmpeg")
+    @patch("audio_render.subprocess.Popen")
+    def test_write_audio_encodes_by_extension(self, MockPopen, _):
+        proc = MagicMock()
+        proc.returncode = 0
+        MockPopen.return_value = proc
+
+        write_audio("out.flac", [np.zeros((30, 2), np.float32)], 10, 2)
+
+        cmd = MockPopen.call_args[0][0]
+        self.assertEqual(cmd[cmd.index("-c:a") + 1], "flac")
+        self.assertEqual(cmd[-1], "out.flac")
+        self.assertEqual(sum(len(c[0][0]) for c in proc.stdin.write.call_args_list), 30 * 2 * 4)
+
+    @patch("audio_render.write_audio", return_value=48000)
+    @patch("audio_render.iter_pcm_blocks")
+    @patch("audio_render.probe_media", return_value={"audio_fps": 48000, "audio_nchannels": 1})
+    def test_export_audio_keeps_source_format(self, _, mock_pcm, mock_write):
+        self.assertEqual(export_audio("talk.flac", [(0, 1)], "out.flac"), 1.0)
+        self.assertEqual(mock_pcm.call_args[1]["sample_rate"], 48000)
+        self.assertEqual(mock_pcm.call_args[1]["channels"], 1)
+        self.assertEqual(mock_write.call_args[0][2:], (48000, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import io
+import unittest
+from unittest.mock import MagicMock, patch
+import numpy as np
+from audio_stream import chunk_levels, iter_chunk_levels, iter_pcm_blocks
+
+
+class TestAudioStream(unittest.TestCase):
+    def test_chunk_levels_stereo(self):
+        samples = np.zeros((8, 2))
+        samples[1, 1] = 0.5
+        samples[6, 0] = -0.25
+        peak, rms = chunk_levels(samples, sample_rate=4, chunk_duration=1, n_chunks=2)
+        np.testing.assert_allclose(peak, [0.5, 0.0])
+        np.testing.assert_allclose(rms, [np.sqrt(0.125 / 4), np.sqrt(0.03125 / 4)])
+
+    def test_iter_chunk_levels_matches_single_pass(self):
+        rng = np.random.default_rng(0)
+        samples = rng.uniform(-1, 1, size=(1000, 2)).astype(np.float32)
+        # Chunk length of 33.3 samples exercises non-integer boundaries
+        expected_peak, expected_rms = chunk_levels(samples, 100, 0.333, 30)
+        blocks = [samples[0:7], samples[7:400], samples[400:401], samples[401:]]
+        results = list(iter_chunk_levels(blocks, 100, 0.333))
+        self.assertEqual([r[0] for r in results][0], 0)
+        peak = np.concatenate([r[1] for r in results])
+        rms = np.concatenate([r[2] for r in results])
+        np.testing.assert_allclose(peak, expected_peak)
+        np.testing.assert_allclose(rms, expected_rms, rtol=1e-5)
+
+    def test_iter_chunk_levels_drops_partial_chunk(self):
+        blocks = [np.ones(5), np.ones(4)]
+        results = list(iter_chunk_levels(blocks, 4, 1.0))
+        self.assertEqual(sum(len(r[1]) for r in results), 2)
+
+    @patch("audio_stream.ffmpeg_binary", return_value="ffmpeg")
+    @patch("audio_stream.subprocess.Popen")
+    def test_iter_pcm_blocks(self, MockPopen, _):
+        pcm = np.arange(10, dtype=np.float32).tobytes()
+        proc = MagicMock()
+        proc.stdout = io.BytesIO(pcm)
+        proc.poll.return_value = 0
+        proc.wait.return_value = 0
+        MockPopen.return_value = proc
+
+        blocks = list(iter_pcm_blocks("in.mov", sample_rate=2, channels=1, block_duration=2))
+
+        self.assertEqual([len(b) for b in blocks], [4, 4, 2])
+        np.testing.assert_array_equal(np.concatenate(blocks)[:, 0], np.arange(10))
+        cmd = MockPopen.call_args[0][0]
+        self.assertIn("in.mov", cmd)
+        self.assertEqual(cmd[cmd.index("-ar") + 1], "2")
+
+    @patch("audio_stream.ffmpeg_binary", return_value="ffmpeg")
+    @patch("audio_stream.subprocess.Popen")
+    def test_iter_pcm_blocks_follow(self, MockPopen, _):
+        proc = MagicMock()
+        proc.stdout = io.BytesIO(b"")
+        proc.poll.return_value = 0
+        proc.wait.return_value = 0
+        MockPopen.return_value = proc
+
+        list(iter_pcm_blocks("in.mkv", follow_timeout=2.5))
+
+        cmd = MockPopen.call_args[0][0]
+        self.assertEqual(cmd[cmd.index("-follow") + 1], "1")
+        self.assertEqual(cmd[cmd.index("-rw_timeout") + 1], "2500000")
+        self.assertEqual(cmd[cmd.index("-i") + 1], "file:in.mkv")
+
+
+    @patch("audio_stream.ffmpeg_binary", return_value="ffmpeg")
+    @patch("audio_stream.subprocess.Popen")
+    def test_iter_pcm_blocks_raises_on_ffmpeg_error(self, MockPopen, _):
+        proc = MagicMock()
+        proc.stdout = io.BytesIO(np.zeros(3, dtype=np.float32).tobytes())
+        proc.wait.return_value = 1
+
+        def popen(cmd, stdout, stderr):
+            stderr.write(b"moov atom not found")
+            return proc
+
+        MockPopen.side_effect = popen
+
+        with self.assertRaisesRegex(RuntimeError, "moov atom not found"):
+            list(iter_pcm_blocks("broken.mp4", channels=1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+from analysis_cache import file_fingerprint
+from batch import BatchState, encode_file, find_inputs, output_path_for, plan_batch
+
+SETTINGS = {"silence_threshold": 0.03, "chunk_duration": 0.5}
+
+
+class TestBatch(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def touch(self, name, mtime=None):
+        path = os.path.join(self.dir, name)
+        with open(path, "wb") as f:
+            f.write(name.encode())
+        if mtime is not None:
+            os.utime(path, (mtime, mtime))
+        return path
+
+    def test_find_inputs_directory(self):
+        a = self.touch("a.mov")
+        b = self.touch("b.MP4")
+        self.touch("a.mov_cleaned.mov")
+        self.touch("a.mov_cleaned.partial.mov")
+        self.touch("notes.txt")
+        self.assertEqual(find_inputs(self.dir), [a, b])
+
+    def test_find_inputs_manifest(self):
+        manifest = os.path.join(self.dir, "list.txt")
+        with open(manifest, "w") as f:
+            f.write("# tonight\nclips/a.mov\n\n/abs/b.mov\n")
+        self.assertEqual(find_inputs(manifest), [os.path.join(self.dir, "clips", "a.mov"), "/abs/b.mov"])
+
+    def test_output_path_for(self):
+        self.assertEqual(output_path_for("/in/a.mov"), "/in/a.mov_cleaned.mov")
+        self.assertEqual(output_path_for("/in/a.mov", "/out"), "/out/a.mov_cleaned.mov")
+
+    def test_state_persists(self):
+        path = os.path.join(self.dir, "state.json")
+        BatchState(path).update("/in/a.mov", fingerprint="f", settings=SETTINGS, segments=[[0, 1]])
+        state = BatchState(path)
+        self.assertEqual(state.get("/in/a.mov", "f", SETTINGS)["segments"], [[0, 1]])
+        self.assertIsNone(state.get("/in/a.mov", "changed", SETTINGS))
+        self.assertIsNone(state.get("/in/a.mov", "f", dict(SETTINGS, padding=0.5)))
+
+    def test_plan_batch(self):
+        now = time.time()
+        fresh = self.touch("fresh.mov", now - 100)
+        self.touch("fresh.mov_cleaned.mov", now)
+        analyzed = self.touch("analyzed.mov")
+        silent = self.touch("silent.mov")
+        new = self.touch("new.mov")
+        state = BatchState(os.path.join(self.dir, "state.json"))
+        plan = plan_batch([fresh, analyzed, silent, new], state, None, SETTINGS)
+        fingerprints = {p: e["fingerprint"] for p, _, a, e in plan if a == "analyze"}
+        state.update(analyzed, fingerprint=fingerprints[analyzed], settings=SETTINGS, segments=[[0, 1]])
+        state.update(silent, fingerprint=fingerprints[silent], settings=SETTINGS, status="empty", segments=[])
+
+        plan = plan_batch([fresh, analyzed, silent, new], state, None, SETTINGS)
+        self.assertEqual([action for _, _, action, _ in plan], ["skip", "encode", "skip", "analyze"])
+        self.assertEqual(plan[1][3]["segments"], [[0, 1]])
+
+    def test_plan_batch_trusts_state_over_mtime(self):
+        now = time.time()
+        crashed = self.touch("crashed.mov", now - 100)
+        # Partial output of an encode that crashed, newer than the input
+        self.touch("crashed.mov_cleaned.mov", now)
+        done = self.touch("done.mov", now)
+        self.touch("done.mov_cleaned.mov", now - 100)
+        state = BatchState(os.path.join(self.dir, "state.json"))
+        for path, status in ((crashed, "analyzed"), (done, "done")):
+            state.update(path, fingerprint=file_fingerprint(path), settings=SETTINGS, status=status, segments=[[0, 1]])
+
+        plan = plan_batch([crashed, done], state, None, SETTINGS)
+        self.assertEqual([action for _, _, action, _ in plan], ["encode", "skip"])
+
+    @patch("batch.render_segments")
+    def test_encode_file_moves_output_into_place(self, mock_render):
+        def render(input_path, segments, path, **kwargs):
+            with open(path, "wb") as f:
+                f.write(b"video")
+
+        mock_render.side_effect = render
+        output_path = os.path.join(self.dir, "a.mov_cleaned.mov")
+        encode_file(("a.mov", [(0, 1)], output_path, {}, 1))
+        self.assertEqual(os.listdir(self.dir), ["a.mov_cleaned.mov"])
+        self.assertTrue(mock_render.call_args[1]["raise_errors"])
+
+    @patch("batch.render_segments")
+    def test_encode_file_failure_leaves_no_output(self, mock_render):
+        def render(input_path, segments, path, **kwargs):
+            with open(path, "wb") as f:
+                f.write(b"trunc")
+            raise RuntimeError("encoder crashed")
+
+        mock_render.side_effect = render
+        output_path = os.path.join(self.dir, "a.mov_cleaned.mov")
+        with self.assertRaises(RuntimeError):
+            encode_file(("a.mov", [(0, 1)], output_path, {}, 1))
+        self.assertEqual(os.listdir(self.dir), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
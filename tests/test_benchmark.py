@@ -0,0 +1,54 @@
+import unittest
+import numpy as np
+from benchmark import (
+    DEFAULT_FILLERS,
+    compare_results,
+    iter_synthetic_audio,
+    synthetic_loud_intervals,
+    synthetic_transcript,
+)
+from filler_remover import detect_filler_segments
+from transcript_index import TranscriptIndex
+
+
+class TestBenchmark(unittest.TestCase):
+    def test_synthetic_loud_intervals_are_reproducible(self):
+        loud = synthetic_loud_intervals(600, 20, seed=1)
+        self.assertEqual(loud.to_list(), synthetic_loud_intervals(600, 20, seed=1).to_list())
+        self.assertNotEqual(loud.to_list(), synthetic_loud_intervals(600, 20, seed=2).to_list())
+        pairs = loud.to_list()
+        self.assertTrue(all(0 <= s < e <= 600 for s, e in pairs))
+        self.assertTrue(all(e1 < s2 for (_, e1), (s2, _) in zip(pairs, pairs[1:])))
+
+    def test_synthetic_audio_is_loud_only_inside_intervals(self):
+        loud = synthetic_loud_intervals(30, 10)
+        audio = np.concatenate(list(iter_synthetic_audio(30, loud, sample_rate=8000, block_duration=4)))
+        self.assertEqual(audio.dtype, np.float32)
+        self.assertEqual(len(audio), 30 * 8000)
+        peaks = np.abs(audio).reshape(-1, 800).max(axis=1)
+        centers = (np.arange(len(peaks)) + 0.5) * 0.1
+        inside = loud.contains(centers)
+        self.assertTrue((peaks[inside] > 0.2).all())
+        self.assertTrue((peaks[~loud.pad(0.1).contains(centers)] < 0.01).all())
+
+    def test_synthetic_transcript_fillers(self):
+        transcript = synthetic_transcript(2000, filler_rate=0.1)
+        index = TranscriptIndex.from_whisper(transcript)
+        self.assertEqual(len(index.starts), 2000)
+        words = [w["word"].strip() for s in transcript["segments"] for w in s["words"]]
+        self.assertGreater(sum(w in DEFAULT_FILLERS for w in words), 100)
+        self.assertTrue(detect_filler_segments(index, DEFAULT_FILLERS))
+        # Multi-word fillers are separate words, so phrase matching finds them
+        self.assertNotIn("you know", words)
+        self.assertTrue(detect_filler_segments(index, ["you know"]))
+        self.assertTrue(detect_filler_segments(index, ["i mean"]))
+
+    def test_compare_results(self):
+        baseline = {"a": {"seconds": 1.0}, "b": {"seconds": 1.0}, "gone": {"seconds": 1.0}}
+        current = {"a": {"seconds": 1.2}, "b": {"seconds": 1.5}, "new": {"seconds": 9.0}}
+        self.assertEqual(compare_results(baseline, current, 0.25), [("b", 1.0, 1.5)])
+        self.assertEqual(compare_results(baseline, current, 0.5), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from caugh_remover import cough_frame_mask, detect_cough_segments, iter_score_batches, load_class_names
+
+CLASS_NAMES = ["Speech", "Cough", "Throat clearing"]
+
+
+def fake_yamnet(window):
+    """Scores 0.96 s patches every 0.48 s like YAMNet: patches louder than 0.5 are coughs."""
+    n = 1 + int(np.ceil(max(0, len(window) - 15600) / 7680))
+    window = np.pad(window, (0, max(0, (n - 1) * 7680 + 15600 - len(window))))
+    loud = np.array([window[i * 7680 : i * 7680 + 15360].mean() > 0.5 for i in range(n)])
+    scores = np.zeros((n, len(CLASS_NAMES)), dtype=np.float32)
+    scores[:, 0] = 0.6
+    scores[loud, 1] = 0.9
+    return scores, None, None
+
+
+class TestCoughRemover(unittest.TestCase):
+    def test_load_class_names(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "class_map.csv")
+            with open(path, "w") as f:
+                f.write('index,mid,display_name\n0,/m/09x0r,Speech\n1,/m/0ytgt,"Child speech, kid speaking"\n')
+            self.assertEqual(load_class_names(path), ["Speech", "Child speech, kid speaking"])
+
+    def test_cough_frame_mask(self):
+        scores = np.array([[0.9, 0.1, 0.0], [0.1, 0.8, 0.0], [0.1, 0.0, 0.3]])
+        np.testing.assert_array_equal(cough_frame_mask(scores, [1, 2]), [False, True, True])
+        np.testing.assert_array_equal(cough_frame_mask(scores, [1, 2], 0.5), [False, True, False])
+
+    def test_batches_match_whole_file(self):
+        audio = np.zeros(16000 * 30, dtype=np.float32)
+        audio[16000 * 10 : 16000 * 12] = 1.0
+        whole = fake_yamnet(audio)[0]
+        batches = list(iter_score_batches(audio, fake_yamnet, batch_frames=7))
+        self.assertGreater(len(batches), 1)
+        np.testing.assert_array_equal(np.concatenate([s for _, s in batches]), whole)
+        self.assertEqual([first for first, _ in batches], list(range(0, len(whole), 7)))
+
+    def test_detect_cough_segments(self):
+        audio = np.zeros(16000 * 30, dtype=np.float32)
+        audio[16000 * 10 : 16000 * 12] = 1.0
+        segments = detect_cough_segments(audio, fake_yamnet, CLASS_NAMES, batch_frames=7)
+        self.assertEqual(len(segments), 1)
+        start, end = segments[0]
+        self.assertTrue(9.0 <= start <= 10.0 and 12.0 <= end <= 13.0)
+
+    def test_detect_cough_segments_silence(self):
+        audio = np.zeros(16000 * 5, dtype=np.float32)
+        self.assertEqual(detect_cough_segments(audio, fake_yamnet, CLASS_NAMES), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+import numpy as np
+from decoded_audio import decoded_audio_paths, iter_array_blocks, load_decoded_audio
+
+
+def fake_pcm_blocks(samples):
+    def iter_pcm_blocks(path, sample_rate, channels, block_duration=None):
+        yield samples[:3].reshape(-1, 1)
+        yield samples[3:].reshape(-1, 1)
+
+    return iter_pcm_blocks
+
+
+class TestDecodedAudio(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.tmp.name, "a.mov")
+        with open(self.source, "wb") as f:
+            f.write(b"video")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_decodes_once(self):
+        samples = np.arange(5, dtype=np.float32)
+        with patch("decoded_audio.iter_pcm_blocks", side_effect=fake_pcm_blocks(samples)) as mock_pcm:
+            audio = load_decoded_audio(self.source)
+            np.testing.assert_array_equal(audio, samples)
+            self.assertIsInstance(audio, np.memmap)
+            self.assertTrue(os.path.exists(decoded_audio_paths(self.source)[0]))
+            np.testing.assert_array_equal(load_decoded_audio(self.source), samples)
+        self.assertEqual(mock_pcm.call_count, 1)
+
+    def test_redecodes_changed_source(self):
+        with patch("decoded_audio.iter_pcm_blocks", side_effect=fake_pcm_blocks(np.zeros(4, np.float32))):
+            load_decoded_audio(self.source)
+        with open(self.source, "wb") as f:
+            f.write(b"edited video")
+        with patch("decoded_audio.iter_pcm_blocks", side_effect=fake_pcm_blocks(np.ones(6, np.float32))):
+            np.testing.assert_array_equal(load_decoded_audio(self.source), np.ones(6))
+
+    def test_failed_decode_is_not_stored(self):
+        def failing_pcm_blocks(path, sample_rate, channels, block_duration=None):
+            yield np.zeros((3, 1), np.float32)
+            raise RuntimeError("ffmpeg failed to decode")
+
+        with patch("decoded_audio.iter_pcm_blocks", side_effect=failing_pcm_blocks):
+            with self.assertRaises(RuntimeError):
+                load_decoded_audio(self.source)
+        self.assertEqual(os.listdir(self.tmp.name), ["a.mov"])
+
+    def test_iter_array_blocks(self):
+        blocks = list(iter_array_blocks(np.arange(5), sample_rate=2, block_duration=1.0))
+        self.assertEqual([b.tolist() for b in blocks], [[0, 1], [2, 3], [4]])
+
+
+if __name__ == "__main__":
+    unittest.main()
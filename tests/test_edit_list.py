@@ -0,0 +1,54 @@
+import os
+import tempfile
+import unittest
+from edit_list import NOMINAL_EDL_FPS, format_edl, parse_edl, parse_timecode, read_edit_list, timecode, write_edit_list
+
+
+class TestEditList(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.tmp.name, "talk.mov")
+        with open(self.source, "wb") as f:
+            f.write(b"video")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_timecode(self):
+        self.assertEqual(timecode(3725.48, 25), "01:02:05:12")
+        self.assertAlmostEqual(parse_timecode("01:02:05:12", 25), 3725.48)
+        self.assertEqual(timecode(parse_timecode("00:10:00:29", 30), 30), "00:10:00:29")
+        with self.assertRaises(ValueError):
+            parse_timecode("10:00", 25)
+
+    def test_edl_round_trip(self):
+        segments = [(1.0, 2.4), (4.0, 9.2)]
+        text = format_edl(segments, self.source, 25)
+        self.assertIn("002  AX       AA/V  C        00:00:04:00 00:00:09:05 00:00:01:10 00:00:06:15", text)
+        self.assertIn("* FROM CLIP NAME: talk.mov", text)
+        self.assertEqual(parse_edl(text, 25), segments)
+
+    def test_json_round_trip(self):
+        path = os.path.join(self.tmp.name, "edits.json")
+        write_edit_list(path, [(0.0, 1.5), (2.0, 3.0)], self.source, {"padding": 0.2})
+        edits = read_edit_list(path)
+        self.assertEqual(edits["segments"], [(0.0, 1.5), (2.0, 3.0)])
+        self.assertEqual(edits["source"], os.path.abspath(self.source))
+        self.assertEqual(edits["settings"], {"padding": 0.2})
+        self.assertTrue(edits["fingerprint"])
+
+    def test_edl_file(self):
+        path = os.path.join(self.tmp.name, "edits.EDL")
+        write_edit_list(path, [(0.0, 1.5)], self.source, fps=30)
+        self.assertEqual(read_edit_list(path, fps=30)["segments"], [(0.0, 1.5)])
+
+    def test_edl_file_without_video_uses_nominal_rate(self):
+        path = os.path.join(self.tmp.name, "episode.edl")
+        write_edit_list(path, [(0.5, 2.0), (3.1, 4.0)], self.source, fps=None)
+        with open(path) as f:
+            self.assertIn(f"00:00:00:{NOMINAL_EDL_FPS // 2:02d}", f.read())
+        self.assertEqual(read_edit_list(path, fps=None)["segments"], [(0.5, 2.0), (3.1, 4.0)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,17 @@
+import json
+import os
+import tempfile
 import unittest
 from unittest.mock import MagicMock, patch
-from filler_remover import parse_timestamp, detect_filler_segments, remove_filler_segments_from_video
+from analysis_cache import AnalysisCache
+from filler_remover import (
+    parse_timestamp,
+    detect_filler_segments,
+    load_transcript_index,
+    remove_filler_segments_from_video,
+    transcribe_with_whisper,
+)
+from transcript_index import TranscriptIndex
 
 class TestFillerRemover(unittest.TestCase):
     def test_parse_timestamp(self):
@@ -17,7 +28,25 @@ class TestFillerRemover(unittest.TestCase):
         segments = detect_filler_segments(words, fillers)
         self.assertEqual(segments, [(1.0, 1.5), (2.0, 2.3)])
 
-    @patch("filler_remover.VideoFileClip")
+    def test_detect_filler_segments_phrases(self):
+        index = TranscriptIndex.from_whisper(
+            {
+                "segments": [
+                    {
+                        "words": [
+                            {"word": " So", "start": 0.0, "end": 0.2},
+                            {"word": " you", "start": 0.2, "end": 0.4},
+                            {"word": " know,", "start": 0.4, "end": 0.6},
+                            {"word": " so", "start": 0.6, "end": 0.8},
+                        ]
+                    }
+                ]
+            }
+        )
+        segments = detect_filler_segments(index, {"so", "you know"})
+        self.assertEqual(segments, [(0.2, 0.6), (0.6, 0.8)])
+
+    @patch("moviepy.VideoFileClip")
     def test_remove_filler_segments_from_video(self, MockVideoFileClip):
         mock_clip = MagicMock()
         mock_clip.duration = 10
@@ -31,5 +60,105 @@ class TestFillerRemover(unittest.TestCase):
         # Should return [(0,1), (2,4), (5,10)]
         self.assertEqual(parts, [(0,1), (2,4), (5,10)])
 
+    @patch("filler_remover.file_fingerprint", return_value="fp")
+    def test_transcribe_with_whisper_uses_cache(self, _):
+        mock_whisper = MagicMock()
+        cache = MagicMock()
+        cache.load_json.return_value = {"text": "cached"}
+        with tempfile.TemporaryDirectory() as tmp:
+            transcript_path = os.path.join(tmp, "transcript.json")
+            with patch.dict("sys.modules", {"whisper": mock_whisper}):
+                transcribe_with_whisper("fake.mp4", transcript_path, cache)
+            with open(transcript_path) as f:
+                self.assertEqual(json.load(f)["text"], "cached")
+        mock_whisper.load_model.assert_not_called()
+
+    @patch("filler_remover.file_fingerprint", return_value="fp")
+    @patch("filler_remover.transcribe_chunked")
+    def test_transcribe_with_whisper_speech_ranges(self, mock_chunked, _):
+        mock_whisper, mock_torch = MagicMock(), MagicMock()
+        mock_torch.cuda.is_available.return_value = False
+        mock_chunked.return_value = {"text": "chunked", "segments": []}
+        with tempfile.TemporaryDirectory() as tmp:
+            transcript_path = os.path.join(tmp, "transcript.json")
+            with patch.dict("sys.modules", {"whisper": mock_whisper, "torch": mock_torch}):
+                transcribe_with_whisper(
+                    "fake.mp4", transcript_path, model_name="base", speech_ranges=[(1, 2)], workers=4
+                )
+            with open(transcript_path) as f:
+                self.assertEqual(json.load(f)["text"], "chunked")
+        mock_chunked.assert_called_once_with("fake.mp4", [(1, 2)], "base", 4, "cpu", None)
+        mock_whisper.load_model.assert_not_called()
+
+    @patch("filler_remover.file_fingerprint", return_value="fp")
+    @patch("filler_remover.request_transcription")
+    def test_transcribe_with_whisper_uses_server(self, mock_request, _):
+        mock_whisper = MagicMock()
+        mock_request.return_value = {"text": "served", "segments": []}
+        with tempfile.TemporaryDirectory() as tmp:
+            transcript_path = os.path.join(tmp, "transcript.json")
+            with patch.dict("sys.modules", {"whisper": mock_whisper}):
+                transcribe_with_whisper("fake.mp4", transcript_path, model_name="base", server_socket="w.sock")
+            with open(transcript_path) as f:
+                self.assertEqual(json.load(f)["text"], "served")
+        mock_request.assert_called_once_with("fake.mp4", "base", None, "w.sock")
+        mock_whisper.load_model.assert_not_called()
+
+    @patch("filler_remover.request_transcription")
+    def test_transcribe_with_whisper_reuses_matching_transcript(self, mock_request):
+        mock_request.return_value = {"text": "served", "segments": []}
+        with tempfile.TemporaryDirectory() as tmp:
+            transcript_path = os.path.join(tmp, "transcript.json")
+            with patch("filler_remover.file_fingerprint", return_value="v1"):
+                transcribe_with_whisper("fake.mp4", transcript_path, model_name="base", server_socket="w.sock")
+                transcribe_with_whisper("fake.mp4", transcript_path, model_name="base", server_socket="w.sock")
+            self.assertEqual(mock_request.call_count, 1)
+            # The video changed: the transcript on disk no longer applies
+            with patch("filler_remover.file_fingerprint", return_value="v2"):
+                transcribe_with_whisper("fake.mp4", transcript_path, model_name="base", server_socket="w.sock")
+            self.assertEqual(mock_request.call_count, 2)
+
+    @patch("filler_remover.request_transcription")
+    def test_transcribe_with_whisper_new_settings_transcribe_again(self, mock_request):
+        mock_request.side_effect = lambda path, model, ranges, sock: {"text": model, "segments": []}
+        with tempfile.TemporaryDirectory() as tmp:
+            video_path = os.path.join(tmp, "talk.mp4")
+            with open(video_path, "wb") as f:
+                f.write(b"video")
+            transcript_path = os.path.join(tmp, "transcript.json")
+            cache = AnalysisCache(os.path.join(tmp, "cache"))
+            runs = [("tiny", None), ("large", None), ("large", [(0, 1)]), ("tiny", None)]
+            for model, speech_ranges in runs:
+                transcribe_with_whisper(
+                    video_path, transcript_path, cache, model, speech_ranges, server_socket="w.sock"
+                )
+                with open(transcript_path) as f:
+                    self.assertEqual(json.load(f)["text"], model)
+        # A new model or new speech ranges (e.g. other VAD settings) transcribe again;
+        # going back to the first settings hits the cache
+        self.assertEqual(
+            [c[0][1:3] for c in mock_request.call_args_list],
+            [("tiny", None), ("large", None), ("large", [(0, 1)])],
+        )
+    @patch("filler_remover.request_transcription")
+    def test_repeated_runs_reuse_transcript_index(self, mock_request):
+        mock_request.return_value = {"text": "um", "segments": [{"words": [{"word": " um", "start": 0, "end": 1}]}]}
+        with tempfile.TemporaryDirectory() as tmp:
+            video_path = os.path.join(tmp, "talk.mp4")
+            with open(video_path, "wb") as f:
+                f.write(b"video")
+            transcript_path = os.path.join(tmp, "transcript.json")
+            cache_dir = os.path.join(tmp, "cache")
+            for _ in range(3):
+                cache = AnalysisCache(cache_dir)
+                transcribe_with_whisper(video_path, transcript_path, cache, "base", server_socket="w.sock")
+                mtime = os.stat(transcript_path).st_mtime_ns
+                load_transcript_index(transcript_path, cache)
+            # The transcript is not rewritten, so its index is parsed and stored once
+            self.assertEqual(os.stat(transcript_path).st_mtime_ns, mtime)
+            self.assertEqual(len([n for n in os.listdir(cache_dir) if n.startswith("transcript-index")]), 1)
+        self.assertEqual(mock_request.call_count, 1)
+
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
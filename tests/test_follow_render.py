@@ -0,0 +1,43 @@
+import unittest
+import numpy as np
+from follow_render import LiveSegmenter, plan_live_shard
+from silence_remover import merge_close_segments, pad_segments
+
+
+class TestFollowRender(unittest.TestCase):
+    def test_live_segments_match_whole_file(self):
+        rng = np.random.default_rng(0)
+        loud = np.flatnonzero(rng.random(400) < 0.3)
+        chunks = [(i * 0.5, (i + 1) * 0.5) for i in loud.tolist()]
+        duration = 200.1
+        expected = pad_segments(merge_close_segments(chunks, 0.05), 0.2, duration)
+
+        segmenter = LiveSegmenter(merge_gap=0.05, padding=0.2, lookahead=1.0)
+        segments = []
+        for block in range(0, 400, 7):
+            segmenter.add([c for c in chunks if block * 0.5 <= c[0] < (block + 7) * 0.5])
+            new = segmenter.finalize(min(block + 7, 400) * 0.5)
+            # Nothing is final until the analysis is a lookahead past it
+            self.assertTrue(all(e - 0.2 < min(block + 7, 400) * 0.5 - 1.0 for _, e in new))
+            segments.extend(new)
+        segments.extend(segmenter.finalize(200.0, duration))
+        np.testing.assert_allclose(segments, expected)
+
+    def test_live_segmenter_waits_for_lookahead(self):
+        segmenter = LiveSegmenter(merge_gap=0.0, padding=0.5, lookahead=2.0)
+        segmenter.add([(1.0, 1.5)])
+        self.assertEqual(segmenter.finalize(3.0), [])
+        self.assertEqual(segmenter.finalize(3.6), [(0.5, 2.0)])
+        self.assertEqual(segmenter.finalize(3.6, 3.6), [])
+
+    def test_plan_live_shard(self):
+        segments = [(0, 2), (3, 5), (6, 8), (9, 11)]
+        # Output starts: 0, 1.5, 3.0, 4.5; the first cut after 2.5s of output is
+        # right after the fade into the third clip finishes.
+        self.assertEqual(plan_live_shard(segments, 0.5, 0.0, 10, 2.5), (0, 3, 3.5))
+        self.assertEqual(plan_live_shard(segments, 0.5, 3.5, 10, 2.5), None)
+        self.assertEqual(plan_live_shard(segments[:1], 0.5, 0.0, 10, 0.1), None)
+
+
+if __name__ == "__main__":
+    unittest.main()
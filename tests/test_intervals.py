@@ -0,0 +1,52 @@
+import unittest
+import numpy as np
+from intervals import IntervalSet
+
+
+class TestIntervalSet(unittest.TestCase):
+    def test_merge_with_gap(self):
+        s = IntervalSet.from_pairs([(3, 4), (0, 1), (1.01, 2), (0.5, 0.7)])
+        self.assertEqual(s.merge(0.05).to_list(), [(0.0, 2.0), (3.0, 4.0)])
+        self.assertEqual(s.merge().to_list(), [(0.0, 1.0), (1.01, 2.0), (3.0, 4.0)])
+
+    def test_merge_keeps_longest_end(self):
+        s = IntervalSet.from_pairs([(0, 10), (1, 2), (3, 4)])
+        self.assertEqual(s.merge().to_list(), [(0.0, 10.0)])
+
+    def test_pad_and_clip(self):
+        s = IntervalSet.from_pairs([(0.1, 0.5), (4.8, 5.0), (6, 7)]).pad(0.5).clip(0, 5)
+        self.assertEqual(s.to_list(), [(0.0, 1.0), (4.3, 5.0)])
+
+    def test_drop_shorter(self):
+        s = IntervalSet.from_pairs([(0, 0.1), (1, 2), (3, 3.25)]).drop_shorter(0.25)
+        self.assertEqual(s.to_list(), [(1.0, 2.0), (3.0, 3.25)])
+
+    def test_union(self):
+        a = IntervalSet.from_pairs([(0, 1), (5, 6)])
+        b = IntervalSet.from_pairs([(0.5, 2), (7, 8)])
+        self.assertEqual(a.union(b).to_list(), [(0.0, 2.0), (5.0, 6.0), (7.0, 8.0)])
+
+    def test_intersect(self):
+        a = IntervalSet.from_pairs([(0, 3), (5, 9)])
+        b = IntervalSet.from_pairs([(1, 2), (2.5, 6), (8, 10)])
+        self.assertEqual(a.intersect(b).to_list(), [(1.0, 2.0), (2.5, 3.0), (5.0, 6.0), (8.0, 9.0)])
+        self.assertEqual(a.intersect(IntervalSet()).to_list(), [])
+
+    def test_complement(self):
+        s = IntervalSet.from_pairs([(1, 2), (4, 5), (1.5, 2.5)])
+        self.assertEqual(s.complement(0, 10).to_list(), [(0.0, 1.0), (2.5, 4.0), (5.0, 10.0)])
+        self.assertEqual(IntervalSet().complement(0, 3).to_list(), [(0.0, 3.0)])
+
+    def test_contains(self):
+        s = IntervalSet.from_pairs([(1, 2), (4, 5)])
+        np.testing.assert_array_equal(s.contains([0.5, 1, 3, 5, 6]), [False, True, False, True, False])
+
+    def test_large_edit_list(self):
+        rng = np.random.default_rng(0)
+        starts = np.sort(rng.uniform(0, 1e5, 200_000))
+        s = IntervalSet(starts, starts + rng.uniform(0, 1, len(starts))).pad(0.2).clip(0, 1e5).merge()
+        self.assertTrue(np.all(s.starts[1:] > s.ends[:-1]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,27 @@
+import unittest
+from parallel_render import plan_shards
+
+
+class TestParallelRender(unittest.TestCase):
+    def test_plan_shards_crossfade(self):
+        segments = [(0, 2), (3, 5), (6, 8), (9, 11)]
+        # Output starts: 0, 1.5, 3.0, 4.5; total 6.5. The cut lands after the
+        # last transition finishes, so the second shard only needs the last clip.
+        shards = plan_shards(segments, overlap=0.5, n_shards=2, fps=10)
+        self.assertEqual(shards, [(0, 4, 0.0, 5.0), (3, 4, 5.0, 6.5)])
+
+    def test_plan_shards_cover_timeline(self):
+        segments = [(i * 3.0, i * 3.0 + 1.3) for i in range(20)]
+        shards = plan_shards(segments, overlap=0.0, n_shards=6, fps=25)
+        self.assertEqual(shards[0][2], 0.0)
+        self.assertAlmostEqual(shards[-1][3], 26.0)
+        for prev, nxt in zip(shards[:-1], shards[1:]):
+            self.assertEqual(prev[3], nxt[2])
+            self.assertAlmostEqual(nxt[2] * 25, round(nxt[2] * 25))
+
+    def test_plan_shards_single(self):
+        self.assertEqual(plan_shards([(1, 3)], 0.3, 4, 25), [(0, 1, 0.0, 2.0)])
+
+
+if __name__ == "__main__":
+    unittest.main()
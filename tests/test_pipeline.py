@@ -0,0 +1,42 @@
+import unittest
+from unittest.mock import patch
+import numpy as np
+from intervals import IntervalSet
+from pipeline import build_edit_list, detect_filler_cuts, find_speech
+from transcript_index import TranscriptIndex
+
+
+class TestPipeline(unittest.TestCase):
+    def test_find_speech(self):
+        envelope = np.zeros(400, dtype=np.float32)  # 10 ms frames
+        envelope[100:150] = 0.5  # Loud from 1.0 s to 1.5 s
+        envelope[300:310] = 0.5
+        speech = find_speech(envelope, 0.01, 4.0, 0.5, 0.03, 0.05, 0.2)
+        self.assertEqual(speech, [(0.8, 1.7), (2.8, 3.7)])
+
+    def test_build_edit_list(self):
+        cuts = {
+            "silence": IntervalSet.from_pairs([(0, 1), (5, 6)]),
+            "fillers": IntervalSet.from_pairs([(2, 2.5), (5.5, 7)]),
+        }
+        self.assertEqual(build_edit_list(10, cuts), [(1, 2), (2.5, 5), (7, 10)])
+
+    def test_build_edit_list_no_cuts(self):
+        self.assertEqual(build_edit_list(3, {}), [(0, 3)])
+
+    @patch("pipeline.load_transcript_index")
+    @patch("pipeline.transcribe_with_whisper")
+    def test_detect_filler_cuts(self, mock_transcribe, mock_load):
+        mock_load.return_value = TranscriptIndex.from_whisper(
+            {"segments": [{"words": [{"word": " um", "start": 1.0, "end": 1.3}]}]}
+        )
+        audio = np.zeros(16000, dtype=np.float32)
+        cuts = detect_filler_cuts("a.mov", audio, [(0, 2)], ["um"], "t.json", model_name="base")
+        self.assertEqual(cuts.to_list(), [(1.0, 1.3)])
+        _, kwargs = mock_transcribe.call_args
+        self.assertIs(kwargs["audio"], audio)
+        self.assertEqual(kwargs["speech_ranges"], [(0, 2)])
+
+
+if __name__ == "__main__":
+    unittest.main()
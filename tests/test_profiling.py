@@ -0,0 +1,46 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+from profiling import StageProfiler
+
+
+class TestProfiling(unittest.TestCase):
+    def test_stage_records_costs(self):
+        profiler = StageProfiler()
+        with profiler.stage("encode", media_seconds=10.0) as s:
+            time.sleep(0.01)
+            s["frames"] = 250
+        (record,) = profiler.stages
+        self.assertEqual(record["name"], "encode")
+        self.assertGreater(record["wall_seconds"], 0.005)
+        self.assertGreaterEqual(record["cpu_seconds"], 0)
+        self.assertGreater(record["process_peak_rss_mb"], 0)
+        self.assertAlmostEqual(record["realtime_factor"], 10.0 / record["wall_seconds"])
+        self.assertAlmostEqual(record["frames_per_second"], 250 / record["wall_seconds"])
+
+    def test_stage_recorded_on_error(self):
+        profiler = StageProfiler()
+        with self.assertRaises(ValueError):
+            with profiler.stage("detect"):
+                raise ValueError
+        self.assertEqual([s["name"] for s in profiler.stages], ["detect"])
+        self.assertIsNone(profiler.stages[0]["realtime_factor"])
+
+    def test_write_report(self):
+        profiler = StageProfiler()
+        with profiler.stage("decode", media_seconds=1.0):
+            pass
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "report.json")
+            profiler.write_report(path, input="a.mov")
+            with open(path) as f:
+                report = json.load(f)
+        self.assertEqual(report["input"], "a.mov")
+        self.assertEqual([s["name"] for s in report["stages"]], ["decode"])
+        self.assertIn("total_wall_seconds", report)
+
+
+if __name__ == "__main__":
+    unittest.main()
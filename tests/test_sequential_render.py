@@ -0,0 +1,66 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+import numpy as np
+import sequential_render
+from ffmpeg_tools import probe_media, run_ffmpeg
+from sequential_render import export_sequential, mix_audio, plan_frame_sources, scaled_size
+
+
+class TestSequentialRender(unittest.TestCase):
+    def test_plan_frame_sources_concatenation(self):
+        frames, gain = plan_frame_sources([(1, 2), (3, 3.5)], overlap=0.0, fps=4)
+        np.testing.assert_array_equal(frames, [4, 5, 6, 7, 12, 13])
+        np.testing.assert_array_equal(gain, np.ones(6))
+
+    def test_plan_frame_sources_never_goes_backwards(self):
+        segments = [(0, 1), (1.2, 2.5), (5, 7)]
+        frames, gain = plan_frame_sources(segments, overlap=0.5, fps=10)
+        self.assertTrue(np.all(np.diff(frames) >= 0))
+        # Second segment starts at output 0.5 and fades in over 0.5 s
+        np.testing.assert_allclose(gain[5:10], [0, 0.2, 0.4, 0.6, 0.8])
+        self.assertEqual(frames[5], 12)
+
+    def test_mix_audio_sums_overlaps(self):
+        src = np.arange(100, dtype=np.float32)[:, None].repeat(2, axis=1)
+        segments = [(1, 3), (4, 6)]
+        expected = np.concatenate([src[10:25, 0], src[25:30, 0] + src[40:45, 0], src[45:60, 0]])
+        for block_size in (1, 7, 100):
+            blocks = [src[i : i + block_size] for i in range(0, 100, block_size)]
+            out = np.concatenate(list(mix_audio(blocks, segments, overlap=0.5, sample_rate=10)))
+            np.testing.assert_array_equal(out[:, 0], expected)
+
+    def test_scaled_size(self):
+        self.assertEqual(scaled_size(3840, 2160, 360), (640, 360))
+        self.assertEqual(scaled_size(1440, 1080, 361), (480, 360))
+        self.assertEqual(scaled_size(640, 360, 720), (640, 360))
+        self.assertEqual(scaled_size(640, 360, None), (640, 360))
+
+
+class TestExportSequential(unittest.TestCase):
+    def test_reads_the_source_once(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            src = os.path.join(tmp, "in.mp4")
+            out = os.path.join(tmp, "out.mp4")
+            try:
+                run_ffmpeg(["-f", "lavfi", "-i", "testsrc2=size=160x120:rate=25:duration=6",
+                            "-f", "lavfi", "-i", "sine=frequency=440:duration=6",
+                            "-c:v", "libx264", "-c:a", "aac", "-shortest", src])
+            except (OSError, RuntimeError) as e:
+                self.skipTest(f"Cannot generate test video: {e}")
+            popen = sequential_render.subprocess.Popen
+            with patch("sequential_render.subprocess.Popen", side_effect=popen) as mock_popen:
+                export_sequential(src, [(0.5, 2.0), (3.0, 5.0)], out, True, 0.2, 1)
+            # A single process decodes both the frames and the audio of the source
+            decodes = [c[0][0] for c in mock_popen.call_args_list if src in c[0][0] and "-f" in c[0][0]]
+            self.assertEqual(len(decodes), 1)
+            self.assertIn("rawvideo", decodes[0])
+            self.assertIn("f32le", decodes[0])
+            infos = probe_media(out)
+        self.assertTrue(infos["audio_found"] and infos["video_found"])
+        self.assertAlmostEqual(infos["duration"], 3.3, delta=0.1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,17 @@
+import os
 import unittest
 from unittest.mock import MagicMock, patch
 import numpy as np
-from silence_remover import detect_loud_segments, merge_close_segments, pad_segments
+from silence_remover import (
+    compute_loudness_envelope,
+    detect_loud_segments,
+    export_final_video,
+    hysteresis_segments,
+    iter_loud_segments,
+    merge_close_segments,
+    pad_segments,
+    snap_segments,
+)
 
 
 class TestSilenceRemover(unittest.TestCase):
@@ -12,63 +22,101 @@ class TestSilenceRemover(unittest.TestCase):
 
         self.assertEqual(merged, [(0, 2), (3, 4)])
 
+    @patch("silence_remover.iter_pcm_blocks")
+    def test_loudness_is_peak_over_channels(self, mock_pcm):
+        # A voice on the left channel only is measured at its full level
+        block = np.zeros((16000, 2), dtype=np.float32)
+        block[100, 0] = 0.5
+        mock_pcm.return_value = iter([block])
+        peak, _ = compute_loudness_envelope(__file__, 0.5)
+        self.assertEqual(peak.tolist(), [0.5, 0.0])
+        self.assertEqual(mock_pcm.call_args[1]["channels"], 2)
+
     def test_merge_close_segments_empty(self):
         self.assertEqual(merge_close_segments([], 0.1), [])
 
-    @patch("silence_remover.VideoFileClip")
-    def test_detect_loud_segments(self, MockVideoFileClip):
+    def test_merge_close_segments_generator(self):
+        merged = merge_close_segments(iter([(0, 1), (1.01, 2), (3, 4)]), 0.05)
+        self.assertEqual(merged, [(0, 2), (3, 4)])
+
+    def test_iter_loud_segments_stops_at_duration(self):
+        levels = [(0, np.array([0.5, 0.0]), None), (2, np.array([0.5, 0.5]), None)]
+        segments = list(iter_loud_segments(levels, 1.0, 0.03, duration=3.5))
+        self.assertEqual(segments, [(0.0, 1.0), (2.0, 3.0)])
+
+    def test_detect_loud_segments(self):
         mock_clip = MagicMock()
         mock_clip.duration = 3
+        mock_clip.filename = None
 
         # First chunk: loud, Second chunk: silent, Third chunk: loud
-        mock_audio_loud = MagicMock()
-        mock_audio_loud.to_soundarray.return_value = np.array([0.02, 0.04])
-        mock_subclip_loud = MagicMock()
-        mock_subclip_loud.audio = mock_audio_loud
-
-        mock_audio_silent = MagicMock()
-        mock_audio_silent.to_soundarray.return_value = np.array([0.01, 0.02])
-        mock_subclip_silent = MagicMock()
-        mock_subclip_silent.audio = mock_audio_silent
-
-        mock_audio_loud2 = MagicMock()
-        mock_audio_loud2.to_soundarray.return_value = np.array([0.06, 0.05])
-        mock_subclip_loud2 = MagicMock()
-        mock_subclip_loud2.audio = mock_audio_loud2
-
-        mock_clip.subclipped.side_effect = [
-            mock_subclip_loud,
-            mock_subclip_silent,
-            mock_subclip_loud2,
-        ]
+        def to_soundarray(tt, fps):
+            return np.where(tt < 1, 0.04, np.where(tt < 2, 0.02, 0.06))
+
+        mock_clip.audio.to_soundarray.side_effect = to_soundarray
 
         segments = detect_loud_segments(
             mock_clip, chunk_duration=1, silence_threshold=0.03
         )
 
         self.assertEqual(segments, [(0, 1), (2, 3)])
+        # The track is read sequentially, without building a subclip per chunk
+        mock_clip.subclipped.assert_not_called()
 
-    @patch("silence_remover.VideoFileClip")
-    def test_detect_loud_segments_silent(self, MockVideoFileClip):
+    def test_detect_loud_segments_silent(self):
         mock_clip = MagicMock()
         mock_clip.duration = 2
-        mock_audio = MagicMock()
-        mock_audio.to_soundarray.return_value = np.array([0.01, 0.02])
-        mock_subclip = MagicMock()
-        mock_subclip.audio = mock_audio
-        mock_clip.subclipped.return_value = mock_subclip
+        mock_clip.filename = None
+        mock_clip.audio.to_soundarray.side_effect = lambda tt, fps: np.full(len(tt), 0.02)
 
         segments = detect_loud_segments(
             mock_clip, chunk_duration=1, silence_threshold=0.03
         )
         self.assertEqual(segments, [])
 
+    def test_detect_loud_segments_no_audio(self):
+        mock_clip = MagicMock()
+        mock_clip.duration = 2
+        mock_clip.audio = None
+        self.assertEqual(detect_loud_segments(mock_clip, 1, 0.03), [])
+
+    def test_hysteresis_segments(self):
+        peak = np.array([0, 0.5, 0.02, 0.5, 0, 0, 0, 0.5, 0, 0, 0, 0, 0, 0, 0.5, 0.5, 0.5, 0.5, 0])
+        segments = hysteresis_segments(peak, 0.1, 0.1, 0.01, 0.25, 0.2, 1.9)
+        # 0.02 lies between the thresholds and does not split the first segment;
+        # the lone spike at 0.7s is shorter than min_segment and is dropped
+        np.testing.assert_allclose(segments, [(0.1, 0.4), (1.4, 1.8)])
+
+    def test_hysteresis_segments_closes_short_gaps(self):
+        peak = np.array([0.5, 0.5, 0, 0.5, 0.5, 0, 0, 0, 0.5, 0.5])
+        segments = hysteresis_segments(peak, 0.1, 0.1, 0.05, 0.0, 0.1, 1.0)
+        np.testing.assert_allclose(segments, [(0, 0.5), (0.8, 1.0)])
+
+    def test_snap_segments_to_frames(self):
+        segments = snap_segments([(0.31, 1.02), (1.5, 2.0)], fps=10, duration=5)
+        np.testing.assert_allclose(segments, [(0.3, 1.1), (1.5, 2.0)])
+
+    def test_snap_segments_to_keyframes(self):
+        keyframes = [0.0, 1.1, 2.5]
+        segments = snap_segments([(0.31, 1.02), (1.5, 2.0), (2.6, 3.0)], 10, 5, keyframes, 0.2)
+        # 1.02 moves forward to the keyframe at 1.1, 2.6 back to 2.5; the rest snap to frames
+        np.testing.assert_allclose(segments, [(0.3, 1.1), (1.5, 2.0), (2.5, 3.0)])
+
+    def test_snap_segments_merges_touching(self):
+        segments = snap_segments([(0.0, 0.95), (1.02, 2.0)], 10, 2.0, [1.0], 0.1)
+        np.testing.assert_allclose(segments, [(0.0, 2.0)])
+
     def test_pad_segments(self):
         segments = [(1, 2), (3, 4)]
         padding = 0.5
         clip_duration = 5
         padded = pad_segments(segments, padding, clip_duration)
-        self.assertEqual(padded, [(0.5, 2.5), (2.5, 4.5)])
+        # Padded segments that meet are merged so no frame is rendered twice
+        self.assertEqual(padded, [(0.5, 4.5)])
+
+    def test_pad_segments_overlapping(self):
+        padded = pad_segments([(1, 2), (2.2, 3), (4, 5)], 0.2, 10)
+        self.assertEqual(padded, [(0.8, 3.2), (3.8, 5.2)])
 
     def test_pad_segments_clip_bounds(self):
         segments = [(0.1, 0.5), (4.8, 5.0)]
@@ -78,6 +126,30 @@ class TestSilenceRemover(unittest.TestCase):
         # Should not go below 0 or above clip_duration
         self.assertEqual(padded, [(0, 1.0), (4.3, 5.0)])
 
+    def test_export_final_video_private_temp_files(self):
+        temp_files = []
+
+        def write_videofile(output_path, **kwargs):
+            temp_files.append(kwargs["temp_audiofile"])
+            self.assertTrue(os.path.isdir(os.path.dirname(kwargs["temp_audiofile"])))
+
+        for _ in range(2):
+            final_video = MagicMock()
+            final_video.write_videofile.side_effect = write_videofile
+            export_final_video(final_video, "out.mov", [], MagicMock(), 1)
+        # Each export gets its own directory, removed afterwards
+        self.assertNotEqual(os.path.dirname(temp_files[0]), os.path.dirname(temp_files[1]))
+        self.assertNotEqual(os.path.dirname(os.path.abspath(temp_files[0])), os.getcwd())
+        self.assertFalse(any(os.path.exists(os.path.dirname(p)) for p in temp_files))
+
+    def test_export_final_video_raise_errors(self):
+        final_video = MagicMock()
+        final_video.write_videofile.side_effect = OSError("disk full")
+        export_final_video(final_video, "out.mov", [], MagicMock(), 1)
+        with self.assertRaises(OSError):
+            export_final_video(final_video, "out.mov", [], MagicMock(), 1, raise_errors=True)
+        final_video.close.assert_called()
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,111 @@
+import os
+import subprocess
+import tempfile
+import unittest
+from ffmpeg_tools import ffmpeg_binary, parse_showinfo, parse_stream_summary, run_ffmpeg
+from smart_render import build_audio_filter, export_stream_copy, plan_smart_segments, split_at_keyframes
+
+
+def frame_hashes(path):
+    """MD5 of every decoded video frame, in display order."""
+    out = subprocess.run(
+        [ffmpeg_binary(), "-v", "error", "-i", path, "-map", "0:v:0", "-f", "framemd5", "-"],
+        capture_output=True, text=True, check=True,
+    ).stdout
+    return [line.rsplit(",", 1)[1].strip() for line in out.splitlines() if not line.startswith("#")]
+
+
+class TestSmartRender(unittest.TestCase):
+    def test_plan_smart_segments(self):
+        keyframes = [0.0, 2.0, 4.0, 6.0, 8.0]
+        segments = [(0, 2.7), (3.8, 7.7), (8.1, 8.9)]
+        pieces = plan_smart_segments(segments, keyframes, frame_duration=0.04)
+        self.assertEqual(
+            pieces,
+            [
+                (0, 2.0, "copy"),
+                (2.0, 2.7, "encode"),
+                (3.8, 4.0, "encode"),
+                (4.0, 6.0, "copy"),
+                (6.0, 7.7, "encode"),
+                (8.1, 8.9, "encode"),  # No whole GOP inside the segment
+            ],
+        )
+
+    def test_plan_smart_segments_snaps_within_half_frame(self):
+        pieces = plan_smart_segments([(1.99, 4.01)], [0.0, 2.0, 4.0], frame_duration=0.04)
+        self.assertEqual(pieces, [(2.0, 4.0, "copy")])
+
+    def test_build_audio_filter(self):
+        f = build_audio_filter([(0, 1.5), (3, 4)])
+        self.assertIn("between(t,0.000000,1.500000)+between(t,3.000000,4.000000)", f)
+        self.assertTrue(f.endswith("[aout]"))
+
+    def test_parse_showinfo(self):
+        text = (
+            "[Parsed_showinfo_0 @ 0x1] n:   0 pts:      0 pts_time:0 fmt:yuv420p iskey:1 type:I\n"
+            "[Parsed_showinfo_0 @ 0x1] n:   1 pts:  25600 pts_time:2.5 fmt:yuv420p iskey:1 type:I\n"
+            "[Parsed_showinfo_0 @ 0x1] n:   2 pts:  30000 pts_time:3 fmt:yuv420p iskey:0 type:P\n"
+        )
+        self.assertEqual(parse_showinfo(text), ([0.0, 2.5], "yuv420p"))
+
+    def test_parse_stream_summary(self):
+        text = (
+            "Input #0, mp3, from 'talk.mp3':\n"
+            "  Duration: 01:02:03.50, start: 0.025057, bitrate: 128 kb/s\n"
+            "  Stream #0:0: Audio: mp3, 44100 Hz, stereo, fltp, 128 kb/s\n"
+            "  Stream #0:1: Video: mjpeg (Baseline), yuvj420p, 600x600, 90k tbr, 90k tbn (attached pic)\n"
+        )
+        self.assertEqual(
+            parse_stream_summary(text),
+            {
+                "duration": 3723.5,
+                "audio_found": True,
+                "video_found": False,
+                "video_fps": None,
+                "audio_fps": 44100,
+                "audio_nchannels": 2,
+            },
+        )
+        video = parse_stream_summary("  Stream #0:0[0x1](und): Video: h264 (High), yuv420p, 25 fps, 25 tbr\n")
+        self.assertEqual((video["video_found"], video["video_fps"], video["audio_found"]), (True, 25.0, False))
+
+
+class TestStreamCopyExport(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # 12 s at 25 fps with a keyframe every second and two B-frames, whose
+        # reorder delay shifts the copied packets' timestamps
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.src = os.path.join(cls.tmp.name, "bframes.mp4")
+        try:
+            run_ffmpeg(
+                ["-f", "lavfi", "-i", "testsrc2=size=160x120:rate=25:duration=12",
+                 "-f", "lavfi", "-i", "sine=frequency=440:duration=12",
+                 "-c:v", "libx264", "-g", "25", "-keyint_min", "25", "-sc_threshold", "0", "-bf", "2",
+                 "-c:a", "aac", "-shortest", cls.src]
+            )
+        except (OSError, RuntimeError) as e:
+            cls.tmp.cleanup()
+            raise unittest.SkipTest(f"Cannot generate test video: {e}")
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def test_split_at_keyframes_spans(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            files = split_at_keyframes(self.src, [0.0, 2.0, 4.0, 6.0], 0.02, tmp)
+        spans = [(round(s, 3), round(e, 3)) for s, e, _ in files]
+        self.assertEqual(spans, [(0.0, 2.0), (2.0, 4.0), (4.0, 6.0), (6.0, 12.0)])
+
+    def test_copied_pieces_hold_the_kept_frames(self):
+        output = os.path.join(self.tmp.name, "out.mp4")
+        self.assertTrue(export_stream_copy(self.src, [(0, 2), (4, 6), (8, 10)], output, 1))
+        source = frame_hashes(self.src)
+        expected = source[0:50] + source[100:150] + source[200:250]
+        self.assertEqual(frame_hashes(output), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
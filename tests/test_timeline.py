@@ -0,0 +1,62 @@
+import unittest
+import numpy as np
+from moviepy.audio.AudioClip import AudioClip
+from moviepy.video.VideoClip import ColorClip
+from moviepy.video.compositing.CompositeVideoClip import CompositeVideoClip
+from moviepy.video.fx.FadeIn import FadeIn
+from moviepy.video.fx.FadeOut import FadeOut
+from timeline import TimelineClip
+
+
+def make_clip(value, duration):
+    clip = ColorClip((4, 2), color=(value, value, value), duration=duration).with_fps(10)
+    return clip.with_audio(AudioClip(lambda t: np.transpose([np.full(np.shape(t), value / 100)] * 2), duration=duration, fps=100))
+
+
+def composite_reference(clips, overlap):
+    """The CompositeVideoClip layout crossfade_sequence used to build."""
+    result = []
+    t = 0
+    for i, clip in enumerate(clips):
+        c = clip.with_start(t)
+        if i > 0:
+            c = c.with_effects([FadeIn(overlap)])
+        if i < len(clips) - 1:
+            c = c.with_effects([FadeOut(overlap)])
+        result.append(c)
+        t += clip.duration - overlap
+    return CompositeVideoClip(result)
+
+
+class TestTimelineClip(unittest.TestCase):
+    def setUp(self):
+        self.clips = [make_clip(200, 1.0), make_clip(100, 1.5), make_clip(50, 0.8)]
+
+    def test_matches_composite_video(self):
+        timeline = TimelineClip(self.clips, 0.3)
+        reference = composite_reference(self.clips, 0.3)
+        self.assertAlmostEqual(timeline.duration, reference.duration)
+        for t in np.arange(0, timeline.duration, 0.05):
+            np.testing.assert_array_equal(timeline.get_frame(t), reference.get_frame(t), err_msg=f"t={t}")
+
+    def test_matches_composite_audio(self):
+        timeline = TimelineClip(self.clips, 0.3)
+        reference = composite_reference(self.clips, 0.3)
+        tt = np.arange(0, timeline.duration, 0.01)
+        np.testing.assert_allclose(timeline.audio.get_frame(tt), reference.audio.get_frame(tt))
+
+    def test_active_clips(self):
+        timeline = TimelineClip(self.clips, 0.3)
+        # Starts: 0, 0.7, 1.9
+        self.assertEqual(list(timeline.active_clips(0.8, 0.9)), [0, 1])
+        self.assertEqual(list(timeline.active_clips(1.2, 1.3)), [1])
+        self.assertEqual(list(timeline.active_clips(1.0, 1.0)), [0, 1])
+
+    def test_concatenation_without_fade(self):
+        timeline = TimelineClip(self.clips)
+        self.assertAlmostEqual(timeline.duration, 3.3)
+        np.testing.assert_array_equal(timeline.get_frame(1.05), np.full((2, 4, 3), 100))
+
+
+if __name__ == "__main__":
+    unittest.main()
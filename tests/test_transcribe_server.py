@@ -0,0 +1,61 @@
+import os
+import stat
+import tempfile
+import threading
+import time
+import unittest
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client
+from unittest.mock import MagicMock
+from transcribe_server import TranscriptionServer, authkey_path, request_transcription
+
+
+def start_server(server):
+    """Serve on a fresh socket in a daemon thread and return the socket path."""
+    # The listener thread outlives the test and unlinks its socket at exit
+    sock = os.path.join(tempfile.mkdtemp(), "w.sock")
+    threading.Thread(target=server.serve_forever, args=(sock,), daemon=True).start()
+    for _ in range(100):
+        if os.path.exists(sock):
+            break
+        time.sleep(0.01)
+    return sock
+
+
+class TestTranscribeServer(unittest.TestCase):
+    def test_request_without_server(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            self.assertIsNone(request_transcription("a.mov", "base", socket_path=os.path.join(tmp, "none.sock")))
+
+    def test_round_trip(self):
+        server = TranscriptionServer("cpu")
+        model = MagicMock()
+        model.transcribe.return_value = {"text": "hello", "segments": []}
+        server.models["base"] = model
+        sock = start_server(server)
+        result = request_transcription("a.mov", "base", socket_path=sock)
+        self.assertEqual(result["text"], "hello")
+        model.transcribe.assert_called_once_with(os.path.abspath("a.mov"), word_timestamps=True)
+        # A second job reuses the loaded model
+        request_transcription("b.mov", "base", socket_path=sock)
+        self.assertEqual(model.transcribe.call_count, 2)
+
+    def test_requires_private_random_key(self):
+        sock = start_server(TranscriptionServer("cpu"))
+        for path in (sock, authkey_path(sock)):
+            self.assertEqual(stat.S_IMODE(os.stat(path).st_mode) & 0o077, 0)
+        with open(authkey_path(sock), "rb") as f:
+            self.assertEqual(len(f.read()), 32)
+        with self.assertRaises(AuthenticationError):
+            Client(sock, family="AF_UNIX", authkey=b"vidcleanser-transcribe")
+
+    def test_handle_reports_errors(self):
+        server = TranscriptionServer("cpu")
+        model = MagicMock()
+        model.transcribe.side_effect = RuntimeError("boom")
+        server.models["base"] = model
+        self.assertEqual(server.handle({"video_path": "a", "model": "base"}), {"error": "boom"})
+
+
+if __name__ == "__main__":
+    unittest.main()
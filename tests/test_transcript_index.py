@@ -0,0 +1,72 @@
+import unittest
+import numpy as np
+from transcript_index import TranscriptIndex, normalize_word, parse_timestamp
+
+
+def whisper_result(*segments):
+    return {
+        "segments": [
+            {"words": [{"word": w, "start": s, "end": e} for w, s, e in words]} for words in segments
+        ]
+    }
+
+
+class TestTranscriptIndex(unittest.TestCase):
+    def test_parse_timestamp(self):
+        self.assertAlmostEqual(parse_timestamp("00:01:02,480"), 62.48)
+
+    def test_normalize_word(self):
+        self.assertEqual(normalize_word(" Um,"), "um")
+        self.assertEqual(normalize_word(" ..."), "")
+
+    def test_from_whisper(self):
+        index = TranscriptIndex.from_whisper(
+            whisper_result(
+                [(" So", 0.0, 0.2), (" um", 0.2, 0.4), (" so.", 0.4, 0.6)],
+                [(" So", 1.0, 1.2), (" ,", 1.2, 1.2)],
+            )
+        )
+        self.assertEqual(index.vocab, ["so", "um"])
+        np.testing.assert_array_equal(index.token_ids, [0, 1, 0, 0])
+        np.testing.assert_array_equal(index.starts, [0.0, 0.2, 0.4, 1.0])
+        np.testing.assert_array_equal(index.sentence_start, [True, False, False, True])
+
+    def test_from_whisper_cpp(self):
+        index = TranscriptIndex.from_transcript(
+            {
+                "transcription": [
+                    {"text": "Hi", "timestamps": {"from": "00:00:01,000", "to": "00:00:01,500"}},
+                    {"text": "", "offsets": {"from": 1500, "to": 1500}},
+                    {"text": "so", "offsets": {"from": 2000, "to": 2300}},
+                ]
+            }
+        )
+        self.assertEqual(index.vocab, ["hi", "so"])
+        np.testing.assert_array_equal(index.ends, [1.5, 2.3])
+        np.testing.assert_array_equal(index.sentence_start, [True, True])
+
+    def test_arrays_round_trip(self):
+        index = TranscriptIndex.from_whisper(whisper_result([(" you", 0, 1), (" know", 1, 2)]))
+        copy = TranscriptIndex.from_arrays(index.to_arrays())
+        self.assertEqual(copy.vocab, index.vocab)
+        np.testing.assert_array_equal(copy.token_ids, index.token_ids)
+        np.testing.assert_array_equal(copy.find_phrases(["you know"])[0], [0])
+
+    def test_find_phrases(self):
+        words = "you know i mean you you know um i".split()
+        index = TranscriptIndex.from_whisper(
+            whisper_result([(" " + w, float(i), i + 1.0) for i, w in enumerate(words)])
+        )
+        first, n_words, phrase = index.find_phrases(["you know", "i mean", "um", "you", "like"])
+        np.testing.assert_array_equal(first, [0, 2, 4, 5, 7])
+        np.testing.assert_array_equal(n_words, [2, 2, 1, 2, 1])
+        np.testing.assert_array_equal(phrase, [0, 1, 3, 0, 2])
+
+    def test_find_phrases_no_match(self):
+        index = TranscriptIndex.from_whisper(whisper_result([(" hello", 0, 1)]))
+        first, _, _ = index.find_phrases(["um", "you know"])
+        self.assertEqual(len(first), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+import numpy as np
+from transcription import (
+    chunk_to_source_times,
+    iter_chunk_samples,
+    plan_speech_chunks,
+    remap_transcript,
+    stitch_transcripts,
+)
+
+
+class TestTranscription(unittest.TestCase):
+    def test_plan_speech_chunks_packs_and_splits(self):
+        ranges = [(0, 10), (10.5, 20), (40, 45), (60, 130)]
+        chunks = plan_speech_chunks(ranges, max_chunk=30, join_gap=1.0)
+        # 0-20 (joined over the short pause) and 40-45 share a chunk; 60-130 is split
+        self.assertEqual(chunks[0], [(0.0, 20.0), (40.0, 45.0)])
+        self.assertEqual(len(chunks), 4)
+        for chunk in chunks:
+            self.assertLessEqual(sum(e - s for s, e in chunk), 30 + 1e-9)
+        flat = [r for chunk in chunks for r in chunk]
+        self.assertAlmostEqual(sum(e - s for s, e in flat), 95)
+
+    def test_chunk_to_source_times(self):
+        ranges = [(10, 12), (20, 25)]
+        np.testing.assert_allclose(chunk_to_source_times([0, 1.5, 2, 3, 7], ranges), [10, 11.5, 20, 21, 25])
+
+    def test_iter_chunk_samples(self):
+        src = np.arange(100)
+        blocks = [src[i : i + 7] for i in range(0, 100, 7)]
+        out = dict(iter_chunk_samples(blocks, [(0.1, 0.3), (0.5, 0.55), (0.95, 1.2)], 100))
+        np.testing.assert_array_equal(out[0], np.arange(10, 30))
+        np.testing.assert_array_equal(out[1], np.arange(50, 55))
+        np.testing.assert_array_equal(out[2], np.arange(95, 100))
+
+    def test_remap_and_stitch(self):
+        a = {"text": " um hi", "language": "en", "segments": [
+            {"id": 0, "start": 0.0, "end": 3.0, "words": [{"word": " um", "start": 1.0, "end": 2.5}]}
+        ]}
+        b = {"text": " yes", "language": "en", "segments": [{"id": 0, "start": 0.5, "end": 1.0, "words": []}]}
+        remap_transcript(a, [(10, 12), (20, 25)])
+        remap_transcript(b, [(100, 110)])
+        result = stitch_transcripts([a, b])
+        self.assertEqual(result["text"], " um hi yes")
+        self.assertEqual([s["id"] for s in result["segments"]], [0, 1])
+        self.assertEqual(result["segments"][0]["words"][0]["start"], 11.0)
+        self.assertEqual(result["segments"][0]["words"][0]["end"], 20.5)
+        self.assertEqual(result["segments"][1]["start"], 100.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import io
+import os
+import subprocess
+import sys
+import types
+import unittest
+from contextlib import redirect_stdout
+from unittest.mock import MagicMock, patch
+import vidcleanser
+
+
+class TestVidCleanser(unittest.TestCase):
+    def test_help_lists_commands_without_imports(self):
+        out = io.StringIO()
+        with patch("vidcleanser.importlib") as mock_importlib, redirect_stdout(out):
+            self.assertEqual(vidcleanser.main(["vidcleanser.py", "--help"]), 0)
+        mock_importlib.import_module.assert_not_called()
+        for name in vidcleanser.COMMANDS:
+            self.assertIn(name, out.getvalue())
+
+    def test_unknown_command(self):
+        with patch("sys.stderr", new=io.StringIO()) as err:
+            self.assertEqual(vidcleanser.main(["vidcleanser.py", "nope"]), 2)
+        self.assertIn("Unknown command: nope", err.getvalue())
+
+    @patch("absl.app.run")
+    @patch("vidcleanser.importlib")
+    def test_dispatches_to_module(self, mock_importlib, mock_run):
+        module = types.ModuleType("fake_command")
+        module.define_flags = MagicMock()
+        module.main = MagicMock()
+        mock_importlib.import_module.return_value = module
+
+        vidcleanser.main(["vidcleanser.py", "silence", "--clip_path", "in.mov"])
+
+        mock_importlib.import_module.assert_called_once_with("silence_remover")
+        module.define_flags.assert_called_once()
+        mock_run.assert_called_once_with(module.main, argv=["vidcleanser silence", "--clip_path", "in.mov"])
+
+    def test_heavy_modules_load_lazily(self):
+        # A fresh interpreter, since other tests may have imported moviepy already
+        modules = ", ".join(module for module, _ in vidcleanser.COMMANDS.values())
+        code = (
+            f"import sys, {modules}; "
+            "print(sorted(m for m in ('moviepy', 'whisper', 'torch', 'tensorflow') if m in sys.modules))"
+        )
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        out = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True)
+        self.assertEqual(out.stdout.strip(), "[]")
+
+
+if __name__ == "__main__":
+    unittest.main()
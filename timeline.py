@@ -0,0 +1,75 @@
+import numpy as np
+from moviepy.audio.AudioClip import AudioClip
+from moviepy.video.VideoClip import VideoClip
+
+
+class TimelineClip(VideoClip):
+    """
+    Sequence of clips on an indexed timeline, optionally faded in from black.
+
+    Clip i starts when clip i - 1 has `overlap` seconds left, as in
+    crossfade_sequence. Start times are precomputed once, so each frame is found
+    with a binary search instead of scanning every clip. Clips are opaque and each
+    one is drawn over its predecessor, so the only visible clip at time t is the
+    latest one to have started; its fade-in is computed only inside its overlap
+    window. The audio of overlapping clips is mixed as in CompositeAudioClip.
+
+    Args:
+        clips (list[Clip]): Clips to sequence, all with the same size.
+        overlap (float): Duration (in seconds) each clip overlaps the previous one.
+        fade (bool): Fade clips after the first in from black over the overlap.
+    """
+
+    def __init__(self, clips, overlap=0.0, fade=True):
+        self.clips = list(clips)
+        durations = np.array([c.duration for c in self.clips], dtype=float)
+        self.starts = np.concatenate([[0.0], np.cumsum(durations[:-1] - overlap)])
+        self.ends = self.starts + durations
+        # Running max of end times keeps the index searchable for any clip lengths
+        self._ends_prefix_max = np.maximum.accumulate(self.ends)
+        self.overlap = overlap
+        self.fade = fade and overlap > 0
+        super().__init__(frame_function=self._frame_at, duration=float(self._ends_prefix_max[-1]))
+        self.fps = getattr(self.clips[0], "fps", None)
+        if any(c.audio is not None for c in self.clips):
+            self.audio = TimelineAudioClip(self)
+
+    def active_clips(self, t_min, t_max):
+        """Indices of the clips playing (end inclusive) at some time in [t_min, t_max]."""
+        lo = int(np.searchsorted(self._ends_prefix_max, t_min, side="left"))
+        hi = int(np.searchsorted(self.starts, t_max, side="right"))
+        return range(lo, hi)
+
+    def _frame_at(self, t):
+        i = min(max(int(np.searchsorted(self.starts, t, side="right")) - 1, 0), len(self.clips) - 1)
+        local = t - self.starts[i]
+        frame = self.clips[i].get_frame(local)
+        if self.fade and i > 0 and local < self.overlap:
+            # Fade in from black, as FadeIn does, only within the overlap window
+            return (local / self.overlap * frame).astype("uint8")
+        return frame
+
+
+class TimelineAudioClip(AudioClip):
+    """Audio of a TimelineClip; each block mixes only the clips it overlaps."""
+
+    def __init__(self, timeline):
+        self.timeline = timeline
+        first = next(c.audio for c in timeline.clips if c.audio is not None)
+        self.nchannels = first.nchannels
+        super().__init__(frame_function=self._frame_at, duration=timeline.duration, fps=first.fps)
+
+    def _frame_at(self, t):
+        tl = self.timeline
+        tt = np.atleast_1d(np.asarray(t, dtype=float))
+        out = np.zeros((len(tt), self.nchannels))
+        for i in tl.active_clips(tt.min(), tt.max()):
+            audio = tl.clips[i].audio
+            if audio is None:
+                continue
+            # End is inclusive, like Clip.is_playing
+            playing = (tt >= tl.starts[i]) & (tt <= tl.ends[i])
+            if playing.any():
+                sound = audio.get_frame(tt[playing] - tl.starts[i])
+                out[playing] += np.reshape(sound, (int(playing.sum()), -1))
+        return out if isinstance(t, np.ndarray) else out[0]
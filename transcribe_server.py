@@ -0,0 +1,169 @@
+from absl import app, flags
+import os
+import secrets
+import tempfile
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener
+from analysis_cache import DEFAULT_CACHE_DIR
+from transcription import transcribe_ranges
+
+FLAGS = flags.FLAGS
+
+DEFAULT_SOCKET_PATH = os.path.join(DEFAULT_CACHE_DIR, "whisper.sock")
+# Bytes of the random key a server generates at startup
+AUTHKEY_BYTES = 32
+
+
+def define_flags():
+    flags.DEFINE_string("socket_path", DEFAULT_SOCKET_PATH, "Unix socket to accept jobs on")
+    flags.DEFINE_list("models", ["large"], "Whisper models to load at startup")
+    flags.DEFINE_string("device", None, "Torch device (default: cuda if available, else cpu)")
+
+
+def authkey_path(socket_path):
+    """File holding the authentication key of the server listening on socket_path."""
+    return socket_path + ".key"
+
+
+def write_authkey(socket_path):
+    """
+    Generate a random authentication key and store it next to the socket.
+
+    Jobs are pickled, and unpickling runs arbitrary code, so only clients that can
+    read this key (created 0600, i.e. the same user) may connect.
+    """
+    key = secrets.token_bytes(AUTHKEY_BYTES)
+    directory = os.path.dirname(os.path.abspath(socket_path))
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")  # Created 0600
+    with os.fdopen(fd, "wb") as f:
+        f.write(key)
+    os.replace(tmp, authkey_path(socket_path))
+    return key
+
+
+def read_authkey(socket_path):
+    """Return the key of the server on socket_path, or None if none is running."""
+    try:
+        with open(authkey_path(socket_path), "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def request_transcription(video_path, model_name, speech_ranges=None, socket_path=DEFAULT_SOCKET_PATH):
+    """
+    Submit a transcription job to a running server.
+
+    Args:
+        video_path (str): Path to the input file.
+        model_name (str): Whisper model size.
+        speech_ranges (list of tuple): Only transcribe these ranges (None for the whole file).
+        socket_path (str): Socket the server listens on.
+
+    Returns:
+        dict: Whisper-style result, or None if no server is running.
+
+    Raises:
+        RuntimeError: If the server failed to transcribe the file.
+    """
+    authkey = read_authkey(socket_path)
+    if authkey is None:
+        return None
+    try:
+        conn = Client(socket_path, family="AF_UNIX", authkey=authkey)
+    except (FileNotFoundError, ConnectionRefusedError):
+        return None
+    with conn:
+        conn.send(
+            {
+                "video_path": os.path.abspath(video_path),
+                "model": model_name,
+                "speech_ranges": speech_ranges,
+            }
+        )
+        reply = conn.recv()
+    if "error" in reply:
+        raise RuntimeError(f"Transcription server failed: {reply['error']}")
+    return reply["result"]
+
+
+class TranscriptionServer:
+    """
+    Keeps Whisper models loaded and serves transcription jobs one at a time.
+
+    Args:
+        device (str): Torch device to load models on.
+    """
+
+    def __init__(self, device):
+        self.device = device
+        self.models = {}
+
+    def model(self, name):
+        """Return the named model, loading it on first use."""
+        if name not in self.models:
+            import whisper
+
+            print(f"Loading Whisper model '{name}' on {self.device}...")
+            self.models[name] = whisper.load_model(name, device=self.device)
+        return self.models[name]
+
+    def handle(self, job):
+        """Run one job and return the reply sent back to the client."""
+        try:
+            model = self.model(job["model"])
+            if job.get("speech_ranges") is None:
+                result = model.transcribe(job["video_path"], word_timestamps=True)
+            else:
+                result = transcribe_ranges(model, job["video_path"], job["speech_ranges"])
+            return {"result": result}
+        except Exception as e:
+            return {"error": str(e)}
+
+    def serve_forever(self, socket_path):
+        """
+        Accept jobs on a Unix socket until interrupted.
+
+        Clients must present the random key stored by write_authkey. The socket is
+        also created owner-only (bound under a 077 umask, so it is never briefly
+        open to other users).
+        """
+        if os.path.exists(socket_path):
+            os.remove(socket_path)  # Stale socket from a previous server
+        os.makedirs(os.path.dirname(socket_path) or ".", mode=0o700, exist_ok=True)
+        authkey = write_authkey(socket_path)
+        umask = os.umask(0o077)
+        try:
+            listener = Listener(socket_path, family="AF_UNIX", authkey=authkey)
+        finally:
+            os.umask(umask)
+        with listener:
+            print(f"Listening on {socket_path}")
+            while True:
+                try:
+                    with listener.accept() as conn:
+                        job = conn.recv()
+                        print(f"Transcribing {job['video_path']} with '{job['model']}'...")
+                        conn.send(self.handle(job))
+                except (EOFError, OSError, AuthenticationError) as e:
+                    print(f"Dropped connection: {e}")
+
+
+def main(argv):
+    import torch
+
+    device = FLAGS.device or ("cuda" if torch.cuda.is_available() else "cpu")
+    server = TranscriptionServer(device)
+    for name in FLAGS.models:
+        server.model(name)
+    try:
+        server.serve_forever(FLAGS.socket_path)
+    finally:
+        for path in (FLAGS.socket_path, authkey_path(FLAGS.socket_path)):
+            if os.path.exists(path):
+                os.remove(path)
+
+
+if __name__ == "__main__":
+    define_flags()
+    app.run(main)
@@ -0,0 +1,181 @@
+import re
+import numpy as np
+
+SENTENCE_END = (".", "?", "!")
+
+
+def parse_timestamp(ts):
+    """Parse a whisper.cpp timestamp "00:01:02,480" into seconds."""
+    h, m, s_ms = ts.split(":")
+    s, ms = s_ms.split(",")
+    return int(h) * 3600 + int(m) * 60 + int(s) + int(ms) / 1000
+
+
+def normalize_word(text):
+    """Lowercase a word and strip everything but word characters."""
+    return re.sub(r"[^\w]+", "", text.lower())
+
+
+class TranscriptIndex:
+    """
+    Columnar word-level transcript.
+
+    Words are stored as token ids into a vocabulary of normalized words plus
+    parallel start/end arrays, so a transcript of several hours is a few small
+    arrays that load from the analysis cache and scan in milliseconds. Words that
+    normalize to nothing are dropped; `sentence_start` marks the words that follow
+    one, the start of a segment or a word ending a sentence.
+
+    Args:
+        vocab (list of str): Normalized words; token id i is vocab[i].
+        token_ids (array-like): Token id of every word.
+        starts (array-like): Start time of every word in seconds.
+        ends (array-like): End time of every word in seconds.
+        sentence_start (array-like): Whether each word begins a sentence.
+    """
+
+    def __init__(self, vocab, token_ids, starts, ends, sentence_start):
+        self.vocab = list(vocab)
+        self.token_ids = np.asarray(token_ids, dtype=np.int32).reshape(-1)
+        self.starts = np.asarray(starts, dtype=float).reshape(-1)
+        self.ends = np.asarray(ends, dtype=float).reshape(-1)
+        self.sentence_start = np.asarray(sentence_start, dtype=bool).reshape(-1)
+        self._ids = {w: i for i, w in enumerate(self.vocab)}
+
+    def __len__(self):
+        return len(self.token_ids)
+
+    @classmethod
+    def from_words(cls, words):
+        """Build an index from (text, start, end, sentence_start) tuples."""
+        vocab, ids = [], {}
+        token_ids, starts, ends, sentence_start = [], [], [], []
+        boundary = True
+        for text, start, end, new_segment in words:
+            token = normalize_word(text)
+            text = text.strip()
+            boundary = boundary or new_segment
+            if not token:
+                # Blanks and punctuation only mark sentence boundaries
+                boundary = boundary or not text or text.endswith(SENTENCE_END)
+                continue
+            if token not in ids:
+                ids[token] = len(vocab)
+                vocab.append(token)
+            token_ids.append(ids[token])
+            starts.append(start)
+            ends.append(end)
+            sentence_start.append(boundary)
+            boundary = text.endswith(SENTENCE_END)
+        return cls(vocab, token_ids, starts, ends, sentence_start)
+
+    @classmethod
+    def from_whisper(cls, result):
+        """Build an index from an openai-whisper result with word timestamps."""
+        return cls.from_words(
+            (w["word"], w["start"], w["end"], j == 0)
+            for seg in result.get("segments", [])
+            for j, w in enumerate(seg.get("words", []))
+        )
+
+    @classmethod
+    def from_whisper_cpp(cls, entries):
+        """Build an index from the "transcription" list of whisper.cpp JSON output."""
+
+        def times(entry):
+            if "offsets" in entry:
+                return entry["offsets"]["from"] / 1000, entry["offsets"]["to"] / 1000
+            return parse_timestamp(entry["timestamps"]["from"]), parse_timestamp(entry["timestamps"]["to"])
+
+        return cls.from_words((e["text"], *times(e), False) for e in entries)
+
+    @classmethod
+    def from_transcript(cls, data):
+        """Build an index from either openai-whisper or whisper.cpp JSON."""
+        if "transcription" in data:
+            return cls.from_whisper_cpp(data["transcription"])
+        return cls.from_whisper(data)
+
+    def to_arrays(self):
+        """Return the index as a dict of arrays, e.g. for AnalysisCache.save_arrays."""
+        return {
+            "vocab": np.array(self.vocab, dtype=str),
+            "token_ids": self.token_ids,
+            "starts": self.starts,
+            "ends": self.ends,
+            "sentence_start": self.sentence_start,
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        """Inverse of to_arrays."""
+        return cls(
+            arrays["vocab"].tolist(),
+            arrays["token_ids"],
+            arrays["starts"],
+            arrays["ends"],
+            arrays["sentence_start"],
+        )
+
+    def encode(self, phrase):
+        """Token ids of a phrase, or None if one of its words never occurs."""
+        ids = [self._ids.get(normalize_word(w)) for w in phrase.split()]
+        if not ids or None in ids:
+            return None
+        return ids
+
+    def find_phrases(self, phrases):
+        """
+        Find every occurrence of any of the phrases in one pass over the transcript.
+
+        The phrases are compiled into a trie over token ids with a dense transition
+        table, and the trie is walked from every word position at once, one depth
+        level per step. Where several phrases start at the same word the longest
+        one wins.
+
+        Returns:
+            tuple of np.ndarray: (first_word, n_words, phrase_index) of each match,
+            sorted by first_word.
+        """
+        patterns = [(n, self.encode(p)) for n, p in enumerate(phrases)]
+        patterns = [(n, ids) for n, ids in patterns if ids]
+        empty = np.zeros(0, dtype=np.int64)
+        if not patterns or len(self) == 0:
+            return empty, empty, empty
+        # Trie states; row 0 is the root and -1 means no transition
+        children = [{}]
+        terminal = [-1]
+        for n, ids in patterns:
+            state = 0
+            for token in ids:
+                if token not in children[state]:
+                    children[state][token] = len(children)
+                    children.append({})
+                    terminal.append(-1)
+                state = children[state][token]
+            terminal[state] = n
+        table = np.full((len(children), len(self.vocab)), -1, dtype=np.int32)
+        for state, edges in enumerate(children):
+            for token, child in edges.items():
+                table[state, token] = child
+        terminal = np.array(terminal)
+
+        n_words = len(self)
+        state = np.zeros(n_words, dtype=np.int32)
+        alive = np.arange(n_words)
+        match_len = np.zeros(n_words, dtype=np.int64)
+        match_phrase = np.full(n_words, -1, dtype=np.int64)
+        depth = 0
+        while len(alive):
+            pos = alive + depth
+            in_range = pos < n_words
+            alive, pos, state = alive[in_range], pos[in_range], state[in_range]
+            state = table[state, self.token_ids[pos]]
+            moving = state >= 0
+            alive, state = alive[moving], state[moving]
+            depth += 1
+            hit = terminal[state] >= 0
+            match_len[alive[hit]] = depth
+            match_phrase[alive[hit]] = terminal[state[hit]]
+        first = np.flatnonzero(match_len)
+        return first, match_len[first], match_phrase[first]
@@ -0,0 +1,199 @@
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import get_context
+import numpy as np
+from audio_stream import iter_pcm_blocks
+from intervals import IntervalSet
+
+WHISPER_SAMPLE_RATE = 16000
+# Whisper decodes 30 s windows, so longer chunks gain nothing
+MAX_CHUNK_DURATION = 30.0
+# Loud segments closer than this are transcribed together to keep context
+CHUNK_JOIN_GAP = 1.0
+
+_worker_model = None
+
+
+def plan_speech_chunks(speech_ranges, max_chunk=MAX_CHUNK_DURATION, join_gap=CHUNK_JOIN_GAP):
+    """
+    Pack speech ranges into transcription chunks of at most max_chunk seconds of audio.
+
+    Ranges closer than join_gap are joined to keep natural pauses; longer silences
+    are dropped and consecutive ranges are concatenated into the same chunk while
+    they fit. Ranges longer than max_chunk are split into equal pieces.
+
+    Returns:
+        list of list of tuple: For each chunk, the sorted (start, end) source ranges
+        whose audio it concatenates.
+    """
+    chunks = []
+    used = max_chunk
+    for start, end in IntervalSet.from_pairs(speech_ranges).merge(join_gap):
+        n = max(1, int(np.ceil((end - start) / max_chunk)))
+        edges = np.linspace(start, end, n + 1).tolist()
+        for s, e in zip(edges[:-1], edges[1:]):
+            if used + (e - s) > max_chunk:
+                chunks.append([])
+                used = 0.0
+            chunks[-1].append((s, e))
+            used += e - s
+    return chunks
+
+
+def chunk_to_source_times(times, ranges):
+    """Map times within a chunk's concatenated audio back to source times."""
+    ranges = np.asarray(ranges, dtype=float).reshape(-1, 2)
+    offsets = np.concatenate([[0.0], np.cumsum(ranges[:, 1] - ranges[:, 0])[:-1]])
+    times = np.asarray(times, dtype=float)
+    idx = np.clip(np.searchsorted(offsets, times, side="right") - 1, 0, len(ranges) - 1)
+    return ranges[idx, 0] + (times - offsets[idx])
+
+
+def iter_chunk_samples(blocks, ranges, sample_rate):
+    """
+    Slice sorted, non-overlapping ranges out of a forward stream of audio blocks.
+
+    Yields:
+        tuple: (range_index, samples) as soon as each range has been read.
+    """
+    bounds = np.round(np.array(ranges, dtype=float).reshape(-1, 2) * sample_rate).astype(np.int64)
+    parts = []
+    src = 0
+    i = 0
+    for block in blocks:
+        block_end = src + len(block)
+        while i < len(bounds):
+            s, e = bounds[i]
+            lo, hi = max(s, src), min(e, block_end)
+            if lo < hi:
+                parts.append(block[lo - src : hi - src])
+            if e > block_end:
+                break
+            yield i, np.concatenate(parts) if parts else np.zeros(0, np.float32)
+            parts = []
+            i += 1
+        src = block_end
+        if i >= len(bounds):
+            return
+    # Ranges running past the end of the stream
+    for j in range(i, len(bounds)):
+        yield j, np.concatenate(parts) if parts else np.zeros(0, np.float32)
+        parts = []
+
+
+def remap_transcript(result, ranges):
+    """Rewrite segment and word timestamps of a chunk's Whisper result in source time."""
+    for seg in result.get("segments", []):
+        seg["start"], seg["end"] = chunk_to_source_times([seg["start"], seg["end"]], ranges).tolist()
+        for word in seg.get("words", []):
+            word["start"], word["end"] = chunk_to_source_times([word["start"], word["end"]], ranges).tolist()
+    return result
+
+
+def stitch_transcripts(results):
+    """Combine chunk results (already in source time) into one Whisper-style result."""
+    segments = []
+    for result in results:
+        for seg in result.get("segments", []):
+            seg = dict(seg, id=len(segments))
+            segments.append(seg)
+    return {
+        "text": "".join(r.get("text", "") for r in results),
+        "segments": segments,
+        "language": next((r["language"] for r in results if r.get("language")), None),
+    }
+
+
+def _init_worker(model_name, device, threads):
+    global _worker_model
+    import torch
+    import whisper
+
+    torch.set_num_threads(threads)
+    _worker_model = whisper.load_model(model_name, device=device)
+
+
+def _transcribe_chunk(job):
+    samples, ranges = job
+    result = _worker_model.transcribe(samples, word_timestamps=True)
+    return remap_transcript(result, ranges)
+
+
+def iter_speech_chunks(video_path, speech_ranges, audio=None):
+    """
+    Stream the audio of a file once and yield the speech of each transcription chunk.
+
+    If `audio` (the file's already decoded 16 kHz mono samples) is given, chunks
+    are sliced from it instead of decoding the file again.
+
+    Yields:
+        tuple: (chunk_index, ranges, samples) where samples is the concatenated
+        16 kHz mono audio of the chunk's source ranges.
+    """
+    chunks = plan_speech_chunks(speech_ranges)
+    # Every source range in order, tagged with the chunk it belongs to
+    ranges = [r for chunk in chunks for r in chunk]
+    owner = [n for n, chunk in enumerate(chunks) for _ in chunk]
+    if audio is None:
+        blocks = iter_pcm_blocks(video_path, sample_rate=WHISPER_SAMPLE_RATE, channels=1)
+    else:
+        blocks = [audio]
+    parts = []
+    for i, samples in iter_chunk_samples(blocks, ranges, WHISPER_SAMPLE_RATE):
+        parts.append(samples.reshape(-1))
+        n = owner[i]
+        if i + 1 < len(ranges) and owner[i + 1] == n:
+            continue  # Chunk still has ranges to read
+        yield n, chunks[n], np.concatenate(parts)
+        parts = []
+
+
+def transcribe_ranges(model, video_path, speech_ranges, audio=None):
+    """Transcribe the speech ranges of a file in-process with an already loaded model."""
+    results = []
+    for _, ranges, samples in iter_speech_chunks(video_path, speech_ranges, audio):
+        result = model.transcribe(samples, word_timestamps=True)
+        results.append(remap_transcript(result, ranges))
+    return stitch_transcripts(results)
+
+
+def transcribe_chunked(video_path, speech_ranges, model_name, workers, device="cpu", audio=None):
+    """
+    Transcribe only the speech in a file, in parallel worker processes.
+
+    The audio is streamed once; the speech of each chunk from plan_speech_chunks is
+    sent to a pool of workers that each keep a Whisper model loaded, and word
+    timestamps are mapped back to source time.
+
+    Args:
+        video_path (str): Path to the input file.
+        speech_ranges (list of tuple): (start, end) ranges containing speech.
+        model_name (str): Whisper model size, e.g. "base" or "large".
+        workers (int): Number of worker processes.
+        device (str): Torch device for the workers.
+        audio (np.ndarray): Already decoded 16 kHz mono samples of the file, or None.
+
+    Returns:
+        dict: Whisper-style result with "text", "segments" and "language".
+    """
+    n_chunks = len(plan_speech_chunks(speech_ranges))
+    print(f"Transcribing {n_chunks} speech chunks on {workers} workers...")
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    results = [None] * n_chunks
+    pending = {}
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(model_name, device, threads),
+    ) as pool:
+        for n, ranges, samples in iter_speech_chunks(video_path, speech_ranges, audio):
+            # Bound the decoded audio waiting in the queue
+            if len(pending) >= 2 * workers:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for f in done:
+                    results[pending.pop(f)] = f.result()
+            pending[pool.submit(_transcribe_chunk, (samples, ranges))] = n
+        for f in list(pending):
+            results[pending.pop(f)] = f.result()
+    return stitch_transcripts([r for r in results if r is not None])
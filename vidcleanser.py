@@ -0,0 +1,48 @@
+import importlib
+import sys
+
+# Subcommand -> (module, summary). Modules are only imported once their command runs,
+# so listing the commands loads nothing but this file.
+COMMANDS = {
+    "silence": ("silence_remover", "Cut silent parts out of a video"),
+    "fillers": ("filler_remover", "Cut filler words found in a Whisper transcript"),
+    "coughs": ("caugh_remover", "Find coughs and other sound events with YAMNet"),
+    "pipeline": ("pipeline", "Run silence, filler and cough detection with a single render"),
+    "batch": ("batch", "Clean a directory or manifest of videos"),
+    "serve": ("transcribe_server", "Keep Whisper models loaded for later transcriptions"),
+    "benchmark": ("benchmark", "Time the main stages on synthetic media"),
+}
+
+
+def usage(prog):
+    """Command list shown by --help and for unknown commands."""
+    width = max(len(name) for name in COMMANDS)
+    lines = [f"usage: {prog} <command> [--flags]", "", "commands:"]
+    lines += [f"  {name:<{width}}  {summary}" for name, (_, summary) in COMMANDS.items()]
+    lines += ["", f"Run '{prog} <command> --help' for the flags of a command."]
+    return "\n".join(lines)
+
+
+def main(argv):
+    prog = "vidcleanser"
+    if len(argv) < 2 or argv[1] in ("-h", "--help", "help"):
+        print(usage(prog))
+        return 0
+    command = argv[1]
+    if command not in COMMANDS:
+        print(f"Unknown command: {command}\n\n{usage(prog)}", file=sys.stderr)
+        return 2
+
+    from absl import app, flags
+
+    module = importlib.import_module(COMMANDS[command][0])
+    module.define_flags()
+    # List the command's flags in --help, as if its module had been run directly
+    flags.adopt_module_key_flags(module)
+    # absl parses flags from argv[1:], and shows argv[0] in its help
+    app.run(module.main, argv=[f"{prog} {command}"] + argv[2:])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))